@@ -0,0 +1,331 @@
+import decimal
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pandas as pd
+
+import db_pool
+import dbconnect
+import ingest_state
+from rollup import ROLLUP_TABLE
+
+try:
+    import duckdb
+except ImportError:  # 선택 기능: ANALYTICS_ENGINE=duckdb 일 때만 필요 (pip install duckdb)
+    duckdb = None
+
+# =============================================================================
+# [ENGINE] DUCKDB / PARQUET ANALYTICS MIRROR
+# - MySQL 테이블을 로컬 Parquet(열 지향) 파일로 복제하고, 임베디드 DuckDB 로 조회
+#   MIRROR_DIR/<테이블>/<연도>/<일자>.parquet  (일자 단위 조각 -> 바뀐 날짜만 다시 씀)
+# - 증분 갱신: ingest_state 버전이 바뀐 테이블만,
+#   그중 일자 단위 테이블은 마지막으로 복제한 버전 이후 ingest_changes 에 기록된 날짜만 다시 내보냄
+#   (버전과 변경 일자가 같은 트랜잭션에서 커밋되므로 늦게 커밋된 적재도 빠지지 않음)
+# - 설정: ANALYTICS_ENGINE=duckdb (main.py 분석 API 가 이 엔진을 사용),
+#         MIRROR_DIR (기본 <repo>/data/mirror), MIRROR_REFRESH_INTERVAL (초, 기본 60)
+#
+# 실행: cd backend && python analytics_mirror.py [refresh | rebuild | status]
+# =============================================================================
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LOG_COLUMNS = [
+    "UserGroup", "pasngDe", "pasngDate", "pasngYear", "pasngDow", "pasngHr", "lineNm",
+    "stnCd", "stnKey", "stnNm", "trnscdUserSeCd", "userClass", "rideNope", "gffNope",
+]
+_ROLLUP_COLUMNS = [
+    "stnKey", "pasngDate", "pasngYear", "pasngDow", "pasngHr", "userClass",
+    "stnNm", "lineNm", "rideNope", "gffNope", "volume",
+]
+_META_COLUMNS = ["stnCd", "stnKey", "stnNm", "lineNm", "lat", "lon"]
+
+# 테이블 -> (복제 컬럼, 파일 단위, 워터마크 키)
+#   date: 일자별 파일 (증분 갱신 대상) / year: 연도별 파일 / None: 파일 하나
+MIRROR_TABLES = {
+    ingest_state.TRAFFIC_LOG: (_LOG_COLUMNS, "date", ingest_state.TRAFFIC_LOG),
+    ROLLUP_TABLE: (_ROLLUP_COLUMNS, "date", ingest_state.TRAFFIC_LOG),
+    ingest_state.SENIOR_LOG: (_LOG_COLUMNS, "year", ingest_state.SENIOR_LOG),
+    ingest_state.STATION_META: (_META_COLUMNS, None, ingest_state.STATION_META),
+}
+
+STATE_FILE = "_state.json"
+
+def mirror_dir():
+    dbconnect.load_env()
+    return os.getenv('MIRROR_DIR', os.path.join(ROOT_DIR, 'data', 'mirror'))
+
+def _require_duckdb():
+    if duckdb is None:
+        raise RuntimeError("duckdb is not installed (pip install duckdb)")
+
+# =============================================================================
+# Mirror state (_state.json): 마지막으로 복제한 워터마크
+# =============================================================================
+_state = None
+_state_lock = threading.Lock()
+
+def load_state():
+    global _state
+    with _state_lock:
+        if _state is None:
+            path = os.path.join(mirror_dir(), STATE_FILE)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    _state = json.load(f)
+            else:
+                _state = {"versions": {}, "refreshed_at": None}
+        return _state
+
+def _save_state(state):
+    global _state
+    path = os.path.join(mirror_dir(), STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    with _state_lock:
+        _state = state
+
+def data_version():
+    # 결과 캐시 워터마크: 미러에 실제로 반영된 버전 (MySQL 버전이 아님)
+    versions = load_state()["versions"]
+    return tuple(sorted((k, int(v)) for k, v in versions.items()))
+
+# =============================================================================
+# Export (MySQL -> Parquet)
+# =============================================================================
+def _plain_frame(df):
+    # Decimal(SUM, 좌표) -> float, DATE -> datetime (DuckDB 가 타입을 바로 인식하도록)
+    for col in df.columns:
+        if df[col].dtype == object:
+            sample = df[col].dropna()
+            if not sample.empty and isinstance(sample.iloc[0], decimal.Decimal):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+    if "pasngDate" in df.columns:
+        df["pasngDate"] = pd.to_datetime(df["pasngDate"])
+    return df
+
+def _write_parquet(df, path):
+    # 임시 파일에 쓰고 교체 -> 읽는 쪽은 항상 완성된 파일만 봄
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    select = "SELECT * REPLACE (CAST(pasngDate AS DATE) AS pasngDate) FROM slice_df" if "pasngDate" in df.columns else "SELECT * FROM slice_df"
+    con = duckdb.connect()
+    try:
+        con.register("slice_df", df)
+        con.execute(f"COPY ({select}) TO '{tmp.replace(chr(39), chr(39) * 2)}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+    finally:
+        con.close()
+    os.replace(tmp, path)
+
+def _export(conn, table, where, params, path):
+    columns, _, _ = MIRROR_TABLES[table]
+    sql = f"SELECT {', '.join(columns)} FROM `{table}` WHERE {where}"
+    df = pd.read_sql(sql, conn, params=params)
+    if df.empty:
+        # MySQL 에서 사라진 조각은 미러에서도 삭제
+        if os.path.exists(path):
+            os.remove(path)
+        return 0
+    _write_parquet(_plain_frame(df), path)
+    return len(df)
+
+def _table_path(table, *parts):
+    return os.path.join(mirror_dir(), table, *parts)
+
+def _export_dates(conn, dates):
+    rows = 0
+    for d in dates:
+        day = pd.Timestamp(d).date()
+        for table in (ingest_state.TRAFFIC_LOG, ROLLUP_TABLE):
+            path = _table_path(table, str(day.year), f"{day.isoformat()}.parquet")
+            rows += _export(conn, table, "pasngDate = %s", (day.isoformat(),), path)
+    return rows
+
+def _export_years(conn, table):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT DISTINCT pasngYear FROM `{table}`")
+    rows = 0
+    for (year,) in cursor.fetchall():
+        path = _table_path(table, str(year), f"{year}.parquet")
+        rows += _export(conn, table, "pasngYear = %s", (int(year),), path)
+    return rows
+
+def refresh(full=False):
+    """
+    Bring the Parquet mirror up to date with MySQL.
+    Only tables whose ingest_state version moved are exported; for the traffic log and
+    rollup only the dates recorded in ingest_changes since the mirrored version are rewritten.
+    """
+    _require_duckdb()
+    if full:
+        # 전체 재구축: MySQL 에서 지워진 날짜 파일까지 정리
+        for table in MIRROR_TABLES:
+            shutil.rmtree(_table_path(table), ignore_errors=True)
+        state = {"versions": {}}
+    else:
+        state = dict(load_state())
+    versions = dict(state.get("versions", {}))
+    summary = {"dates": 0, "rows": 0, "tables": []}
+
+    conn = db_pool.get_pool().acquire()
+    try:
+        cursor = conn.cursor()
+        watermark = dict(ingest_state.read_watermark(cursor))
+
+        # 1) 교통 로그 + 롤업: 바뀐 날짜만
+        mirrored = versions.get(ingest_state.TRAFFIC_LOG)
+        current = watermark.get(ingest_state.TRAFFIC_LOG, 0)
+        if full or mirrored != current or not os.path.isdir(_table_path(ROLLUP_TABLE)):
+            dates = None
+            if not full and mirrored is not None and mirrored <= current and os.path.isdir(_table_path(ROLLUP_TABLE)):
+                try:
+                    dates = ingest_state.changed_dates(cursor, ingest_state.TRAFFIC_LOG, mirrored, current)
+                except Exception as e:
+                    # ingest_changes 가 없는 DB (마이그레이션 0007 전): 전체 날짜를 다시 내보냄
+                    print(f"⚠️ ingest_changes not readable, exporting all dates: {e}")
+            if dates is None:
+                cursor.execute(f"SELECT DISTINCT pasngDate FROM {ROLLUP_TABLE}")
+                dates = [row[0] for row in cursor.fetchall()]
+            summary["rows"] += _export_dates(conn, dates)
+            summary["dates"] = len(dates)
+            summary["tables"] += [ingest_state.TRAFFIC_LOG, ROLLUP_TABLE]
+            versions[ingest_state.TRAFFIC_LOG] = current
+
+        # 2) 과거 노인 테이블(연도 단위), 역 메타(파일 하나): 버전이 바뀌면 통째로
+        for table in (ingest_state.SENIOR_LOG, ingest_state.STATION_META):
+            key = MIRROR_TABLES[table][2]
+            if not full and table in versions and versions[table] == watermark.get(key, 0):
+                continue
+            try:
+                if MIRROR_TABLES[table][1] == "year":
+                    summary["rows"] += _export_years(conn, table)
+                else:
+                    summary["rows"] += _export(conn, table, "1=1", None, _table_path(table, f"{table}.parquet"))
+            except Exception as e:
+                # 과거 테이블은 선택 사항 (없으면 API 가 빈 DataFrame 으로 대체)
+                print(f"⚠️ Mirror skipped `{table}`: {e}")
+                continue
+            versions[table] = watermark.get(key, 0)
+            summary["tables"].append(table)
+    except Exception as e:
+        if db_pool.connection_lost(e):
+            conn.discard()
+        raise
+    finally:
+        conn.close()
+
+    state["versions"] = versions
+    state["refreshed_at"] = time.strftime('%Y-%m-%d %H:%M:%S')
+    _save_state(state)
+    _create_views()
+    return summary
+
+# =============================================================================
+# Query (DuckDB)
+# =============================================================================
+_duck = None
+_duck_lock = threading.Lock()
+
+def _glob(table):
+    partitioned = MIRROR_TABLES[table][1] is not None
+    pattern = os.path.join(mirror_dir(), table, "*", "*.parquet") if partitioned \
+        else os.path.join(mirror_dir(), table, "*.parquet")
+    return pattern.replace("'", "''")
+
+def _create_views():
+    global _duck
+    _require_duckdb()
+    with _duck_lock:
+        if _duck is None:
+            _duck = duckdb.connect(database=':memory:')
+        for table in MIRROR_TABLES:
+            if not os.path.isdir(_table_path(table)):
+                continue
+            _duck.execute(f"""CREATE OR REPLACE VIEW "{table}" AS SELECT * FROM read_parquet('{_glob(table)}')""")
+        return _duck
+
+def _get_duck():
+    return _duck if _duck is not None else _create_views()
+
+def to_duckdb_sql(sql, has_params):
+    # main.py 의 MySQL 쿼리를 그대로 사용: `식별자` -> "식별자", %s -> ?
+    sql = sql.replace('`', '"')
+    if has_params:
+        sql = sql.replace('%%', '\x00').replace('%s', '?').replace('\x00', '%')
+    return sql
+
+def read_sql(sql, params=None):
+    cursor = _get_duck().cursor()  # 스레드마다 별도 커서 (DuckDB 권장 방식)
+    try:
+        return cursor.execute(to_duckdb_sql(sql, params is not None), list(params or [])).df()
+    finally:
+        cursor.close()
+
+# =============================================================================
+# Background refresh (앱 실행 중 주기적으로 증분 갱신)
+# =============================================================================
+_stop = threading.Event()
+_thread = None
+
+def _refresh_loop(interval):
+    while not _stop.is_set():
+        try:
+            summary = refresh()
+            if summary["tables"]:
+                print(f"✅ Mirror refreshed: {summary}")
+        except Exception as e:
+            print(f"⚠️ Mirror refresh failed: {e}")
+        _stop.wait(interval)
+
+def start_background_refresh():
+    global _thread
+    if _thread is not None:
+        return
+    dbconnect.load_env()
+    _stop.clear()
+    _thread = threading.Thread(
+        target=_refresh_loop,
+        args=(float(os.getenv('MIRROR_REFRESH_INTERVAL', 60)),),
+        name="mirror-refresh",
+        daemon=True,
+    )
+    _thread.start()
+
+def stop_background_refresh():
+    global _thread
+    _stop.set()
+    _thread = None
+
+def status():
+    state = load_state()
+    files = {}
+    for table in MIRROR_TABLES:
+        path = _table_path(table)
+        count = 0
+        for _, _, names in os.walk(path):
+            count += sum(1 for n in names if n.endswith('.parquet'))
+        files[table] = count
+    return {"mirror_dir": mirror_dir(), "files": files, **state}
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "refresh"
+    try:
+        if command == "status":
+            print(json.dumps(status(), ensure_ascii=False, indent=1))
+        elif command in ("refresh", "rebuild"):
+            started = time.perf_counter()
+            summary = refresh(full=(command == "rebuild"))
+            print(f"✅ Mirror {command} 완료 ({time.perf_counter() - started:.1f}s): {summary}")
+        else:
+            print("사용법: python analytics_mirror.py [refresh | rebuild | status]")
+    except Exception as e:
+        print(f"❌ Mirror {command} 실패: {e}")
+    finally:
+        db_pool.close_pool()
@@ -0,0 +1,291 @@
+import csv
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+import ingest_state
+
+# =============================================================================
+# [INGEST] BULK WRITER - 행마다 cursor.execute 하던 upsert 를 묶음(set-based) 쓰기로
+# 1. 검증 / 형변환을 DataFrame 단위로 한 번에 (잘못된 행은 사유와 함께 rejected 로 모음)
+# 2. 세션 임시 테이블(staging)에 여러 행 INSERT (executemany -> 다중 VALUES 문)
+#    또는 LOAD DATA LOCAL INFILE (method="load", 연결에 local_infile 필요)
+# 3. 대상 테이블에 INSERT ... SELECT ... ON DUPLICATE KEY UPDATE 한 문장으로 반영
+#    -> 신규 행 수는 반영 전 staging 과 대상의 키 비교로 정확히 계산 (table_stats)
+# - 데이터 / 통계 / 워터마크가 한 트랜잭션으로 커밋됨 (노트북의 기존 동작과 같음)
+# =============================================================================
+
+STAGE_BATCH = 5000  # staging 에 한 번에 보내는 행 수 (실패 시 이 단위로 나눠서 원인 행을 찾음)
+
+@dataclass(frozen=True)
+class TableSpec:
+    """Target table: insert columns, column rules and how its unique key maps onto staging columns."""
+    table: str
+    columns: Tuple[str, ...]
+    # 대상 유니크 키 컬럼 -> staging 컬럼으로 계산하는 식 (생성 컬럼 규칙과 같게)
+    key: Dict[str, str]
+    update: Tuple[str, ...]
+    ints: Tuple[str, ...] = ()
+    floats: Tuple[str, ...] = ()
+    dates: Tuple[str, ...] = ()          # 'YYYYMMDD'
+    codes: Tuple[str, ...] = ()          # 역코드: station_code() 로 4자리 표준화한 뒤 길이 검사
+    max_length: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def stage(self):
+        return "_stage_" + re.sub(r"\W", "_", self.table)
+
+_LOG_KEY = {
+    "pasngDate": "STR_TO_DATE(s.pasngDe, '%Y%m%d')",
+    "pasngHr": "s.pasngHr",
+    "stnKey": "LPAD(TRIM(s.stnCd), 4, '0')",
+    "trnscdUserSeCd": "s.trnscdUserSeCd",
+}
+_LOG_COLUMNS = ('UserGroup', 'pasngDe', 'pasngHr', 'lineNm', 'stnCd', 'stnNm', 'trnscdUserSeCd', 'rideNope', 'gffNope')
+# stnCd 는 4자까지 (stnKey = LPAD(stnCd, 4) 가 긴 코드를 자르지 않도록, 테이블 CHECK 제약과 같음)
+_LOG_LENGTHS = {'UserGroup': 50, 'pasngDe': 20, 'lineNm': 50, 'stnCd': 4, 'stnNm': 50, 'trnscdUserSeCd': 10}
+
+TRAFFIC_LOG = TableSpec(
+    table=ingest_state.TRAFFIC_LOG, columns=_LOG_COLUMNS, key=_LOG_KEY,
+    update=('rideNope', 'gffNope'), ints=('pasngHr', 'rideNope', 'gffNope'), dates=('pasngDe',),
+    codes=('stnCd',), max_length=_LOG_LENGTHS,
+)
+SENIOR_LOG = TableSpec(
+    table=ingest_state.SENIOR_LOG, columns=_LOG_COLUMNS, key=_LOG_KEY,
+    update=('rideNope', 'gffNope'), ints=('pasngHr', 'rideNope', 'gffNope'), dates=('pasngDe',),
+    codes=('stnCd',), max_length=_LOG_LENGTHS,
+)
+STATION_META = TableSpec(
+    table=ingest_state.STATION_META, columns=('stnCd', 'stnNm', 'lineNm', 'lat', 'lon'),
+    key={"stnKey": "LPAD(TRIM(s.stnCd), 4, '0')"},
+    update=('stnNm', 'lineNm', 'lat', 'lon'), floats=('lat', 'lon'), codes=('stnCd',),
+    max_length={'stnCd': 4, 'stnNm': 50, 'lineNm': 50},
+)
+
+@dataclass
+class WriteResult:
+    table: str
+    rows: int = 0          # 대상에 반영한 행 수
+    inserted: int = 0      # 그중 새로 들어간 행 (나머지는 기존 행 갱신)
+    seconds: float = 0.0
+    rejected: Optional[pd.DataFrame] = None  # 원본 컬럼 + reason
+
+    @property
+    def rejected_count(self):
+        return 0 if self.rejected is None else len(self.rejected)
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        text = (f"{self.table}: {self.rows:,}건 반영 (신규 {self.inserted:,}), "
+                f"{self.seconds:.1f}s ({self.rows_per_sec:,.0f} rows/s)")
+        if self.rejected_count:
+            reasons = self.rejected['reason'].value_counts().head(5)
+            text += f"\n⚠️ 거부된 행 {self.rejected_count:,}건: " + ", ".join(f"{r} x{n}" for r, n in reasons.items())
+        return text
+
+# =============================================================================
+# 1. Validation (벡터 연산)
+# =============================================================================
+def station_code(values):
+    """
+    Normalize station codes the way stnKey does: strip, drop a float suffix, left-pad to 4.
+    150 / "150" / "150.0" / " 0150 " -> "0150"; longer codes stay long so validate rejects them.
+    """
+    # CSV 에 빈 값이 섞이면 역코드가 float 로 읽혀 150.0 이 됨 (rollup.station_key 와 같은 규칙)
+    return values.astype(str).str.strip().str.replace(r"\.0+$", "", regex=True).str.zfill(4)
+
+def validate(df, spec):
+    """
+    Cast columns to the spec and split off rows that cannot be written.
+    Returns (clean, rejected) where rejected keeps the original values plus a 'reason' column.
+    """
+    missing = [c for c in spec.columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"{spec.table}: missing columns {missing}")
+
+    clean = df[list(spec.columns)].copy()
+    reason = pd.Series(None, index=clean.index, dtype=object)
+
+    def reject(mask, text):
+        # 행마다 첫 번째 사유만 남김
+        reason[mask & reason.isna()] = text
+
+    for col in spec.ints + spec.floats:
+        values = pd.to_numeric(clean[col], errors='coerce')
+        reject(values.isna(), f"invalid {col}")
+        if col in spec.ints:
+            reject(values.notna() & (values % 1 != 0), f"invalid {col}")
+        clean[col] = values
+
+    for col in spec.dates:
+        text = clean[col].astype(str).str.strip().str.replace('-', '', regex=False)
+        parsed = pd.to_datetime(text, format='%Y%m%d', errors='coerce')
+        reject(parsed.isna(), f"invalid {col}")
+        clean[col] = text
+
+    numeric = set(spec.ints + spec.floats)
+    for col in spec.columns:
+        if col in numeric:
+            continue
+        text = clean[col].where(clean[col].notna(), None)
+        blank = text.isna() | (text.astype(str).str.strip() == '')
+        reject(blank, f"missing {col}")
+        clean[col] = station_code(text) if col in spec.codes else text.astype(str).str.strip()
+        limit = spec.max_length.get(col)
+        if limit:
+            reject(clean[col].str.len() > limit, f"{col} too long")
+
+    bad = reason.notna()
+    rejected = df.loc[bad].copy()
+    rejected['reason'] = reason[bad]
+    clean = clean.loc[~bad]
+    for col in spec.ints:
+        clean[col] = clean[col].astype('int64')
+    return clean, rejected
+
+def _records(frame):
+    # numpy 스칼라 대신 파이썬 값으로 (드라이버 이스케이프 규칙 그대로)
+    return frame.astype(object).where(frame.notna(), None).values.tolist()
+
+# =============================================================================
+# 2. Staging
+# =============================================================================
+def _create_stage(cursor, spec):
+    # 대상 테이블의 입력 컬럼 타입을 그대로 복사한 세션 임시 테이블 (생성 컬럼 / 인덱스 없음)
+    cols = ", ".join(spec.columns)
+    cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS `{spec.stage}` AS SELECT {cols} FROM `{spec.table}` LIMIT 0")
+    # TRUNCATE 는 암묵적 커밋을 일으키므로 DELETE 로 비움 (트랜잭션 유지)
+    cursor.execute(f"DELETE FROM `{spec.stage}`")
+
+def _stage_insert_sql(spec):
+    cols = ", ".join(spec.columns)
+    marks = ", ".join(["%s"] * len(spec.columns))
+    return f"INSERT INTO `{spec.stage}` ({cols}) VALUES ({marks})"
+
+def _stage_rows(cursor, sql, records, rejected):
+    """executemany one batch; on failure split it in half until the offending rows are isolated."""
+    # 배치가 여러 문장으로 나뉘어 일부만 들어가는 경우까지 되돌리도록 savepoint 사용
+    cursor.execute("SAVEPOINT stage_batch")
+    try:
+        cursor.executemany(sql, records)
+        return len(records)
+    except Exception as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT stage_batch")
+        if len(records) == 1:
+            rejected.append((records[0], str(e)))
+            return 0
+    mid = len(records) // 2
+    return _stage_rows(cursor, sql, records[:mid], rejected) + _stage_rows(cursor, sql, records[mid:], rejected)
+
+def _stage_insert(cursor, spec, clean, batch_size):
+    sql = _stage_insert_sql(spec)
+    failed = []
+    staged = 0
+    records = _records(clean)
+    for i in range(0, len(records), batch_size):
+        staged += _stage_rows(cursor, sql, records[i:i + batch_size], failed)
+    rejected = pd.DataFrame([r for r, _ in failed], columns=list(spec.columns))
+    rejected['reason'] = [err for _, err in failed]
+    return staged, rejected
+
+def _stage_load(cursor, spec, clean, batch_size):
+    # 탭 구분 임시 파일 -> LOAD DATA LOCAL INFILE (검증을 통과한 행에는 NULL 이 없음)
+    # LOCAL 은 행 오류를 경고로 바꿔 건너뛰거나 잘라 넣으므로, 경고가 있거나 행 수가 다르면
+    # 되돌리고 INSERT 경로로 다시 넣음 -> 거부된 행 보고가 두 방식에서 같음
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter="\t", lineterminator="\n", quoting=csv.QUOTE_NONE, escapechar="\\")
+            for row in _records(clean):
+                writer.writerow(row)
+        cursor.execute("SAVEPOINT stage_load")
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE `{spec.stage}` CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({', '.join(spec.columns)})",
+            (path,)
+        )
+        loaded = cursor.rowcount
+        cursor.execute("SHOW COUNT(*) WARNINGS")
+        warnings = int(cursor.fetchone()[0])
+    finally:
+        os.remove(path)
+
+    if loaded == len(clean) and not warnings:
+        return loaded, pd.DataFrame(columns=list(spec.columns) + ['reason'])
+    cursor.execute("ROLLBACK TO SAVEPOINT stage_load")
+    return _stage_insert(cursor, spec, clean, batch_size)
+
+# =============================================================================
+# 3. Set-based upsert
+# =============================================================================
+def _count_new(cursor, spec):
+    keys = list(spec.key.items())
+    select = ", ".join(f"{expr} AS {col}" for col, expr in keys)
+    join = " AND ".join(f"t.{col} = n.{col}" for col, _ in keys)
+    first = keys[0][0]
+    cursor.execute(
+        f"SELECT COUNT(*) FROM (SELECT DISTINCT {select} FROM `{spec.stage}` s) n "
+        f"LEFT JOIN `{spec.table}` t ON {join} WHERE t.{first} IS NULL"
+    )
+    return int(cursor.fetchone()[0])
+
+def _merge(cursor, spec):
+    cols = ", ".join(spec.columns)
+    updates = ", ".join(f"{c} = VALUES({c})" for c in spec.update)
+    cursor.execute(
+        f"INSERT INTO `{spec.table}` ({cols}) SELECT {cols} FROM `{spec.stage}` "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+def upsert(conn, spec, df, method="insert", batch_size=STAGE_BATCH, track_stats=True, bump=False):
+    """
+    Validate `df`, stage it and upsert it into `spec.table` in one transaction.
+    method: "insert" (multi-row executemany) or "load" (LOAD DATA LOCAL INFILE; needs local_infile).
+    track_stats: add the new-row count / latest date to table_stats (skipped with a warning when
+                 table_stats does not exist yet, i.e. before migration 0006 / create_table_7.sql).
+    bump: also raise the ingest_state watermark (callers that refresh the rollup get it from there).
+    Returns a WriteResult; rows that could not be written are in result.rejected, not raised.
+    """
+    started = time.perf_counter()
+    clean, rejected = validate(df, spec)
+    result = WriteResult(spec.table)
+    if clean.empty:
+        result.rejected = rejected
+        return result
+
+    cursor = conn.cursor()
+    try:
+        if track_stats and not ingest_state.has_table_stats(cursor):
+            track_stats = False
+        _create_stage(cursor, spec)
+        if method == "load":
+            staged, failed = _stage_load(cursor, spec, clean, batch_size)
+        else:
+            staged, failed = _stage_insert(cursor, spec, clean, batch_size)
+        result.inserted = _count_new(cursor, spec)
+        _merge(cursor, spec)
+        result.rows = staged
+
+        if track_stats:
+            latest = clean[spec.dates[0]].max() if spec.dates else None
+            ingest_state.add_rows(cursor, spec.table, result.inserted, latest)
+        if bump:
+            ingest_state.bump(cursor, spec.table)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    result.rejected = pd.concat([rejected, failed], ignore_index=True) if len(failed) else rejected
+    result.seconds = time.perf_counter() - started
+    return result
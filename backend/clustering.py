@@ -0,0 +1,132 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import QuantileTransformer
+
+# =============================================================================
+# [ENGINE] STATION CLUSTERING
+# - 입력: 역 x 24시간 이용량 행렬 (롤업에서 한 번의 GROUP BY 로 조회)
+# - 특징(feature) 세트
+#   ratios    : 오전(6~11시) / 오후(12~17시) 비율 2개 (기존 대시보드 방식)
+#   profile24 : 24시간 정규화 프로필 (각 시간 이용량 / 하루 합계)
+# - 알고리즘: kmeans (n_init=20) / minibatch (역 수가 많을 때)
+# - 결과는 (입력 행렬 + 파라미터) 해시로 메모리에 보관 -> 같은 데이터면 재계산 없음
+# =============================================================================
+
+FEATURE_SETS = ("ratios", "profile24")
+ALGORITHMS = ("kmeans", "minibatch")
+MIN_TOTAL = 500          # 이용량이 너무 적은 역 제외 (기존 HAVING total > 500)
+MORNING = range(6, 12)
+AFTERNOON = range(12, 18)
+EVENING = range(18, 24)
+
+_CACHE_SIZE = 32
+_results = OrderedDict()  # hash -> (labels, names, bands)
+_lock = threading.Lock()
+
+def hourly_matrix(df_hourly):
+    # (stnCd, stnNm, pasngHr, volume) long -> 역 x 24 행렬
+    wide = df_hourly.pivot_table(index=['stnCd', 'stnNm'], columns='pasngHr', values='volume', aggfunc='sum', fill_value=0)
+    wide = wide.reindex(columns=range(24), fill_value=0)
+    return wide.index.to_frame(index=False), wide.to_numpy(dtype=float)
+
+def station_features(H):
+    # 모든 역을 배열 연산으로 한 번에 (행 단위 apply 없음)
+    total = H.sum(axis=1)
+    safe_total = np.where(total > 0, total, 1)
+    return {
+        "total": total,
+        "morning": H[:, list(MORNING)].sum(axis=1),
+        "afternoon": H[:, list(AFTERNOON)].sum(axis=1),
+        "evening": H[:, list(EVENING)].sum(axis=1),
+        "profile": H / safe_total[:, None],
+    }
+
+def feature_matrix(feats, feature_set):
+    total = np.where(feats["total"] > 0, feats["total"], 1)
+    if feature_set == "profile24":
+        return feats["profile"]
+    return np.column_stack([feats["morning"] / total, feats["afternoon"] / total])
+
+def _fit_labels(X, k, feature_set, algorithm, seed=42):
+    if feature_set == "ratios":
+        # 비율 특징은 분포가 한쪽으로 몰려 있어 분위수 변환 후 군집화 (기존 UI 와 동일)
+        X = QuantileTransformer(
+            n_quantiles=min(len(X), 100), output_distribution='uniform', random_state=seed
+        ).fit_transform(X)
+    if algorithm == "minibatch":
+        model = MiniBatchKMeans(n_clusters=k, random_state=seed, n_init=3, batch_size=1024)
+    else:
+        model = KMeans(n_clusters=k, random_state=seed, n_init=20)
+    return model.fit_predict(X)
+
+def _name_clusters(labels, morning_ratio, afternoon_ratio, k):
+    """
+    Relabel clusters so ids are stable across runs: 0 = most morning-leaning ... k-1 = most
+    afternoon-leaning. Each gets a TYPE letter and an AM / PM / MIX band from its mean ratios.
+    """
+    lean = np.array([
+        (morning_ratio[labels == c].mean() - afternoon_ratio[labels == c].mean()) if np.any(labels == c) else 0
+        for c in range(k)
+    ])
+    order = np.argsort(-lean, kind='stable')
+    remap = np.empty(k, dtype=int)
+    remap[order] = np.arange(k)
+    new_labels = remap[labels]
+    sorted_lean = lean[order]
+    bands = np.where(sorted_lean > 0.05, "AM", np.where(sorted_lean < -0.05, "PM", "MIX"))
+    names = np.array([f"TYPE {chr(65 + i)} ({bands[i]})" for i in range(k)])
+    return new_labels, names, bands
+
+def _digest(X, k, feature_set, algorithm):
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X).tobytes())
+    h.update(repr((X.shape, k, feature_set, algorithm)).encode('utf-8'))
+    return h.hexdigest()
+
+def cluster_stations(df_hourly, k=3, feature_set="ratios", algorithm="kmeans"):
+    """
+    Cluster stations from their hourly volumes.
+    Returns one row per station with the raw volumes, ratios, cluster id / name / band.
+    """
+    stations, H = hourly_matrix(df_hourly)
+    feats = station_features(H)
+    keep = feats["total"] > MIN_TOTAL
+    stations = stations[keep].reset_index(drop=True)
+    feats = {name: values[keep] for name, values in feats.items()}
+    if len(stations) < k:
+        raise ValueError(f"not enough stations for k={k} (got {len(stations)})")
+
+    X = feature_matrix(feats, feature_set)
+    total = np.where(feats["total"] > 0, feats["total"], 1)
+    morning_ratio, afternoon_ratio = feats["morning"] / total, feats["afternoon"] / total
+
+    key = _digest(X, k, feature_set, algorithm)
+    with _lock:
+        hit = _results.get(key)
+        if hit is not None:
+            _results.move_to_end(key)
+    if hit is None:
+        labels = _fit_labels(X, k, feature_set, algorithm)
+        hit = _name_clusters(labels, morning_ratio, afternoon_ratio, k)
+        with _lock:
+            _results[key] = hit
+            while len(_results) > _CACHE_SIZE:
+                _results.popitem(last=False)
+    labels, names, bands = hit
+
+    out = stations.assign(
+        total=feats["total"],
+        morning=feats["morning"],
+        afternoon=feats["afternoon"],
+        evening=feats["evening"],
+        morning_ratio=morning_ratio,
+        afternoon_ratio=afternoon_ratio,
+        cluster=labels,
+        cluster_name=names[labels],
+        band=bands[labels],
+    )
+    return out
@@ -0,0 +1,126 @@
+import functools
+import gzip
+import os
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+import dbconnect
+
+try:
+    import brotli
+except ImportError:  # brotli 패키지가 없으면 gzip 만 협상
+    brotli = None
+
+# =============================================================================
+# [CORE] RESPONSE COMPRESSION
+# - Accept-Encoding 에 따라 br(brotli) > gzip 순으로 선택
+# - 작은 응답(API_COMPRESS_MIN_SIZE 바이트 미만, 기본 1024)은 그대로 전송
+# - 큰 응답(API_COMPRESS_THREAD_SIZE 바이트 이상, 기본 65536)은 압축을 스레드로 넘겨 이벤트 루프를 막지 않음
+# - 이미 인코딩된 응답이 아니면 압축 여부와 상관없이 Vary: Accept-Encoding (캐시가 섞지 않도록)
+# - 설정: API_GZIP_LEVEL (기본 6), API_BROTLI_QUALITY (기본 4, 0~11)
+# =============================================================================
+
+def _accepted_encodings(scope):
+    accepted = set()
+    for token in Headers(scope=scope).get("accept-encoding", "").split(","):
+        name, _, params = token.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:  # "gzip;q=0" 은 거부 의사 표시
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that buffers a response and compresses it when it is large enough.
+    Responses that already carry a Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4, thread_min_size=65536):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope):
+        accepted = _accepted_encodings(scope)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, encoding, body):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def _compress_body(self, encoding, body):
+        if len(body) < self.thread_min_size:
+            return self._compress(encoding, body)
+        # gzip / brotli 는 GIL 을 풀고 돌기 때문에 스레드에서 돌리면 다른 요청을 계속 처리할 수 있음
+        return await anyio.to_thread.run_sync(functools.partial(self._compress, encoding, body))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose(scope)
+        if encoding is None:
+            async def send_uncompressed(message):
+                # 압축을 받지 않는 클라이언트에게도 Vary 를 붙여 캐시가 압축본과 섞지 않게 함
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(raw=message["headers"])
+                    if "content-encoding" not in headers:
+                        headers.add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_uncompressed)
+            return
+
+        start = None
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            if "content-encoding" not in headers:
+                headers.add_vary_header("Accept-Encoding")
+                if len(body) >= self.minimum_size:
+                    body = await self._compress_body(encoding, body)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+def add_compression(app):
+    dbconnect.load_env()
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv('API_COMPRESS_MIN_SIZE', 1024)),
+        gzip_level=int(os.getenv('API_GZIP_LEVEL', 6)),
+        brotli_quality=int(os.getenv('API_BROTLI_QUALITY', 4)),
+        thread_min_size=int(os.getenv('API_COMPRESS_THREAD_SIZE', 65536)),
+    )
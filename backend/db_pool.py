@@ -0,0 +1,516 @@
+import os
+import queue
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pymysql
+
+import dbconnect
+import metrics
+
+# =============================================================================
+# [CORE] CONNECTION POOL
+# - 앱 시작 시 한 번 생성, 요청마다 따뜻한(warm) 연결을 재사용
+# - 환경변수로 크기/대기시간/재활용 주기 설정
+#   DB_POOL_SIZE (기본 8), DB_POOL_MIN (기본 2), DB_POOL_TIMEOUT (초, 기본 10),
+#   DB_POOL_RECYCLE (초, 기본 1800), DB_POOL_PING_INTERVAL (초, 기본 30)
+# - 연결마다 서버 측 prepared statement 캐시 (아래 StatementCache)
+#   DB_PREPARED_STATEMENTS (기본 1, 0 이면 끔), DB_STMT_CACHE_SIZE (연결당 문장 수, 기본 64)
+#   바인딩과 실행을 multi-statement 한 번으로 보내므로 일반 쿼리와 같은 1회 왕복
+#   (효과는 쿼리/네트워크마다 다르니 benchmarks/bench_prepared.py 로 확인)
+# =============================================================================
+
+class PoolTimeout(Exception):
+    pass
+
+# 연결 자체를 못 쓰게 된 오류 코드 (서버 재시작 / wait_timeout / KILL / 네트워크 단절)
+#   1053 서버 종료 중, 1927 연결 KILL, 2006 server has gone away, 2013 쿼리 중 연결 끊김,
+#   2014 commands out of sync, 2055 연결 끊김(소켓 오류), 4031 비활성으로 서버가 끊음
+CONNECTION_LOST_CODES = {1053, 1927, 2006, 2013, 2014, 2055, 4031}
+
+def connection_lost(exc):
+    """
+    True if exc means the connection itself is unusable (not just a failed query).
+    Follows __cause__ / __context__, since pd.read_sql wraps driver errors in its own DatabaseError.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, pymysql.err.InterfaceError):
+            return True
+        if isinstance(exc, pymysql.err.MySQLError) and exc.args and exc.args[0] in CONNECTION_LOST_CODES:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+class PooledConnection:
+    """
+    Thin proxy around a pymysql connection.
+    close() hands the connection back to the pool instead of closing the socket,
+    so existing `finally: conn.close()` blocks keep working unchanged.
+    Connections that died in use are discarded instead: explicitly via discard() /
+    `with` on a connection_lost() error, or by close() when the driver already dropped the socket.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def read_prepared(self, sql, params=None):
+        # 이 물리 연결에 묶인 prepared statement 캐시로 실행 (풀에 반납돼도 연결과 함께 유지)
+        return self._pool.statements_for(self._raw).read_sql(self._raw, sql, params)
+
+    def close(self):
+        if self._released:
+            return
+        if not getattr(self._raw, 'open', True):
+            # 사용 중 끊긴 연결 (pymysql 이 소켓을 이미 닫음): 호출부가 오류를 삼켰어도 반납하지 않음
+            self.discard()
+            return
+        self._released = True
+        self._pool.release(self._raw, self._created_at)
+
+    def discard(self):
+        # 오류로 상태가 의심스러운 연결은 풀에 돌려보내지 않고 폐기
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._raw, self._created_at, broken=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and connection_lost(exc):
+            self.discard()
+        else:
+            self.close()
+
+
+class ConnectionPool:
+    def __init__(self, database, size=8, min_size=2, timeout=10.0, recycle=1800, ping_interval=30,
+                 stmt_cache_size=64):
+        self.database = database
+        self.size = size
+        self.min_size = min(min_size, size)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self.stmt_cache_size = stmt_cache_size
+
+        # LIFO: 가장 최근에 쓴 연결부터 재사용 (오래 쉰 연결은 자연스럽게 recycle 대상)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "created": 0,
+            "recycled": 0,
+            "ping_failures": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "stmt_prepared": 0,
+            "stmt_executed": 0,
+            "stmt_evicted": 0,
+            "stmt_fallbacks": 0,
+        }
+        self._in_use = 0
+        # 물리 연결 -> StatementCache (연결을 닫을 때 _close_quietly 가 항목을 지움)
+        # 값은 연결을 참조하지 않으므로 놓친 항목도 연결이 GC 되면 같이 사라짐
+        self._statements = weakref.WeakKeyDictionary()
+
+    # -------------------------------------------------------------------------
+    def _connect(self):
+        raw = dbconnect.MydbConnect(self.database, multi_statements=PREPARED_STATEMENTS)
+        # 조회 전용 워크로드: 트랜잭션 스냅샷이 재사용 연결에 남지 않도록 autocommit
+        raw.autocommit(True)
+        with self._lock:
+            self._stats["created"] += 1
+        return raw, time.monotonic()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def statements_for(self, raw):
+        with self._lock:
+            cache = self._statements.get(raw)
+            if cache is None:
+                cache = self._statements[raw] = StatementCache(self.stmt_cache_size, self._count)
+            return cache
+
+    def _close_quietly(self, raw):
+        # 재활용 / 폐기 / 풀 종료 모두 여기를 거침 -> 문장 캐시도 함께 정리
+        with self._lock:
+            self._statements.pop(raw, None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def prefill(self):
+        # 시작 시 최소 연결 확보 (DB가 죽어 있어도 앱 기동은 계속)
+        for _ in range(self.min_size - self._idle.qsize()):
+            try:
+                raw, created_at = self._connect()
+            except Exception as e:
+                print(f"⚠️ Pool prefill skipped: {e}")
+                return
+            self._idle.put((raw, created_at, time.monotonic()))
+
+    def _checkout_idle(self):
+        # 유휴 연결 중 건강한 것 하나를 꺼냄. 없으면 None
+        while True:
+            try:
+                raw, created_at, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+
+            now = time.monotonic()
+            if now - created_at > self.recycle:
+                self._close_quietly(raw)
+                with self._lock:
+                    self._stats["recycled"] += 1
+                continue
+
+            if now - last_used > self.ping_interval:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self._close_quietly(raw)
+                    with self._lock:
+                        self._stats["ping_failures"] += 1
+                    continue
+
+            return raw, created_at
+
+    def acquire(self):
+        if self._closed:
+            raise PoolTimeout("Pool is closed")
+
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"No DB connection available within {self.timeout}s (size={self.size})")
+
+        try:
+            found = self._checkout_idle()
+            raw, created_at = found if found else self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_ms_total"] += waited
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], waited)
+        return PooledConnection(self, raw, created_at)
+
+    def release(self, raw, created_at, broken=False):
+        with self._lock:
+            self._in_use -= 1
+            if broken:
+                self._stats["discarded"] += 1
+
+        if broken or self._closed:
+            self._close_quietly(raw)
+        else:
+            self._idle.put((raw, created_at, time.monotonic()))
+        self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                raw, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(raw)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            in_use = self._in_use
+            cached = sum(len(c) for c in self._statements.values())
+        checkouts = snapshot["checkouts"]
+        snapshot["wait_ms_avg"] = round(snapshot["wait_ms_total"] / checkouts, 3) if checkouts else 0.0
+        snapshot["wait_ms_total"] = round(snapshot["wait_ms_total"], 3)
+        snapshot["wait_ms_max"] = round(snapshot["wait_ms_max"], 3)
+        snapshot.update({
+            "database": self.database,
+            "size": self.size,
+            "in_use": in_use,
+            "idle": self._idle.qsize(),
+            "timeout_s": self.timeout,
+            "recycle_s": self.recycle,
+            "stmt_cached": cached,
+            "closed": self._closed,
+        })
+        return snapshot
+
+
+# =============================================================================
+# Prepared statements (연결당 캐시)
+# - pymysql 은 바이너리 프로토콜 prepare 를 지원하지 않으므로 SQL 수준 PREPARE / EXECUTE 사용
+# - 같은 문장은 연결마다 한 번만 파싱, 이후에는 바인딩 값(SET @p..)만 바꿔 EXECUTE
+# - [DEALLOCATE ..;] [PREPARE ..;] SET @p..; EXECUTE .. 를 한 번에 보내고 마지막 결과만 읽음
+#   (풀 연결은 CLIENT.MULTI_STATEMENTS 로 열림, 값 이스케이프는 그대로 드라이버가 처리)
+# - 문장 이름은 /metrics, /debug/slow-queries 의 query id 와 같은 해시 (stmt_<id>)
+#   해시가 겹치면 다른 문장을 덮어쓰지 않도록 이름마다 원문을 확인하고 접미사를 붙임
+# - SELECT / WITH 만 대상, 서버가 prepare 를 지원하지 않는 문장은 기존 방식으로 실행
+# =============================================================================
+ER_UNSUPPORTED_PS = 1295
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+_PLACEHOLDER = re.compile(r"%%|%s")
+
+def to_prepared(sql):
+    """Turn a pyformat (%s) statement into PREPARE syntax (?). Returns (text, n_params)."""
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group() == "%%":
+            return "%"
+        count += 1
+        return "?"
+    return _PLACEHOLDER.sub(replace, sql), count
+
+def _preparable(sql):
+    head = sql.lstrip()[:6].upper()
+    return head.startswith("SELECT") or head.startswith("WITH")
+
+class StatementCache:
+    """
+    LRU of server-side prepared statements for one physical connection.
+    Evicted statements are DEALLOCATEd so the server-wide max_prepared_stmt_count is respected.
+    The cache does not reference the connection; callers pass it to read_sql.
+    """
+
+    def __init__(self, size, count):
+        self.size = size
+        self._count = count
+        self._names = OrderedDict()   # sql -> (문장 이름, 파라미터 수)
+        self._owners = {}             # 문장 이름 -> sql (서버에 그 이름으로 준비된 원문)
+        self._unsupported = set()
+
+    def __len__(self):
+        return len(self._names)
+
+    def _clear(self):
+        self._names.clear()
+        self._owners.clear()
+
+    def _name_for(self, sql):
+        base = name = f"stmt_{metrics.statement_id(sql)}"
+        suffix = 1
+        while self._owners.get(name, sql) != sql:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        return name
+
+    def _register(self, sql, n_params):
+        # 새 문장을 캐시에 올리고, 넘친 문장 이름을 돌려줌 (같은 묶음 앞에서 DEALLOCATE)
+        name = self._name_for(sql)
+        self._names[sql] = (name, n_params)
+        self._owners[name] = sql
+        evicted = []
+        while len(self._names) > self.size:
+            _, (old, _) = self._names.popitem(last=False)
+            self._owners.pop(old, None)
+            evicted.append(old)
+        return name, evicted
+
+    def _forget(self, sql):
+        entry = self._names.pop(sql, None)
+        if entry is not None and self._owners.get(entry[0]) == sql:
+            del self._owners[entry[0]]
+
+    def _execute(self, cursor, sql, params):
+        batch, args = [], []
+        entry = self._names.get(sql)
+        fresh = entry is None or self._owners.get(entry[0]) != sql
+        if fresh:
+            text, n_params = to_prepared(sql)
+        else:
+            name, n_params = entry
+        params = list(params or [])
+        if len(params) != n_params:
+            raise ValueError(f"expected {n_params} parameters, got {len(params)}: {sql[:80]}")
+
+        if fresh:
+            name, evicted = self._register(sql, n_params)
+            batch += [f"DEALLOCATE PREPARE {old}" for old in evicted]
+            batch.append(f"PREPARE {name} FROM %s")
+            args.append(text)
+        else:
+            self._names.move_to_end(sql)
+        if n_params:
+            # 바인딩 값은 세션 변수로 전달 (이스케이프는 드라이버가 처리)
+            batch.append("SET " + ", ".join(f"@p{i} = %s" for i in range(n_params)))
+            batch.append(f"EXECUTE {name} USING " + ", ".join(f"@p{i}" for i in range(n_params)))
+            args += params
+        else:
+            batch.append(f"EXECUTE {name}")
+
+        try:
+            cursor.execute("; ".join(batch), args)
+            # 앞 문장(DEALLOCATE / PREPARE / SET)의 OK 결과를 건너뛰고 EXECUTE 결과로 이동
+            while cursor.description is None and cursor.nextset():
+                pass
+        except Exception:
+            if fresh:
+                # PREPARE 가 실패했을 수 있으므로 다음 호출에서 다시 준비
+                self._forget(sql)
+            raise
+        if fresh:
+            self._count("stmt_prepared")
+            if evicted:
+                self._count("stmt_evicted", len(evicted))
+        self._count("stmt_executed")
+        columns = [d[0] for d in cursor.description] if cursor.description else []
+        # pd.read_sql 과 같은 변환 (Decimal -> float)
+        rows = list(cursor.fetchall())
+        while cursor.nextset():
+            pass
+        return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+    def read_sql(self, raw, sql, params=None):
+        # 파라미터 없이 실행되는 문장의 % 는 리터럴이므로 (pymysql 규칙) 변환하지 않고 그대로 실행
+        literal_percent = params is None and "%" in sql
+        if isinstance(params, dict) or literal_percent or sql in self._unsupported or not _preparable(sql):
+            self._count("stmt_fallbacks")
+            return pd.read_sql(sql, raw, params=params)
+
+        cursor = raw.cursor()
+        try:
+            return self._execute(cursor, sql, params)
+        except pymysql.err.MySQLError as e:
+            code = e.args[0] if e.args else None
+            if code == ER_UNSUPPORTED_PS:
+                self._unsupported.add(sql)
+                self._count("stmt_fallbacks")
+                return pd.read_sql(sql, raw, params=params)
+            if code == ER_UNKNOWN_STMT_HANDLER:
+                # 서버 쪽 문장이 사라진 경우 (세션 초기화 등): 캐시를 비우고 한 번 다시 준비
+                self._clear()
+                return self._execute(cursor, sql, params)
+            raise
+        finally:
+            cursor.close()
+
+
+# =============================================================================
+# Module-level pool (main.py lifespan에서 생성/종료)
+# =============================================================================
+_pool = None
+
+def init_pool(database='seoul_urban_lab'):
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    dbconnect.load_env()
+    _pool = ConnectionPool(
+        database,
+        size=int(os.getenv('DB_POOL_SIZE', 8)),
+        min_size=int(os.getenv('DB_POOL_MIN', 2)),
+        timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        ping_interval=int(os.getenv('DB_POOL_PING_INTERVAL', 30)),
+        stmt_cache_size=int(os.getenv('DB_STMT_CACHE_SIZE', 64)),
+    )
+    _pool.prefill()
+    return _pool
+
+def get_pool():
+    # lifespan 밖(스크립트, 테스트 클라이언트 등)에서도 쓸 수 있도록 지연 생성
+    return _pool if _pool is not None else init_pool()
+
+def close_pool():
+    global _pool
+    shutdown_executor()
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+# =============================================================================
+# Query helpers
+# - 엔드포인트 안의 서로 독립적인 쿼리들을 풀의 별도 연결로 동시에 실행
+#   -> 응답 시간이 "쿼리 시간의 합"이 아니라 "가장 느린 쿼리"에 가까워짐
+# - DB_QUERY_WORKERS (기본 4): 동시에 실행할 쿼리 수 상한 (풀 크기보다 작게)
+# =============================================================================
+_executor = None
+_executor_lock = threading.Lock()
+
+dbconnect.load_env()
+PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', '1') == '1'
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            dbconnect.load_env()
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('DB_QUERY_WORKERS', 4)),
+                thread_name_prefix='sql'
+            )
+        return _executor
+
+def read_sql(sql, params=None):
+    # 연결 단절 오류면 폐기, 성공 / 일반 쿼리 오류면 풀에 반납 (PooledConnection.__exit__)
+    with get_pool().acquire() as conn:
+        if PREPARED_STATEMENTS:
+            return conn.read_prepared(sql, params)
+        return pd.read_sql(sql, conn, params=params)
+
+def read_sql_parallel(queries, fallbacks=None, reader=None):
+    """
+    Run independent queries concurrently, each on its own pooled connection.
+    queries: {name: sql} or {name: (sql, params)}
+    fallbacks: {name: DataFrame} returned instead of raising when that query fails
+               (e.g. the optional 22-24 history table is missing)
+    reader: function(sql, params) used per query (default: read_sql on the MySQL pool)
+    """
+    fallbacks = fallbacks or {}
+    reader = reader or read_sql
+    executor = _get_executor()
+    futures = {}
+    for name, query in queries.items():
+        sql, params = query if isinstance(query, tuple) else (query, None)
+        futures[name] = executor.submit(reader, sql, params)
+
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            if name not in fallbacks:
+                raise
+            print(f"⚠️ Query '{name}' failed, using fallback: {e}")
+            results[name] = fallbacks[name]
+    return results
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
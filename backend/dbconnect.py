@@ -1,15 +1,26 @@
 import pymysql
+from pymysql.constants import CLIENT
 import dotenv, os
 
-def MydbConnect(database, port=3306):
-    # .env 로드
+_env_loaded = False
+
+def load_env():
+    # .env 로드 (프로세스당 한 번만 읽음)
+    global _env_loaded
+    if _env_loaded:
+        return
+
     cur_dir = os.path.dirname(os.path.abspath(__file__))
     env_path = os.path.join(cur_dir, '.env')
-    
+
     if os.path.exists(env_path):
         dotenv.load_dotenv(env_path)
     else:
         dotenv.load_dotenv()
+    _env_loaded = True
+
+def MydbConnect(database, port=3306, local_infile=False, multi_statements=False):
+    load_env()
 
     host = os.getenv('DB_HOST')
     user = os.getenv('DB_USER')
@@ -25,10 +36,13 @@ def MydbConnect(database, port=3306):
             charset='utf8mb4',
             cursorclass=pymysql.cursors.Cursor,
             connect_timeout=10,  # 10초 넘으면 포기 (무한 대기 방지)
-            read_timeout=30      # 읽기 30초 제한
+            read_timeout=30,     # 읽기 30초 제한
+            local_infile=local_infile,  # bulk_writer 의 LOAD DATA LOCAL INFILE 용 (기본 끔)
+            # db_pool 의 prepared statement 캐시가 SET + EXECUTE 를 한 번에 보낼 때만 켬 (기본 끔)
+            client_flag=CLIENT.MULTI_STATEMENTS if multi_statements else 0
         )
         return connect
-        
+
     except Exception as e:
         print(f'❌ DB Connection Error: {e}')
         # sys.exit() 절대 금지 -> 에러를 호출한 곳으로 던짐
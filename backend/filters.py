@@ -0,0 +1,117 @@
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+from user_class import CLASS_KEYS, SENIOR_CLASSES, class_sql
+
+# =============================================================================
+# [CORE] ANALYSIS FILTERS (Predicate push-down)
+# - 분석 API 공통 쿼리 파라미터: 기간(start/end), 호선(line), 시간대(hour_from/hour_to),
+#   사용자 구분(user_class)
+# - 검증 후 WHERE 조건 + 바인딩 파라미터로 변환 -> 필요한 파티션/인덱스 범위만 읽음
+# - frozen dataclass 라 해시 가능 -> 결과 캐시 키로 그대로 사용
+# =============================================================================
+
+_LINE_PATTERN = re.compile(r"^[0-9A-Za-z가-힣 ._()\-]{1,50}$")
+
+@dataclass(frozen=True)
+class AnalysisFilters:
+    start: Optional[date] = None
+    end: Optional[date] = None
+    line: Optional[str] = None
+    hour_from: Optional[int] = None
+    hour_to: Optional[int] = None
+    classes: Tuple[int, ...] = ()
+
+    @property
+    def focus_classes(self):
+        # 분석 대상 사용자 구분 (지정하지 않으면 기존과 같이 "노인")
+        return self.classes or SENIOR_CLASSES
+
+    @property
+    def is_senior_focus(self):
+        return tuple(self.focus_classes) == tuple(SENIOR_CLASSES)
+
+    @property
+    def history_allowed(self):
+        # 22~24 과거 테이블은 노인 전용이고 호선 정보가 없음 -> 그 조건에서만 합칠 수 있음
+        return self.is_senior_focus and self.line is None
+
+    def focus_cond(self, alias=None):
+        return class_sql(self.focus_classes, _col(alias, 'userClass'))
+
+    def hour_window(self, default_from=0, default_to=23):
+        lo = default_from if self.hour_from is None else self.hour_from
+        hi = default_to if self.hour_to is None else self.hour_to
+        return lo, hi
+
+    def where(self, alias=None, hours=True, line=True):
+        """
+        Return (sql, params): an "AND ..." fragment for the date / line / hour filters
+        and its bound parameters. User class is applied separately via focus_cond().
+        """
+        clauses, params = [], []
+        if self.start is not None:
+            clauses.append(f"{_col(alias, 'pasngDate')} >= %s")
+            params.append(self.start.isoformat())
+        if self.end is not None:
+            clauses.append(f"{_col(alias, 'pasngDate')} <= %s")
+            params.append(self.end.isoformat())
+        if line and self.line is not None:
+            clauses.append(f"{_col(alias, 'lineNm')} = %s")
+            params.append(self.line)
+        if hours and (self.hour_from is not None or self.hour_to is not None):
+            clauses.append(f"{_col(alias, 'pasngHr')} BETWEEN %s AND %s")
+            params.extend(self.hour_window())
+        return "".join(f" AND {c}" for c in clauses), params
+
+NO_FILTERS = AnalysisFilters()
+
+def _col(alias, name):
+    return f"{alias}.{name}" if alias else name
+
+def _parse_classes(user_class):
+    if not user_class:
+        return ()
+    codes = set()
+    for token in user_class.split(','):
+        key = token.strip().lower()
+        if not key:
+            continue
+        if key not in CLASS_KEYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown user_class '{key}' (use: {', '.join(CLASS_KEYS)})"
+            )
+        codes.add(CLASS_KEYS[key])
+    return tuple(sorted(codes))
+
+def analysis_filters(
+    start: Optional[date] = Query(None, description="시작일 (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="종료일 (YYYY-MM-DD, 포함)"),
+    line: Optional[str] = Query(None, max_length=50, description="호선명 (예: 2호선)"),
+    hour_from: Optional[int] = Query(None, ge=0, le=23, description="시작 시간 (0~23)"),
+    hour_to: Optional[int] = Query(None, ge=0, le=23, description="종료 시간 (0~23, 포함)"),
+    user_class: Optional[str] = Query(None, description="general, youth, senior, other (쉼표로 여러 개)"),
+):
+    # FastAPI 의존성: Depends(analysis_filters) 로 각 분석 엔드포인트에 주입
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    if hour_from is not None and hour_to is not None and hour_from > hour_to:
+        raise HTTPException(status_code=400, detail="hour_from must be <= hour_to")
+    if line is not None:
+        line = line.strip()
+        if not _LINE_PATTERN.match(line):
+            raise HTTPException(status_code=400, detail="Invalid line name")
+
+    return AnalysisFilters(
+        start=start,
+        end=end,
+        line=line or None,
+        hour_from=hour_from,
+        hour_to=hour_to,
+        classes=_parse_classes(user_class),
+    )
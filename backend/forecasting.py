@@ -0,0 +1,221 @@
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# [ENGINE] FORECASTING (vectorized)
+# - 역(series) x 기간 행렬 하나로 모든 역을 한 번에 적합/예측 (역별 Python 루프 없음)
+# - 모델
+#   cagr     : 첫해 -> 마지막 해 연평균 성장률 (기존 방식), 구간은 연간 로그 성장률의 분산
+#   linear   : 역별 선형 추세 (OLS), 구간은 회귀 예측구간
+#   seasonal : 월별 합계에 가법 Holt-Winters (계절 주기 12), 예측 월을 연 단위로 합산
+# - fit_* 는 파라미터(배열 dict)만 돌려주고 predict_* 가 임의의 horizon 으로 예측
+#   -> 적합 결과를 저장해 두었다가 재사용 가능
+# =============================================================================
+
+MODELS = ("cagr", "linear", "seasonal")
+DEFAULT_TARGET_YEAR = 2030
+SEASON_LENGTH = 12
+
+# Holt-Winters 평활 계수 (월별 승하차 합계 기준 기본값)
+SEASONAL_DEFAULTS = {"alpha": 0.3, "beta": 0.05, "gamma": 0.2}
+
+def z_score(level):
+    # 양측 예측구간의 z 값 (level=0.9 -> 1.645)
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+def _row_std(d):
+    # NaN 을 무시한 행별 표본 표준편차 (값이 2개 미만이면 NaN)
+    count = np.sum(~np.isnan(d), axis=1)
+    mean = np.nansum(d, axis=1) / np.where(count > 0, count, 1)
+    sq = np.nansum((d - mean[:, None]) ** 2, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 1, np.sqrt(sq / (count - 1)), np.nan)
+
+# =============================================================================
+# Panel <-> matrix
+# =============================================================================
+def to_matrix(panel, key, period, value):
+    """
+    Long panel -> (keys, periods, Y) with one row per series.
+    Missing periods inside the observed range are filled with 0 (no traffic recorded).
+    """
+    wide = panel.pivot_table(index=key, columns=period, values=value, aggfunc='sum', fill_value=0)
+    periods = np.arange(int(wide.columns.min()), int(wide.columns.max()) + 1)
+    wide = wide.reindex(columns=periods, fill_value=0)
+    return wide.index.to_numpy(), periods, wide.to_numpy(dtype=float)
+
+# =============================================================================
+# CAGR
+# =============================================================================
+def fit_cagr(Y):
+    first, last = Y[:, 0], Y[:, -1]
+    n = max(Y.shape[1] - 1, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = np.where(first > 0, (last / first) ** (1 / n) - 1, np.nan)
+        logs = np.log(np.where(Y > 0, Y, np.nan))
+    sigma = _row_std(np.diff(logs, axis=1)) if Y.shape[1] > 2 else np.full(len(Y), np.nan)
+    return {"last": last, "growth": growth, "sigma": sigma}
+
+def predict_cagr(params, steps, z):
+    h = np.asarray(steps, dtype=float)[None, :]
+    point = params["last"][:, None] * (1 + params["growth"][:, None]) ** h
+    band = np.exp(z * params["sigma"][:, None] * np.sqrt(h))
+    return point, point / band, point * band
+
+# =============================================================================
+# Linear trend (OLS per series, all rows at once)
+# =============================================================================
+def fit_linear(Y):
+    T = Y.shape[1]
+    t = np.arange(T, dtype=float)
+    tbar = t.mean()
+    sxx = float(np.sum((t - tbar) ** 2)) or 1.0
+    ybar = Y.mean(axis=1)
+    slope = (Y - ybar[:, None]) @ (t - tbar) / sxx
+    intercept = ybar - slope * tbar
+    resid = Y - (intercept[:, None] + slope[:, None] * t[None, :])
+    s = np.sqrt(np.sum(resid ** 2, axis=1) / (T - 2)) if T > 2 else np.full(len(Y), np.nan)
+    return {"intercept": intercept, "slope": slope, "s": s,
+            "n": np.array(T), "tbar": np.array(tbar), "sxx": np.array(sxx)}
+
+def predict_linear(params, steps, z):
+    T, tbar, sxx = float(params["n"]), float(params["tbar"]), float(params["sxx"])
+    x0 = (T - 1) + np.asarray(steps, dtype=float)[None, :]
+    point = params["intercept"][:, None] + params["slope"][:, None] * x0
+    se = params["s"][:, None] * np.sqrt(1 + 1 / T + (x0 - tbar) ** 2 / sxx)
+    return np.maximum(point, 0), np.maximum(point - z * se, 0), np.maximum(point + z * se, 0)
+
+# =============================================================================
+# Seasonal exponential smoothing (additive Holt-Winters, vectorized over series)
+# =============================================================================
+def fit_seasonal(Y, m=SEASON_LENGTH, alpha=None, beta=None, gamma=None):
+    alpha = SEASONAL_DEFAULTS["alpha"] if alpha is None else alpha
+    beta = SEASONAL_DEFAULTS["beta"] if beta is None else beta
+    gamma = SEASONAL_DEFAULTS["gamma"] if gamma is None else gamma
+    T = Y.shape[1]
+    if T < 2 * m:
+        raise ValueError(f"seasonal model needs at least {2 * m} periods (got {T})")
+
+    # 초기값: 첫 두 주기의 평균 차이로 추세, 첫 주기의 편차로 계절성
+    first, second = Y[:, :m].mean(axis=1), Y[:, m:2 * m].mean(axis=1)
+    level = first.copy()
+    trend = (second - first) / m
+    season = Y[:, :m] - first[:, None]
+
+    errors = np.empty_like(Y)
+    for t in range(T):
+        s_idx = t % m
+        y = Y[:, t]
+        fitted = level + trend + season[:, s_idx]
+        errors[:, t] = y - fitted
+        prev_level = level
+        level = alpha * (y - season[:, s_idx]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        season[:, s_idx] = gamma * (y - level) + (1 - gamma) * season[:, s_idx]
+
+    # 첫 주기는 초기화 구간이므로 오차 통계에서 제외
+    sigma = np.sqrt(np.mean(errors[:, m:] ** 2, axis=1))
+    return {"level": level, "trend": trend, "season": season, "sigma": sigma,
+            "n": np.array(T), "m": np.array(m)}
+
+def predict_seasonal(params, steps, z):
+    T, m = int(params["n"]), int(params["m"])
+    h = np.asarray(steps, dtype=int)
+    idx = (T + h - 1) % m
+    point = params["level"][:, None] + params["trend"][:, None] * h[None, :] + params["season"][:, idx]
+    se = params["sigma"][:, None] * np.sqrt(h[None, :])
+    return np.maximum(point, 0), np.maximum(point - z * se, 0), np.maximum(point + z * se, 0)
+
+_FIT = {"cagr": fit_cagr, "linear": fit_linear, "seasonal": fit_seasonal}
+_PREDICT = {"cagr": predict_cagr, "linear": predict_linear, "seasonal": predict_seasonal}
+
+def fit(model, Y, **options):
+    return _FIT[model](Y, **options)
+
+def predict(model, params, steps, level=0.9):
+    return _PREDICT[model](params, steps, z_score(level))
+
+# =============================================================================
+# Station forecast (annual view used by /analysis/prediction)
+# =============================================================================
+def prepare(panel, model):
+    """
+    Panel -> (keys, Y, base_year, last_month) for the given model.
+    panel columns: stnNm, year, total_vol (+ month for the seasonal model)
+    """
+    if model == "seasonal":
+        panel = panel.assign(period=panel['year'].astype(int) * 12 + panel['month'].astype(int) - 1)
+        keys, periods, Y = to_matrix(panel, 'stnNm', 'period', 'total_vol')
+        return keys, Y, int(periods[-1] // 12), int(periods[-1] % 12) + 1
+    keys, years, Y = to_matrix(panel, 'stnNm', 'year', 'total_vol')
+    return keys, Y, int(years[-1]), 12
+
+def annual_forecast(model, params, Y, base_year, last_month, horizon, level=0.9):
+    """
+    Forecast the total of year base_year + horizon for every series.
+    Returns (base_vol, point, lower, upper) arrays; for the seasonal model base_vol is
+    the total of the last 12 observed months.
+    """
+    if model != "seasonal":
+        point, lower, upper = predict(model, params, [horizon], level)
+        return Y[:, -1], point[:, 0], lower[:, 0], upper[:, 0]
+
+    # 월별 예측 -> 목표 연도 12개월 합산 (구간은 월별 오차가 독립이라는 가정의 근사)
+    first_step = (12 - last_month) + (horizon - 1) * 12 + 1
+    steps = np.arange(first_step, first_step + 12)
+    point, _, _ = predict(model, params, steps, level)
+    z = z_score(level)
+    total = point.sum(axis=1)
+    se = params["sigma"] * np.sqrt(steps.sum())  # 월별 분산 sigma^2 * h 의 합
+    # 기준값: 마지막 12개월 합계 (마지막 해가 일부 월만 있으면 그해 합계가 작아져 성장률이 부풀려짐)
+    base_vol = Y[:, -SEASON_LENGTH:].sum(axis=1)
+    return base_vol, total, np.maximum(total - z * se, 0), total + z * se
+
+def forecast_stations(panel, model="cagr", horizon=None, level=0.9, **options):
+    """
+    Fit every station series in one pass and project to base_year + horizon.
+    horizon defaults to DEFAULT_TARGET_YEAR - base_year (at least 1 year).
+    """
+    if model not in MODELS:
+        raise ValueError(f"model must be one of {MODELS}")
+    keys, Y, base_year, last_month = prepare(panel, model)
+    if Y.shape[1] < 2:
+        return pd.DataFrame()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        params = fit(model, Y, **options)
+        horizon = horizon or max(DEFAULT_TARGET_YEAR - base_year, 1)
+        base_vol, point, lower, upper = annual_forecast(model, params, Y, base_year, last_month, horizon, level)
+        growth = params["growth"] if model == "cagr" else None
+        return build_frame(keys, base_vol, point, lower, upper, model, base_year, horizon, growth)
+
+def build_frame(keys, base_vol, point, lower, upper, model, base_year, horizon, growth=None):
+    # growth: 연평균 성장률 (없으면 기준 연도 -> 목표 연도 예측치로 환산한 값)
+    if growth is None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = np.where(base_vol > 0, (point / base_vol) ** (1 / horizon) - 1, np.nan)
+    cagr = growth
+    df = pd.DataFrame({
+        "stnNm": keys,
+        "model": model,
+        "base_year": base_year,
+        "base_vol": np.round(base_vol).astype('int64'),
+        "target_year": base_year + horizon,
+        "forecast": np.round(point),
+        "lower": np.round(lower),
+        "upper": np.round(upper),
+        "cagr": np.round(cagr * 100, 2),
+    })
+    # 시작값이 0 이라 성장률을 정의할 수 없는 역은 제외 (기존 로직과 동일)
+    df = df[np.isfinite(df['cagr']) & np.isfinite(df['forecast'])].copy()
+    df['forecast'] = df['forecast'].astype('int64')
+    df['trend'] = np.where(df['cagr'] > 0, "RISING", "FALLING")
+    # 예전 응답 키 (기존 클라이언트 호환용 별칭, 새 코드는 base_vol / forecast 사용)
+    # 기준/목표 연도가 2024/2030 이 아니어도 값은 base_vol / forecast 와 같음
+    df['vol_2024'] = df['base_vol']
+    df['proj_2030'] = df['forecast']
+    return df.sort_values('cagr', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,393 @@
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import requests
+
+import bulk_writer
+import dbconnect
+import rollup
+from user_class import get_user_group
+
+# =============================================================================
+# [INGEST] 서울 열린데이터 getStnPsgr 수집 (노트북 00 의 적재 루프를 모듈 / CLI 로)
+# - 여러 날짜 / 페이지를 동시에 요청하되 전체 요청 속도는 INGEST_RATE(초당 요청 수)로 제한
+# - 네트워크 오류 / 5xx / 429 / 깨진 응답은 지수 백오프(+지터)로 재시도
+# - 저장이 끝난 (날짜, 페이지)를 체크포인트 파일에 기록 -> 중단된 백필은 이어서 진행
+#   (upsert 이므로 마지막 페이지가 두 번 들어가도 결과는 같음)
+# - 설정: SEOUL_API_KEY, SEOUL_API_BASE (기본 공식 주소, mock_seoul_api.py 로 바꿔 테스트),
+#         INGEST_WORKERS (동시 요청 수, 4), INGEST_RATE (초당 요청 수, 5),
+#         INGEST_RETRIES (재시도 횟수, 5), INGEST_CHECKPOINT (체크포인트 파일 경로)
+#
+#   python ingest_api.py 2026-01-26 2026-02-01 [--workers 8 --rate 10] [--dry-run]
+# =============================================================================
+
+SERVICE = "getStnPsgr"
+TYPE = "json"
+BATCH_SIZE = 1000  # 한 페이지 행 수 (API 최대 1000)
+
+DEFAULT_BASE_URL = "http://openapi.seoul.go.kr:8088"
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "ingest_checkpoint.json")
+
+# 열린데이터 광장 결과 코드: INFO-000 정상, INFO-200 데이터 없음, ERROR-5xx/6xx 서버 오류
+CODE_OK = "INFO-000"
+CODE_NO_DATA = "INFO-200"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def _retryable(code):
+    # ERROR-5xx / 6xx 는 서버 쪽 일시 오류, 그 외(인증키 / 요청 형식 / 일일 한도)는 재시도해도 같음
+    return code.startswith(("ERROR-5", "ERROR-6"))
+
+class ApiError(Exception):
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+# =============================================================================
+# Rate limit (토큰 버킷, 모든 작업 스레드가 공유)
+# =============================================================================
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+# =============================================================================
+# API client
+# =============================================================================
+def parse_page(data):
+    """
+    Extract (rows, total_count) from a getStnPsgr response.
+    total_count is None when the response does not report it.
+    """
+    if SERVICE in data:
+        body = data[SERVICE]
+        result = body.get("RESULT", {})
+        code = result.get("CODE", CODE_OK)
+        if code not in (CODE_OK, CODE_NO_DATA):
+            raise ApiError(f"{code}: {result.get('MESSAGE', '')}", retryable=_retryable(code))
+        total = body.get("list_total_count")
+        return body.get("row", []), (int(total) if total is not None else None)
+    if "response" in data:
+        body = data["response"].get("body", {})
+        items = (body.get("items") or {}).get("item", [])
+        total = body.get("totalCount")
+        return items, (int(total) if total is not None else None)
+    # 데이터가 없는 날은 RESULT 만 최상위에 오기도 함
+    result = data.get("RESULT", {})
+    code = result.get("CODE")
+    if code == CODE_NO_DATA:
+        return [], None
+    if code:
+        raise ApiError(f"{code}: {result.get('MESSAGE', '')}", retryable=_retryable(code))
+    return [], None
+
+class SeoulApiClient:
+    """getStnPsgr pages with a shared rate limit and retries with exponential backoff."""
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, rate=5.0, retries=5,
+                 backoff=1.0, max_backoff=30.0, timeout=30):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0}
+
+    def _session(self):
+        # requests.Session 은 스레드 간 공유가 안전하지 않음 -> 스레드마다 하나 (keep-alive 재사용)
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def url(self, date_str, start_idx, end_idx):
+        return f"{self.base_url}/{self.api_key}/{TYPE}/{SERVICE}/{start_idx}/{end_idx}/{date_str}"
+
+    def _request(self, url):
+        self.limiter.acquire()
+        with self._lock:
+            self.stats["requests"] += 1
+        try:
+            response = self._session().get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ApiError(f"{type(e).__name__}: {e}")
+        if response.status_code in RETRYABLE_STATUS:
+            retry_after = response.headers.get("Retry-After")
+            raise ApiError(f"HTTP {response.status_code}",
+                           retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if response.status_code >= 400:
+            raise ApiError(f"HTTP {response.status_code}", retryable=False)
+        try:
+            return response.json()
+        except ValueError:
+            raise ApiError("invalid JSON body")
+
+    def fetch_page(self, date_str, page, batch=BATCH_SIZE):
+        """Fetch one page (1-based). Returns (rows, total_count)."""
+        start_idx = (page - 1) * batch + 1
+        url = self.url(date_str, start_idx, start_idx + batch - 1)
+        for attempt in range(self.retries + 1):
+            try:
+                return parse_page(self._request(url))
+            except ApiError as e:
+                if not e.retryable or attempt == self.retries:
+                    raise
+                delay = e.retry_after or min(self.max_backoff, self.backoff * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0) if e.retry_after is None else 1.0
+                with self._lock:
+                    self.stats["retries"] += 1
+                print(f"⚠️ {date_str} p{page}: {e} -> retry in {delay:.1f}s ({attempt + 1}/{self.retries})")
+                time.sleep(delay)
+
+# =============================================================================
+# Checkpoint (날짜별로 저장이 끝난 페이지)
+# =============================================================================
+class Checkpoint:
+    """
+    JSON file: {"YYYYMMDD": {"total": int|null, "last_page": int|null, "pages": {"1": rows, ...}, "done": bool}}
+    Saved atomically after every stored page, so an interrupted run resumes from it.
+    """
+
+    def __init__(self, path=None, batch=BATCH_SIZE):
+        self.path = path
+        self.batch = batch
+        self._lock = threading.Lock()
+        self.dates = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.dates = json.load(f)
+
+    def state(self, date_str):
+        with self._lock:
+            entry = self.dates.setdefault(date_str, {"total": None, "last_page": None, "pages": {}, "done": False})
+            return {**entry, "pages": {int(p): n for p, n in entry["pages"].items()}}
+
+    def record(self, date_str, page, rows, total=None, last_page=None):
+        with self._lock:
+            entry = self.dates.setdefault(date_str, {"total": None, "last_page": None, "pages": {}, "done": False})
+            entry["pages"][str(page)] = rows
+            if total is not None:
+                entry["total"] = total
+            if last_page is not None:
+                entry["last_page"] = last_page
+            entry["done"] = _date_complete(entry, self.batch)
+            self._save()
+            return entry["done"]
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.dates, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+def _page_count(entry, batch):
+    # 마지막 페이지 번호: 전체 건수를 알면 계산, 아니면 짧은 페이지를 받은 시점에 확정
+    if entry.get("total") is not None:
+        return max(1, math.ceil(entry["total"] / batch))
+    return entry.get("last_page")
+
+def _date_complete(entry, batch):
+    last = _page_count(entry, batch)
+    return last is not None and all(str(p) in entry["pages"] for p in range(1, last + 1))
+
+# =============================================================================
+# DB write (노트북 00 의 save_to_db) - bulk_writer 로 한 페이지를 묶어서 upsert
+# =============================================================================
+def to_frame(items):
+    df = pd.DataFrame(items)
+    if df.empty:
+        return df
+    df['UserGroup'] = df['trnscdUserSeCd'].map(get_user_group)
+    # 역코드 4자리 표준화(150 -> 0150)는 bulk_writer.validate 가 쓰기 직전에 처리
+    return df
+
+def save_to_db(conn, df):
+    """Upsert one page into subway_traffic_log, then refresh the touched rollup slices."""
+    if len(df) == 0:
+        return 0
+
+    # 데이터 + table_stats 를 한 트랜잭션으로 (거부된 행은 사유별로 한 번에 출력)
+    result = bulk_writer.upsert(conn, bulk_writer.TRAFFIC_LOG, df)
+    if result.rejected_count:
+        print(f"⚠️ {df['pasngDe'].iloc[0]}: {result.summary()}")
+
+    # 이번에 upsert 한 (일자, 역) 조각만 집계 테이블에 다시 반영
+    try:
+        rollup.refresh_rollup(conn, df[['pasngDe', 'stnCd']].values)
+    except Exception as e:
+        print(f"집계 갱신 에러: {e}")
+    return result.rows
+
+# =============================================================================
+# Backfill
+# =============================================================================
+def date_range(start, end):
+    day, end = _as_date(start), _as_date(end)
+    while day <= end:
+        yield day.strftime("%Y%m%d")
+        day += timedelta(days=1)
+
+def _as_date(value):
+    if isinstance(value, date):
+        return value
+    text = str(value).replace("-", "")
+    return datetime.strptime(text, "%Y%m%d").date()
+
+def backfill(dates, client, checkpoint, save=None, workers=4, verbose=True):
+    """
+    Fetch every page of every date concurrently and store them in the calling thread.
+    save: function(DataFrame) -> stored rows (None = fetch only, e.g. --dry-run).
+    Pages already in the checkpoint are skipped. Returns a summary dict.
+    """
+    batch = checkpoint.batch
+    summary = {"dates": 0, "skipped_dates": 0, "pages": 0, "rows": 0, "failed": []}
+    queue = []
+    for d in dates:
+        if checkpoint.state(d)["done"]:
+            summary["skipped_dates"] += 1
+        else:
+            queue.append(d)
+    queue.reverse()  # pop() 이 가장 이른 날짜부터 꺼내도록
+
+    in_flight = {}    # future -> (date, page)
+    requested = set()  # 이미 요청한 (date, page)
+    max_in_flight = workers * 2
+
+    def submit(executor, d, page):
+        if (d, page) not in requested:
+            requested.add((d, page))
+            in_flight[executor.submit(client.fetch_page, d, page, batch)] = (d, page)
+
+    def plan(executor, d):
+        # 아직 저장하지 않은 페이지를 요청 (전체 건수를 알면 한꺼번에, 모르면 다음 페이지 하나)
+        st = checkpoint.state(d)
+        last = _page_count(st, batch)
+        if last is not None:
+            for page in range(1, last + 1):
+                if page not in st["pages"]:
+                    submit(executor, d, page)
+        else:
+            submit(executor, d, max(st["pages"], default=0) + 1)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as executor:
+        while queue or in_flight:
+            # 요청 중인 페이지가 적을 때만 다음 날짜를 시작 (메모리 / 순서 유지)
+            while queue and len(in_flight) < max_in_flight:
+                plan(executor, queue.pop())
+
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                d, page = in_flight.pop(future)
+                try:
+                    items, total = future.result()
+                    df = to_frame(items)
+                    stored = save(df) if save is not None else len(df)
+                except Exception as e:
+                    print(f"❌ {d} p{page} failed: {e}")
+                    summary["failed"].append({"date": d, "page": page, "error": str(e)})
+                    continue
+
+                last_page = page if total is None and len(items) < batch else None
+                finished = checkpoint.record(d, page, stored, total=total, last_page=last_page)
+                summary["pages"] += 1
+                summary["rows"] += stored
+                if finished:
+                    summary["dates"] += 1
+                    if verbose:
+                        st = checkpoint.state(d)
+                        print(f"✅ {d} 완료: {sum(st['pages'].values()):,}건 ({len(st['pages'])} pages)")
+                else:
+                    plan(executor, d)
+
+    summary["requests"] = client.stats["requests"]
+    summary["retries"] = client.stats["retries"]
+    return summary
+
+def main():
+    dbconnect.load_env()
+    parser = argparse.ArgumentParser(description="Resumable, concurrent getStnPsgr backfill into subway_traffic_log")
+    parser.add_argument("start", help="first date (YYYY-MM-DD or YYYYMMDD)")
+    parser.add_argument("end", nargs="?", help="last date (default: start)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INGEST_WORKERS", 4)))
+    parser.add_argument("--rate", type=float, default=float(os.getenv("INGEST_RATE", 5)),
+                        help="max requests per second over all workers (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=int(os.getenv("INGEST_RETRIES", 5)))
+    parser.add_argument("--base-url", default=os.getenv("SEOUL_API_BASE", DEFAULT_BASE_URL))
+    parser.add_argument("--checkpoint", default=os.getenv("INGEST_CHECKPOINT", DEFAULT_CHECKPOINT))
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint for these dates")
+    parser.add_argument("--dry-run", action="store_true", help="fetch only, do not write to the database")
+    args = parser.parse_args()
+
+    api_key = os.getenv("SEOUL_API_KEY")
+    if not api_key:
+        print("❌ SEOUL_API_KEY 가 설정되지 않았습니다 (.env)")
+        return 1
+
+    dates = list(date_range(args.start, args.end or args.start))
+    # dry-run 은 DB 에 쓰지 않으므로 실제 체크포인트를 건드리지 않음
+    checkpoint = Checkpoint(None if args.dry_run else args.checkpoint)
+    if args.restart:
+        for d in dates:
+            checkpoint.dates.pop(d, None)
+    client = SeoulApiClient(api_key, args.base_url, rate=args.rate, retries=args.retries)
+
+    conn = None
+    save = None
+    if not args.dry_run:
+        conn = dbconnect.MydbConnect('seoul_urban_lab')
+        save = lambda df: save_to_db(conn, df)  # noqa: E731
+
+    started = time.perf_counter()
+    try:
+        summary = backfill(dates, client, checkpoint, save=save, workers=args.workers)
+    finally:
+        if conn:
+            conn.close()
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "=" * 50)
+    print(f"전체 작업 완료! {summary['dates']}일 / {summary['pages']} pages / {summary['rows']:,}건 "
+          f"({elapsed:.1f}s, 요청 {summary['requests']}회, 재시도 {summary['retries']}회)")
+    if summary["skipped_dates"]:
+        print(f"   체크포인트로 건너뛴 날짜: {summary['skipped_dates']}일")
+    if summary["failed"]:
+        print(f"🚨 실패한 페이지 {len(summary['failed'])}개 - 같은 명령을 다시 실행하면 이어서 받습니다.")
+        return 1
+    print("=" * 50)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+# =============================================================================
+# [CORE] INGEST WATERMARK (ingest_state)
+# - 적재 경로(노트북, rollup 갱신)가 데이터를 바꿀 때마다 테이블별 version +1
+# - 읽는 쪽(결과 캐시 등)은 version 묶음이 바뀌었는지만 보고 무효화 여부 판단
+# =============================================================================
+
+TRAFFIC_LOG = "subway_traffic_log"
+SENIOR_LOG = "subway_traffic_log_senior_22-24"
+STATION_META = "station_meta"
+
+def bump(cursor, table_name, dates=None):
+    # 호출한 쪽의 트랜잭션 안에서 실행 -> 데이터 커밋과 함께 반영됨
+    # dates: 이번 변경이 건드린 통행일자 -> 새 버전 번호로 ingest_changes 에 기록 (미러 증분 갱신용)
+    cursor.execute(
+        "INSERT INTO ingest_state (tableNm, version) VALUES (%s, 1) "
+        "ON DUPLICATE KEY UPDATE version = version + 1",
+        (table_name,)
+    )
+    if dates is None:
+        return
+    # 위 UPDATE 가 이 행을 커밋까지 잠그므로 버전 번호는 트랜잭션 사이에 겹치지 않음
+    cursor.execute("SELECT version FROM ingest_state WHERE tableNm = %s", (table_name,))
+    version = int(cursor.fetchone()[0])
+    rows = [(table_name, version, day) for day in sorted({_as_date(d) for d in dates})]
+    if not rows:
+        return
+    try:
+        cursor.executemany(
+            "INSERT IGNORE INTO ingest_changes (tableNm, version, pasngDate) VALUES (%s, %s, %s)", rows
+        )
+    except Exception as e:
+        # 마이그레이션 0007 전 DB: 기록 없이 진행 (미러는 이 경우 전체 날짜를 다시 내보냄)
+        if not e.args or e.args[0] != 1146:  # ER_NO_SUCH_TABLE
+            raise
+
+def changed_dates(cursor, table_name, after_version, upto_version):
+    # after_version 초과 ~ upto_version 이하 버전에서 바뀐 일자 (upto 는 이미 커밋된 워터마크 값)
+    cursor.execute(
+        "SELECT DISTINCT pasngDate FROM ingest_changes "
+        "WHERE tableNm = %s AND version > %s AND version <= %s ORDER BY pasngDate",
+        (table_name, int(after_version), int(upto_version))
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+def read_watermark(cursor):
+    # PK 순서로 읽은 (테이블, version) 튜플 -> 값 비교만으로 변경 감지
+    cursor.execute("SELECT tableNm, version FROM ingest_state ORDER BY tableNm")
+    return tuple((row[0], int(row[1])) for row in cursor.fetchall())
+
+# =============================================================================
+# [CORE] TABLE STATS (table_stats) - /status 용 행 수 / 최신 일자
+# - 적재 경로가 upsert 와 같은 트랜잭션에서 새로 들어온 행 수만 더함 (COUNT(*) 없음)
+#   (pymysql: INSERT ... ON DUPLICATE KEY UPDATE 의 rowcount 1 = 신규, 2 = 갱신, 0 = 변화 없음)
+# - 통계가 없는 테이블은 information_schema 의 추정치(TABLE_ROWS)로 대신함
+# =============================================================================
+
+# 테이블 -> 최신 일자를 볼 날짜 컬럼 (없으면 None)
+DATE_COLUMNS = {TRAFFIC_LOG: "pasngDate", SENIOR_LOG: "pasngDate", STATION_META: None}
+
+def _as_date(value):
+    # 'YYYYMMDD' / 'YYYY-MM-DD' / date -> 'YYYY-MM-DD'
+    if value is None:
+        return None
+    de = str(value).strip().replace('-', '')[:8]
+    return f"{de[:4]}-{de[4:6]}-{de[6:8]}"
+
+_has_table_stats = False
+_warned_table_stats = False
+
+def has_table_stats(cursor):
+    # table_stats 가 없는 DB (마이그레이션 0006 전)에서도 적재는 되도록 확인 후 건너뜀
+    # 있으면 프로세스 동안 다시 조회하지 않음, 없다는 경고는 한 번만
+    global _has_table_stats, _warned_table_stats
+    if not _has_table_stats:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'table_stats'"
+        )
+        _has_table_stats = cursor.fetchone()[0] > 0
+        if not _has_table_stats and not _warned_table_stats:
+            _warned_table_stats = True
+            print("⚠️ table_stats not found: skipping row stats (run backend/migrate.py or create_table_7.sql)")
+    return _has_table_stats
+
+def add_rows(cursor, table_name, rows, latest_date=None):
+    # 호출한 쪽의 트랜잭션 안에서 실행 (bump 와 같은 방식)
+    latest = _as_date(latest_date)
+    cursor.execute(
+        "INSERT INTO table_stats (tableNm, rowCount, latestDate) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE rowCount = rowCount + VALUES(rowCount), "
+        "latestDate = GREATEST(COALESCE(latestDate, VALUES(latestDate)), COALESCE(VALUES(latestDate), latestDate))",
+        (table_name, int(rows), latest)
+    )
+
+def recount(cursor, table_name):
+    # 정확한 값으로 다시 맞춤 (전체 스캔이므로 마이그레이션 / 수동 보정용)
+    date_col = DATE_COLUMNS.get(table_name)
+    latest_expr = f"MAX({date_col})" if date_col else "NULL"
+    cursor.execute(f"SELECT COUNT(*), {latest_expr} FROM `{table_name}`")
+    rows, latest = cursor.fetchone()
+    cursor.execute(
+        "INSERT INTO table_stats (tableNm, rowCount, latestDate, countedAt) VALUES (%s, %s, %s, NOW()) "
+        "ON DUPLICATE KEY UPDATE rowCount = VALUES(rowCount), latestDate = VALUES(latestDate), countedAt = NOW()",
+        (table_name, int(rows), latest)
+    )
+    return int(rows)
+
+def read_stats(cursor, tables=tuple(DATE_COLUMNS)):
+    """
+    Return {table: {"rows", "exact", "latest_date", "updated_at"}} without scanning data tables.
+    Tables missing from table_stats fall back to the InnoDB row estimate (exact=False).
+    """
+    stats = {}
+    try:
+        cursor.execute("SELECT tableNm, rowCount, latestDate, updated_at FROM table_stats")
+        for name, rows, latest, updated in cursor.fetchall():
+            stats[name] = {"rows": int(rows), "exact": True,
+                           "latest_date": str(latest) if latest else None,
+                           "updated_at": str(updated) if updated else None}
+    except Exception as e:
+        print(f"⚠️ table_stats not readable, using estimates: {e}")
+
+    missing = [t for t in tables if t not in stats]
+    if missing:
+        placeholders = ", ".join(["%s"] * len(missing))
+        cursor.execute(
+            f"SELECT TABLE_NAME, TABLE_ROWS, UPDATE_TIME FROM information_schema.TABLES "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})",
+            missing
+        )
+        for name, rows, updated in cursor.fetchall():
+            stats[name] = {"rows": int(rows or 0), "exact": False, "latest_date": None,
+                           "updated_at": str(updated) if updated else None}
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+
+    import dbconnect
+
+    # python ingest_state.py recount [table ...] : table_stats 를 정확한 COUNT 로 다시 맞춤
+    if len(sys.argv) < 2 or sys.argv[1] != "recount":
+        print("usage: python ingest_state.py recount [table ...]")
+        sys.exit(1)
+    conn = dbconnect.MydbConnect('seoul_urban_lab')
+    try:
+        cursor = conn.cursor()
+        for table in sys.argv[2:] or list(DATE_COLUMNS):
+            print(f"🔢 [{table}] {recount(cursor, table):,} rows")
+            conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Recount failed: {e}")
+    finally:
+        conn.close()
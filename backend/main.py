@@ -1,4 +1,7 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Dict, Optional
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import pandas as pd
@@ -12,9 +15,62 @@ root_dir = os.path.dirname(current_dir)
 if root_dir not in sys.path:
     sys.path.append(root_dir)
 
-import dbconnect 
+import analytics_mirror
+import clustering
+import db_pool
+import forecasting
+import ingest_state
+import metrics
+import model_store
+import query_engine
+import slow_query
+from compression import add_compression
+from metrics import add_metrics
+from filters import NO_FILTERS, AnalysisFilters, analysis_filters
+from responses import FastJSONResponse, frame_response
+import station_index
+import station_profile
+from result_cache import cache, cached
+from warmup import warmup
 
-app = FastAPI(title="SEOUL URBAN LAB: CORE ENGINE (RESTORED)")
+@asynccontextmanager
+async def lifespan(app):
+    # 커넥션 풀은 앱 시작 시 한 번만 생성
+    db_pool.init_pool('seoul_urban_lab')
+    # 저장된 예측 모델을 미리 메모리에 올림 (재시작 후 첫 요청도 파일 읽기만)
+    model_store.preload()
+    if query_engine.engine() == "duckdb":
+        # Parquet 미러를 백그라운드에서 증분 갱신 (첫 갱신은 기동 직후)
+        analytics_mirror.start_background_refresh()
+    # 역 마스터 + 자주 쓰는 분석 결과를 백그라운드에서 미리 계산 (끝나면 /ready 200)
+    # 분석 결과 작업이 실패하면 첫 요청 때 평소처럼 다시 계산됨
+    # DB 연결 / 역 인덱스는 필수 -> 실패하면 /ready 503
+    warmup.reset()
+    warmup.add("database", lambda: query_engine.read_sql("SELECT 1 AS ok"), required=True)
+    warmup.add("station_index", station_index.load, required=True)
+    warmup.add("meta_stations", lambda: _warm(build_meta_stations))
+    warmup.add("vitality", lambda: _warm(build_vitality_index, NO_FILTERS))
+    warmup.add("timelapse", lambda: _warm(build_timelapse, NO_FILTERS))
+    warmup.add("trend_rhythm", lambda: _warm(build_trend_rhythm, NO_FILTERS))
+    warmup.start()
+    yield
+    analytics_mirror.stop_background_refresh()
+    db_pool.close_pool()
+
+def _warm(builder, *args):
+    # 핸들러와 같은 인자로 호출해야 같은 캐시 키가 채워짐 (분석 API 는 필터를 위치 인자로 넘김)
+    result = builder(*args)
+    if isinstance(result, list) or getattr(result, "empty", False):
+        raise RuntimeError("empty result (not cached)")
+
+# 백그라운드 재적합이 끝나면 이전 예측 결과 캐시를 비움
+model_store.on_refit(lambda: cache.invalidate("prediction"))
+
+app = FastAPI(
+    title="SEOUL URBAN LAB: CORE ENGINE (RESTORED)",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,15 +79,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip / brotli 응답 압축 (크기 기준 이상일 때만)
+add_compression(app)
+# 라우트별 지연 시간 (가장 바깥에서 측정 -> 압축 시간 포함)
+add_metrics(app)
 
 class SystemStatus(BaseModel):
     api_count: int
     senior_count: int
     meta_count: int
+    # 정확한 값이면 True, table_stats 가 없어 InnoDB 추정치를 쓴 경우 False
+    exact: bool = True
+    # 테이블별 최신 통행일자 / 마지막 적재 시각
+    freshness: Dict[str, Dict[str, Optional[str]]] = {}
 
 def get_db_connection():
+    # 풀에서 연결을 빌려옴. conn.close()는 실제로 닫지 않고 풀에 반납
+    # (연결 단절 오류면 conn.discard() 로 폐기 - db_pool.connection_lost)
     try:
-        return dbconnect.MydbConnect('seoul_urban_lab')
+        return db_pool.get_pool().acquire()
     except Exception as e:
         print(f"🚨 Backend DB Error: {e}")
         # Gracefully handle connection failure
@@ -42,60 +108,114 @@ def get_db_connection():
 # =============================================================================
 @app.get("/status", response_model=SystemStatus)
 def get_status():
+    # 원본 테이블 COUNT(*) 대신 적재 경로가 유지하는 table_stats 를 읽음 (PK 조회 1회)
     conn = None
     stats = {"api_count": 0, "senior_count": 0, "meta_count": 0}
     try:
         conn = get_db_connection()
         if not conn: return stats
-        
-        cursor = conn.cursor()
-        
-        # 1. Traffic Log
-        cursor.execute("SELECT COUNT(*) FROM subway_traffic_log")
-        stats["api_count"] = cursor.fetchone()[0]
-        
-        # 2. Senior Log (Try/Except for safety)
-        try:
-            cursor.execute("SELECT COUNT(*) FROM `subway_traffic_log_senior_22-24`")
-            stats["senior_count"] = cursor.fetchone()[0]
-        except:
-            stats["senior_count"] = 0
-            
-        # 3. Meta
-        cursor.execute("SELECT COUNT(*) FROM station_meta")
-        stats["meta_count"] = cursor.fetchone()[0]
-        
+
+        table_stats = ingest_state.read_stats(conn.cursor())
+        fields = {
+            "api_count": ingest_state.TRAFFIC_LOG,
+            "senior_count": ingest_state.SENIOR_LOG,
+            "meta_count": ingest_state.STATION_META,
+        }
+        for field, table in fields.items():
+            stats[field] = table_stats.get(table, {}).get("rows", 0)
+        stats["exact"] = all(table_stats.get(t, {}).get("exact", False) for t in fields.values())
+        stats["freshness"] = {
+            t: {"latest_date": table_stats[t]["latest_date"], "updated_at": table_stats[t]["updated_at"]}
+            for t in fields.values() if t in table_stats
+        }
         return stats
     except Exception as e:
         print(f"❌ Status Error: {e}")
+        if conn and db_pool.connection_lost(e):
+            conn.discard()
         return stats
     finally:
         if conn: conn.close()
 
+@app.get("/ready")
+def get_readiness():
+    # 준비 상태 확인용 (DB COUNT 없이 메모리 상태만) -> 워밍업 전 / 필수 작업 실패 시 503
+    # 필수 작업이 실패한 상태면 백그라운드에서 다시 시도 (복구되면 이후 호출부터 200)
+    warmup.retry()
+    info = warmup.status()
+    return FastJSONResponse(info, status_code=200 if info["ready"] else 503)
+
+@app.get("/metrics")
+def get_metrics():
+    # Prometheus 텍스트 형식 (요청 지연 / SQL 시간·행 수 / 후처리 / 직렬화)
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# 디버그 엔드포인트는 SQL 원문(과 바인딩 값)을 그대로 보여주므로 인증 없이 열지 않음:
+# SLOW_QUERY_MS 를 설정해 느린 쿼리 수집을 켠 경우에만 라우트 자체를 등록 (기본은 404)
+if slow_query.enabled():
+    @app.get("/debug/slow-queries")
+    def get_slow_queries(limit: int = Query(20, ge=1, le=200), reset: bool = False):
+        # SLOW_QUERY_MS 이상 걸린 문장 (최대 시간 순) + 자동 수집한 EXPLAIN 실행계획
+        info = {"enabled": slow_query.enabled(), "threshold_ms": slow_query.THRESHOLD_MS,
+                "queries": slow_query.worst(limit)}
+        if reset:
+            slow_query.reset()
+        return info
+
+    @app.get("/debug/statements")
+    def get_statements():
+        # /metrics 의 query 라벨(statement id) -> SQL 원문
+        return metrics.statements()
+
+@app.get("/status/pool")
+def get_pool_status():
+    return db_pool.get_pool().stats()
+
+@app.get("/status/cache")
+def get_cache_status():
+    return cache.stats()
+
+@app.get("/status/models")
+def get_model_status():
+    return model_store.stats()
+
+@app.get("/status/stations")
+def get_station_index_status():
+    return station_index.status()
+
+@app.get("/status/engine")
+def get_engine_status():
+    info = {"engine": query_engine.engine()}
+    if info["engine"] == "duckdb":
+        info["mirror"] = analytics_mirror.status()
+    return info
+
 # =============================================================================
 # [MODULE A] VITALITY INDEX (NEW FEATURE)
 # =============================================================================
-@app.get("/analysis/vitality")
-def calculate_vitality_index():
-    conn = None
+@cached("vitality")
+def build_vitality_index(f: AnalysisFilters = NO_FILTERS):
     try:
-        conn = get_db_connection()
-        if not conn: return []
-        
-        # Using the standard log for current vitality
-        sql = """
-            SELECT t.stnNm, LPAD(t.stnCd, 4, '0') as stnCd, m.lat, m.lon,
-            SUM(t.rideNope + t.gffNope) as total_vol,
-            SUM(CASE WHEN t.UserGroup LIKE '%노인%' OR t.UserGroup LIKE '%약자%' THEN t.rideNope + t.gffNope ELSE 0 END) as senior_vol,
-            SUM(CASE WHEN t.pasngHr BETWEEN 7 AND 10 THEN t.rideNope + t.gffNope ELSE 0 END) as morning_vol,
-            SUM(CASE WHEN t.pasngHr BETWEEN 17 AND 20 THEN t.rideNope + t.gffNope ELSE 0 END) as evening_vol
-            FROM subway_traffic_log t
-            JOIN station_meta m ON LPAD(t.stnCd, 4, '0') = LPAD(m.stnCd, 4, '0')
-            GROUP BY t.stnNm, t.stnCd, m.lat, m.lon
+        # Using the hourly rollup of the standard log for current vitality
+        # senior_vol = 분석 대상 사용자 구분(기본 노인), 기간/호선 조건은 WHERE 로 push-down
+        # 시간대 조건(hour_from/hour_to)은 적용하지 않음: 출근(7~10시)/퇴근(17~20시) 구간이 고정된 지표라
+        # WHERE 로 자르면 두 구간 비율이 깨짐 (trend/rank-daytime-active 와 같은 방식)
+        where, params = f.where('r', hours=False)
+        sql = f"""
+            SELECT r.stnNm, r.stnKey as stnCd,
+            SUM(r.volume) as total_vol,
+            SUM(CASE WHEN {f.focus_cond('r')} THEN r.volume ELSE 0 END) as senior_vol,
+            SUM(CASE WHEN r.pasngHr BETWEEN 7 AND 10 THEN r.volume ELSE 0 END) as morning_vol,
+            SUM(CASE WHEN r.pasngHr BETWEEN 17 AND 20 THEN r.volume ELSE 0 END) as evening_vol
+            FROM subway_traffic_hourly r
+            WHERE 1=1 {where}
+            GROUP BY r.stnNm, r.stnKey
         """
-        df = pd.read_sql(sql, conn)
+        df = query_engine.read_sql(sql, params)
         
         if df.empty: return []
+        # 좌표는 메모리 역 인덱스에서 (좌표 없는 역은 제외, 기존 JOIN 과 동일)
+        df = station_index.get_index().attach(df)
 
         # Filter low volume
         df = df[df['total_vol'] > 100].copy()
@@ -120,263 +240,200 @@ def calculate_vitality_index():
             (df['silver_ratio'] * 0.2)
         )
         
-        return df.sort_values('vitality_score', ascending=False).fillna(0).to_dict(orient='records')
+        return df.sort_values('vitality_score', ascending=False).fillna(0)
         
     except Exception as e:
         print(f"❌ Vitality Error: {e}")
         return []
-    finally:
-        if conn: conn.close()
+
+@app.get("/analysis/vitality")
+def calculate_vitality_index(request: Request, f: AnalysisFilters = Depends(analysis_filters)):
+    return frame_response(request, build_vitality_index(f))
 
 # =============================================================================
 # [MODULE B] PREDICTION (NEW FEATURE)
 # =============================================================================
-@app.get("/analysis/prediction")
-def predict_silver_tipping_point():
-    conn = None
+@cached("prediction")
+def build_silver_tipping_point(f: AnalysisFilters = NO_FILTERS, model="cagr", horizon=None, level=0.9):
     try:
-        conn = get_db_connection()
-        if not conn: return []
-        
-        # Using Historical Table if available, fallback or join with current logic
-        # For prediction, we need multi-year data. 
-        # Strategy: Use `subway_traffic_log_senior_22-24` for 2022-2024 history.
-        
-        sql = """
-            SELECT CAST(SUBSTR(pasngDe, 1, 4) AS CHAR) as year, stnNm, 
-            SUM(rideNope + gffNope) as total_vol
-            FROM `subway_traffic_log_senior_22-24`
-            GROUP BY year, stnNm
-        """
-        try:
-            df_hist = pd.read_sql(sql, conn)
-        except:
-            # Fallback if table doesn't exist (user said copies work, so it likely exists, but safety first)
-            print("⚠️ Historical table not found, using main log")
-            sql_fallback = "SELECT SUBSTR(pasngDe, 1, 4) as year, stnNm, SUM(rideNope+gffNope) as total_vol FROM subway_traffic_log WHERE UserGroup LIKE '%노인%' GROUP BY year, stnNm"
-            df_hist = pd.read_sql(sql_fallback, conn)
-
-        if df_hist.empty: return [] # No history = No prediction
-        
-        pivot = df_hist.pivot(index='stnNm', columns='year', values='total_vol').fillna(0)
-        
-        if len(pivot.columns) < 2: return []
-            
-        years = sorted(pivot.columns)
-        start_year, end_year = years[0], years[-1]
-        
-        results = []
-        for stn in pivot.index:
-            try:
-                s_val = pivot.loc[stn, start_year]
-                e_val = pivot.loc[stn, end_year]
-                
-                if s_val == 0: continue
-                
-                # CAGR
-                years_diff = len(years) - 1
-                if years_diff == 0: years_diff = 1
-                
-                cagr = ((e_val / s_val) ** (1/years_diff)) - 1
-                
-                # Project to 2030 (6 years from 2024)
-                proj_2030 = e_val * ((1 + cagr) ** 6)
-                
-                results.append({
-                    "stnNm": stn, 
-                    "cagr": round(cagr * 100, 2),
-                    "vol_2024": int(e_val),
-                    "proj_2030": int(proj_2030),
-                    "trend": "RISING" if cagr > 0 else "FALLING"
-                })
-            except: continue
-                
-        return sorted(results, key=lambda x: x['cagr'], reverse=True)
+        # 저장된 적합 결과로 예측만 수행 (없으면 최초 1회 적합, 새 데이터면 백그라운드 재적합)
+        df = model_store.forecast(f, model=model, horizon=horizon, level=level)
+        return df if df is not None and not df.empty else []
     except Exception as e:
         print(f"❌ Prediction Error: {e}")
         return []
-    finally:
-        if conn: conn.close()
+
+@app.get("/analysis/prediction")
+def predict_silver_tipping_point(
+    request: Request,
+    f: AnalysisFilters = Depends(analysis_filters),
+    model: str = Query("cagr", description="cagr | linear | seasonal"),
+    horizon: Optional[int] = Query(None, ge=1, le=30, description="기준 연도로부터 몇 년 뒤를 예측할지 (기본: 2030년까지)"),
+    level: float = Query(0.9, gt=0.5, lt=1.0, description="예측구간 신뢰수준"),
+):
+    if model not in forecasting.MODELS:
+        raise HTTPException(status_code=400, detail=f"model must be one of {', '.join(forecasting.MODELS)}")
+    return frame_response(request, build_silver_tipping_point(f, model, horizon, level))
 
 # =============================================================================
 # [LEGACY / STANDARD ENDPOINTS - RESTORED LOGIC]
 # =============================================================================
-@app.get("/meta/stations")
-def get_meta_stations():
-    conn = None
+@cached("meta_stations")
+def build_meta_stations():
     try:
-        conn = get_db_connection()
-        if not conn: return []
-        sql = """
-            SELECT DISTINCT m.stnNm, m.lineNm, LPAD(m.stnCd, 4, '0') as stnCd
-            FROM station_meta m
-            JOIN subway_traffic_log t ON LPAD(m.stnCd, 4, '0') = LPAD(t.stnCd, 4, '0')
-            ORDER BY m.stnNm, m.lineNm
-        """
-        df = pd.read_sql(sql, conn)
-        return df.to_dict(orient='records')
-    except: return []
-    finally:
-        if conn: conn.close()
+        # 데이터가 있는 역코드만 조회하고 역명/호선은 메모리 역 인덱스에서
+        keys = query_engine.read_sql("SELECT DISTINCT stnKey FROM subway_traffic_hourly")
+        meta = station_index.get_index().frame
+        meta = meta[meta['stnCd'].isin(keys['stnKey'].astype(str))]
+        return meta[['stnNm', 'lineNm', 'stnCd']].sort_values(['stnNm', 'lineNm']).reset_index(drop=True)
+    except Exception as e:
+        print(f"❌ Meta Stations Error: {e}")
+        return []
+
+@app.get("/meta/stations")
+def get_meta_stations(request: Request):
+    return frame_response(request, build_meta_stations())
 
 @app.get("/station/detail/{stn_cd}")
-def get_station_detail(stn_cd: str):
-    conn = None
+@cached("station_detail")
+def get_station_detail(stn_cd: str, start: Optional[date] = None, end: Optional[date] = None):
+    # 기본 통계 / 시간대 / 평일·주말을 한 번의 집계 쿼리로 계산 (station_profile 참고)
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    if len(stn_cd.strip()) > 4:
+        raise HTTPException(status_code=400, detail="stn_cd must be at most 4 characters")
     try:
-        conn = get_db_connection()
-        if not conn: return {"error": "DB"}
-        target_code = stn_cd.zfill(4)
-        
-        # Basic Stats (Restored SQL)
-        sql_basic = f"""
-            SELECT MAX(stnNm) as stnNm, SUM(rideNope + gffNope) as total_vol,
-            SUM(CASE WHEN UserGroup LIKE '%노인%' OR UserGroup LIKE '%약자%' OR UserGroup LIKE '%우대%' THEN rideNope + gffNope ELSE 0 END) as senior_vol
-            FROM subway_traffic_log WHERE LPAD(stnCd, 4, '0') = '{target_code}'
-        """
-        df_basic = pd.read_sql(sql_basic, conn)
-        
-        if df_basic.empty or df_basic['stnNm'].iloc[0] is None:
-             return {"error": f"No data: {target_code}"}
-            
-        # Time Pattern
-        sql_time = f"""
-            SELECT pasngHr, SUM(rideNope + gffNope) as vol FROM subway_traffic_log
-            WHERE LPAD(stnCd, 4, '0') = '{target_code}' 
-            AND (UserGroup LIKE '%노인%' OR UserGroup LIKE '%약자%' OR UserGroup LIKE '%우대%')
-            GROUP BY pasngHr ORDER BY pasngHr
-        """
-        df_time = pd.read_sql(sql_time, conn)
-        
-        # Day Pattern
-        sql_day = f"""
-            SELECT CASE WHEN DAYOFWEEK(STR_TO_DATE(pasngDe, '%Y%m%d')) IN (1, 7) THEN 'Weekend' ELSE 'Weekday' END as day_type,
-            SUM(rideNope + gffNope) as vol FROM subway_traffic_log
-            WHERE LPAD(stnCd, 4, '0') = '{target_code}' 
-            AND (UserGroup LIKE '%노인%' OR UserGroup LIKE '%약자%' OR UserGroup LIKE '%우대%')
-            GROUP BY day_type
-        """
-        df_day = pd.read_sql(sql_day, conn)
-        
-        return {
-            "basic": df_basic.fillna(0).to_dict(orient='records')[0],
-            "time": df_time.fillna(0).to_dict(orient='records'),
-            "day": df_day.fillna(0).to_dict(orient='records')
-        }
+        profile = station_profile.build_station_profile(stn_cd, start=start, end=end)
     except Exception as e:
-        return {"error": str(e)}
-    finally:
-        if conn: conn.close()
+        print(f"🚨 Backend DB Error: {e}")
+        return {"error": "DB"}
 
-@app.get("/analysis/trend/rhythm")
-def get_trend_rhythm():
-    conn = None
+    if profile is None:
+        return {"error": f"No data: {stn_cd.zfill(4)}"}
+    return profile
+
+@cached("trend_rhythm")
+def build_trend_rhythm(f: AnalysisFilters = NO_FILTERS):
     try:
-        conn = get_db_connection()
-        if not conn: return []
-        
         # Restored Logic: Union of Past (Senior Table) and Current (Log)
-        sql_hist = "SELECT CAST(SUBSTR(pasngDe, 1, 4) AS CHAR) as year, pasngHr, SUM(rideNope + gffNope) as volume FROM `subway_traffic_log_senior_22-24` GROUP BY year, pasngHr"
-        try:
-            df_hist = pd.read_sql(sql_hist, conn)
-        except:
-            df_hist = pd.DataFrame() # Fallback
-            
-        sql_curr = "SELECT 'Current' as year, pasngHr, SUM(rideNope + gffNope) as volume FROM subway_traffic_log WHERE (UserGroup LIKE '%노인%' OR UserGroup LIKE '%약자%') GROUP BY pasngHr"
-        df_curr = pd.read_sql(sql_curr, conn)
+        hist_where, hist_params = f.where(line=False)
+        curr_where, curr_params = f.where()
+        sql_hist = f"SELECT CAST(pasngYear AS CHAR) as year, pasngHr, SUM(rideNope + gffNope) as volume FROM `subway_traffic_log_senior_22-24` WHERE 1=1 {hist_where} GROUP BY pasngYear, pasngHr"
+        sql_curr = f"SELECT 'Current' as year, pasngHr, SUM(volume) as volume FROM subway_traffic_hourly WHERE {f.focus_cond()} {curr_where} GROUP BY pasngHr"
+
+        # 과거/현재 쿼리를 동시에 실행 (과거 테이블이 없거나 조건에 맞지 않으면 빈 DataFrame)
+        queries = {"curr": (sql_curr, curr_params)}
+        if f.history_allowed:
+            queries["hist"] = (sql_hist, hist_params)
+        res = query_engine.read_sql_parallel(queries, fallbacks={"hist": pd.DataFrame()})
         
-        return pd.concat([df_hist, df_curr], ignore_index=True).to_dict(orient='records')
+        return pd.concat([res.get("hist", pd.DataFrame()), res["curr"]], ignore_index=True)
     except: return []
-    finally:
-        if conn: conn.close()
 
-@app.get("/analysis/trend/rank-daytime-active")
-def get_trend_rank_daytime_active():
-    conn = None
+@app.get("/analysis/trend/rhythm")
+def get_trend_rhythm(request: Request, f: AnalysisFilters = Depends(analysis_filters)):
+    return frame_response(request, build_trend_rhythm(f))
+
+@cached("trend_rank_daytime_active")
+def build_trend_rank_daytime_active(f: AnalysisFilters = NO_FILTERS):
     try:
-        conn = get_db_connection()
-        if not conn: return []
-        
+        # 낮 시간대: 기본 10~16시, hour_from/hour_to 로 변경 가능
+        hr_from, hr_to = f.hour_window(10, 16)
+        hist_where, hist_params = f.where(hours=False, line=False)
+        curr_where, curr_params = f.where(hours=False)
+
         # 1. Past Data
-        sql_hist = """SELECT CAST(SUBSTR(pasngDe, 1, 4) AS CHAR) as year, stnNm, SUM(rideNope + gffNope) as volume FROM `subway_traffic_log_senior_22-24` WHERE pasngHr BETWEEN 10 AND 16 GROUP BY year, stnNm"""
-        try:
-            df_hist = pd.read_sql(sql_hist, conn)
-        except:
-            df_hist = pd.DataFrame(columns=['year', 'stnNm', 'volume'])
+        sql_hist = f"""SELECT CAST(pasngYear AS CHAR) as year, stnNm, SUM(rideNope + gffNope) as volume FROM `subway_traffic_log_senior_22-24` WHERE pasngHr BETWEEN %s AND %s {hist_where} GROUP BY pasngYear, stnNm"""
         
         # 2. Current Data
-        sql_curr = """SELECT 'Current' as year, stnNm, SUM(rideNope + gffNope) as volume FROM subway_traffic_log WHERE (UserGroup LIKE '%노인%' OR UserGroup LIKE '%약자%' OR UserGroup LIKE '%우대%') AND pasngHr BETWEEN 10 AND 16 GROUP BY stnNm"""
-        df_curr = pd.read_sql(sql_curr, conn)
-        
-        # 3. Meta Data
-        sql_meta = "SELECT stnNm, lat, lon FROM station_meta"
-        df_meta = pd.read_sql(sql_meta, conn)
+        sql_curr = f"""SELECT 'Current' as year, stnNm, SUM(volume) as volume FROM subway_traffic_hourly WHERE {f.focus_cond()} AND pasngHr BETWEEN %s AND %s {curr_where} GROUP BY stnNm"""
+
+        # 쿼리들을 동시에 실행 (과거 테이블이 없거나 조건에 맞지 않으면 빈 DataFrame 으로 대체)
+        empty_hist = pd.DataFrame(columns=['year', 'stnNm', 'volume'])
+        queries = {
+            "curr": (sql_curr, [hr_from, hr_to] + curr_params),
+        }
+        if f.history_allowed:
+            queries["hist"] = (sql_hist, [hr_from, hr_to] + hist_params)
+        res = query_engine.read_sql_parallel(queries, fallbacks={"hist": empty_hist})
+        df_hist, df_curr = res.get("hist", empty_hist), res["curr"]
         
         # Restored Processing Logic (Fixing the Station Name Mismatch)
         df_all = pd.concat([df_hist, df_curr], ignore_index=True)
         
-        # Apply strict suffixing to ensure matches
-        df_all['stnNm'] = df_all['stnNm'].apply(lambda x: x if str(x).endswith('역') else str(x) + '역')
-        df_meta['stnNm'] = df_meta['stnNm'].apply(lambda x: x if str(x).endswith('역') else str(x) + '역')
+        # Apply strict suffixing to ensure matches (벡터 연산으로 표준 역명 통일)
+        df_all['stnNm'] = station_index.normalize_names(df_all['stnNm']).to_numpy()
         
         df_grouped = df_all.groupby(['year', 'stnNm'], as_index=False)['volume'].sum()
-        df_meta_unique = df_meta.drop_duplicates(subset=['stnNm'])
         
-        # Left merge to keep traffic data, drop if no coordinates
-        df_final = pd.merge(df_grouped, df_meta_unique, on='stnNm', how='left').dropna(subset=['lat', 'lon'])
+        # 좌표는 역명 기준으로 메모리에서 붙이고, 좌표가 없으면 제외
+        df_final = station_index.get_index().attach(df_grouped, on='stnNm').dropna(subset=['lat', 'lon'])
         
-        return df_final.to_dict(orient='records')
+        return df_final
     except Exception as e:
         print(f"❌ Active Error: {e}")
         return []
-    finally:
-        if conn: conn.close()
+
+@app.get("/analysis/trend/rank-daytime-active")
+def get_trend_rank_daytime_active(request: Request, f: AnalysisFilters = Depends(analysis_filters)):
+    return frame_response(request, build_trend_rank_daytime_active(f))
         
-@app.get("/analysis/timelapse")
-def get_timelapse():
-    conn = None
+@cached("timelapse")
+def build_timelapse(f: AnalysisFilters = NO_FILTERS):
     try:
-        conn = get_db_connection()
-        if not conn: return []
-        sql = """
-            SELECT t.pasngHr, t.stnNm, MAX(m.lat) as lat, MAX(m.lon) as lon, SUM(t.rideNope + t.gffNope) as volume
-            FROM subway_traffic_log t 
-            JOIN station_meta m ON LPAD(t.stnCd, 4, '0') = LPAD(m.stnCd, 4, '0')
-            WHERE (t.UserGroup LIKE '%노인%' OR t.UserGroup LIKE '%약자%' OR t.UserGroup LIKE '%우대%')
-            GROUP BY t.pasngHr, t.stnNm
+        where, params = f.where('r')
+        sql = f"""
+            SELECT r.pasngHr, r.stnKey as stnCd, r.stnNm, SUM(r.volume) as volume
+            FROM subway_traffic_hourly r 
+            WHERE {f.focus_cond('r')} {where}
+            GROUP BY r.pasngHr, r.stnKey, r.stnNm
         """
-        return pd.read_sql(sql, conn).to_dict(orient='records')
+        df = query_engine.read_sql(sql, params)
+        if df.empty:
+            return df
+        # 좌표는 역코드로 메모리에서 붙인 뒤 (시간, 역명) 단위로 합침 (기존 JOIN + MAX 와 동일)
+        df = station_index.get_index().attach(df)
+        return df.groupby(['pasngHr', 'stnNm'], as_index=False).agg(
+            lat=('lat', 'max'), lon=('lon', 'max'), volume=('volume', 'sum')
+        )
     except: return []
-    finally:
-        if conn: conn.close()
 
-@app.get("/analysis/clustering")
-def get_clustering():
-    conn = None
+@app.get("/analysis/timelapse")
+def get_timelapse(request: Request, f: AnalysisFilters = Depends(analysis_filters)):
+    return frame_response(request, build_timelapse(f))
+
+@cached("clustering")
+def build_clustering(f: AnalysisFilters = NO_FILTERS, k=3, features="ratios", algorithm="kmeans"):
     try:
-        conn = get_db_connection()
-        if not conn: return []
-        
-        # Restored Clustering Logic (Total > 500)
-        sql = """
-            SELECT t.stnNm, LPAD(t.stnCd, 4, '0') as stnCd, 
-            SUM(t.rideNope + t.gffNope) as total,
-            SUM(CASE WHEN t.pasngHr BETWEEN 6 AND 11 THEN t.rideNope + t.gffNope ELSE 0 END) as morning,
-            SUM(CASE WHEN t.pasngHr BETWEEN 12 AND 17 THEN t.rideNope + t.gffNope ELSE 0 END) as afternoon,
-            SUM(CASE WHEN t.pasngHr >= 18 THEN t.rideNope + t.gffNope ELSE 0 END) as evening
-            FROM subway_traffic_log t
-            WHERE (t.UserGroup LIKE '%노인%' OR t.UserGroup LIKE '%약자%' OR t.UserGroup LIKE '%우대%')
-            GROUP BY t.stnNm, stnCd 
-            HAVING total > 500
+        # 역 x 시간대 이용량을 한 번에 가져와 서버에서 군집화 (특징 세트 / k / 알고리즘 선택)
+        where, params = f.where('r')
+        sql = f"""
+            SELECT r.stnKey as stnCd, r.stnNm, r.pasngHr, SUM(r.volume) as volume
+            FROM subway_traffic_hourly r
+            WHERE {f.focus_cond('r')} {where}
+            GROUP BY r.stnKey, r.stnNm, r.pasngHr
         """
-        df = pd.read_sql(sql, conn)
-        
-        sql_meta = "SELECT LPAD(stnCd, 4, '0') as stnCd, lat, lon FROM station_meta"
-        df_meta = pd.read_sql(sql_meta, conn).drop_duplicates(subset=['stnCd'])
-        
-        return pd.merge(df, df_meta, on='stnCd', how='inner').fillna(0).to_dict(orient='records')
+        df_hourly = query_engine.read_sql(sql, params)
+        if df_hourly.empty:
+            return []
+        df = clustering.cluster_stations(df_hourly, k=k, feature_set=features, algorithm=algorithm)
+
+        return station_index.get_index().attach(df).fillna(0)
     except Exception as e:
         print(f"❌ Clustering Error: {e}")
         return []
-    finally:
-        if conn: conn.close()
+
+@app.get("/analysis/clustering")
+def get_clustering(
+    request: Request,
+    f: AnalysisFilters = Depends(analysis_filters),
+    k: int = Query(3, ge=2, le=10, description="군집 수"),
+    features: str = Query("ratios", description="ratios | profile24"),
+    algorithm: str = Query("kmeans", description="kmeans | minibatch"),
+):
+    if features not in clustering.FEATURE_SETS:
+        raise HTTPException(status_code=400, detail=f"features must be one of {', '.join(clustering.FEATURE_SETS)}")
+    if algorithm not in clustering.ALGORITHMS:
+        raise HTTPException(status_code=400, detail=f"algorithm must be one of {', '.join(clustering.ALGORITHMS)}")
+    return frame_response(request, build_clustering(f, k, features, algorithm))
 
@@ -0,0 +1,259 @@
+import hashlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# =============================================================================
+# [CORE] METRICS (Prometheus text format, 외부 패키지 없음)
+# - 라우트별 요청 지연 히스토그램 (MetricsMiddleware)
+# - SQL 문장별 실행 시간 / 반환 행 수 (엔드포인트 태그, query_engine.read_sql 에서 기록)
+# - 엔드포인트별 결과 계산 시간과 그중 DataFrame 후처리 시간 (= 계산 - SQL, result_cache 에서 기록)
+# - 직렬화 시간 / 크기 (JSON, Arrow; responses.py 에서 기록)
+# - /metrics 로 노출 -> 데이터가 늘면서 어느 엔드포인트가 느려지는지 추적
+# - SQL 은 statement id(해시)로만 라벨링, id -> 원문 표는 statements() (/debug/statements)
+# =============================================================================
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+BYTE_BUCKETS = (1024, 16384, 131072, 1048576, 8388608)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _fmt_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _fmt_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = {k: (list(v) if isinstance(v, list) else v) for k, v in self._series.items()}
+        for key in sorted(series):
+            lines.extend(self._render_series(key, series[key]))
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{_fmt_labels(self.labels, key)} {_fmt_value(value)}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._series.get(key)
+            if state is None:
+                # [버킷별 개수..., 합계, 개수]
+                state = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _render_series(self, key, state):
+        lines = []
+        for bound, count in zip(self.buckets, state):
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, [('le', bound)])} {count}")
+        lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, [('le', '+Inf')])} {state[-1]}")
+        lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(state[-2])}")
+        lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {state[-1]}")
+        return lines
+
+# =============================================================================
+# Registry
+# =============================================================================
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("route", "method", "status"))
+SQL_SECONDS = Histogram("sql_query_duration_seconds", "SQL execution time by endpoint and statement", ("endpoint", "engine", "query"))
+SQL_ROWS = Histogram("sql_rows_returned", "Rows returned per SQL statement", ("endpoint", "query"), ROW_BUCKETS)
+SQL_ERRORS = Counter("sql_errors_total", "Failed SQL statements", ("endpoint", "query"))
+BUILD_SECONDS = Histogram("endpoint_build_duration_seconds", "Result computation time on cache miss (SQL + post-processing)", ("endpoint",))
+POSTPROCESS_SECONDS = Histogram("endpoint_postprocess_duration_seconds", "DataFrame post-processing time (build time minus SQL time)", ("endpoint",))
+SERIALIZE_SECONDS = Histogram("response_serialize_duration_seconds", "Response body serialization time", ("endpoint", "format"))
+RESPONSE_BYTES = Histogram("response_body_bytes", "Serialized response size before compression", ("endpoint", "format"), BYTE_BUCKETS)
+
+REGISTRY = [REQUEST_SECONDS, SQL_SECONDS, SQL_ROWS, SQL_ERRORS,
+            BUILD_SECONDS, POSTPROCESS_SECONDS, SERIALIZE_SECONDS, RESPONSE_BYTES]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# =============================================================================
+# Request context (어느 엔드포인트의 SQL / 직렬화인지 태깅)
+# =============================================================================
+# {"endpoint": 이름, "sql": 누적 SQL 초} - 요청(또는 워밍업 작업) 단위로 공유되는 dict
+_state = ContextVar("metrics_state", default=None)
+_state_lock = threading.Lock()
+
+def current_endpoint():
+    state = _state.get()
+    return state["endpoint"] if state else "-"
+
+def tag(endpoint):
+    # 현재 요청을 엔드포인트 이름으로 표시 (캐시 적중이어도 직렬화 시간이 같은 이름으로 묶이도록)
+    state = _state.get()
+    if state is not None:
+        state["endpoint"] = endpoint
+
+@contextmanager
+def request_scope():
+    token = _state.set({"endpoint": "-", "sql": 0.0})
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+def bind(func):
+    # 다른 스레드(병렬 쿼리 executor)에서도 같은 요청 상태를 쓰도록 묶음
+    state = _state.get()
+
+    def run(*args, **kwargs):
+        token = _state.set(state)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _state.reset(token)
+    return run
+
+@contextmanager
+def build_timer(endpoint):
+    """
+    Time a result computation for `endpoint`. SQL run inside is tagged with the endpoint,
+    and post-processing time is what is left after SQL time.
+    Parallel queries overlap, so SQL time can exceed wall time; post-processing is clamped at 0.
+    """
+    state = _state.get()
+    token = None
+    if state is None:
+        token = _state.set({"endpoint": endpoint, "sql": 0.0})
+        state = _state.get()
+    outer_sql = state["sql"]
+    state["endpoint"], state["sql"] = endpoint, 0.0
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        BUILD_SECONDS.observe(elapsed, endpoint=endpoint)
+        POSTPROCESS_SECONDS.observe(max(elapsed - state["sql"], 0.0), endpoint=endpoint)
+        state["sql"] += outer_sql
+        if token is not None:
+            _state.reset(token)
+
+# =============================================================================
+# SQL timing
+# =============================================================================
+_statement_ids = {}
+
+def statement_id(sql):
+    # 공백을 정리한 SQL 의 해시 앞 12자 (바인딩 파라미터는 제외되므로 문장 종류 수만큼만 생김)
+    # 원문은 라벨로 내보내지 않음 (긴 여러 줄 라벨 / 높은 cardinality) -> statements() 로 조회
+    text = re.sub(r"\s+", " ", sql).strip()
+    sid = _statement_ids.get(text)
+    if sid is None:
+        sid = hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+        _statement_ids[text] = sid
+    return sid
+
+def statements():
+    # statement id -> 공백 정리한 SQL 원문 (지금까지 실행된 문장 종류만큼)
+    return {sid: text for text, sid in list(_statement_ids.items())}
+
+def timed_sql(reader, sql, params, engine):
+    sid = statement_id(sql)
+    endpoint = current_endpoint()
+    started = time.perf_counter()
+    try:
+        df = reader(sql, params)
+    except Exception:
+        SQL_ERRORS.inc(endpoint=endpoint, query=sid)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        SQL_SECONDS.observe(elapsed, endpoint=endpoint, engine=engine, query=sid)
+        state = _state.get()
+        if state is not None:
+            with _state_lock:
+                state["sql"] += elapsed
+    SQL_ROWS.observe(len(df), endpoint=endpoint, query=sid)
+    return df
+
+# =============================================================================
+# Serialization
+# =============================================================================
+def observe_serialization(fmt, seconds, body):
+    endpoint = current_endpoint()
+    SERIALIZE_SECONDS.observe(seconds, endpoint=endpoint, format=fmt)
+    RESPONSE_BYTES.observe(len(body), endpoint=endpoint, format=fmt)
+
+# =============================================================================
+# Request latency (ASGI middleware)
+# =============================================================================
+class MetricsMiddleware:
+    """
+    Record request latency per route template (e.g. /station/detail/{stn_cd}) and open a
+    metrics scope so SQL / serialization inside the request are tagged with its endpoint.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with request_scope():
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # 라우팅이 끝나면 scope["route"] 에 매칭된 경로 템플릿이 들어 있음
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_SECONDS.observe(time.perf_counter() - started, route=route,
+                                        method=scope.get("method", ""), status=status["code"])
+
+def add_metrics(app):
+    app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,330 @@
+import os
+
+import dbconnect
+import ingest_state
+import partitions
+import rollup
+
+# =============================================================================
+# [DB MIGRATION] 스키마 변경 이력 관리
+# - 기존 DB를 최신 스키마로 올리는 단계들을 순서대로 실행
+# - 이미 적용된 단계는 schema_migrations 테이블에 기록되어 다시 실행되지 않음
+# - 새로 구축하는 DB는 create_table*.sql 만으로 최신 스키마가 됨
+#   (이 경우에도 실행하면 각 단계가 "이미 적용됨"을 감지하고 기록만 남김)
+# - MySQL DDL 은 암묵적으로 커밋되어 실패해도 rollback 되지 않음
+#   -> 각 단계는 변경마다 현재 스키마를 확인하므로 실패한 단계를 다시 실행하면 남은 부분만 진행
+#
+# 실행: cd backend && python migrate.py
+# =============================================================================
+
+def _column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _table_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _index_exists(cursor, table, index):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (table, index)
+    )
+    return cursor.fetchone()[0] > 0
+
+def _run_sql_file(cursor, file_name):
+    # 루트의 create_table*.sql 실행 (USE 문은 현재 연결 DB를 쓰므로 건너뜀)
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root_dir, file_name), encoding='utf-8') as f:
+        for stmt in f.read().split(';'):
+            if stmt.strip() and not stmt.strip().upper().startswith('USE'):
+                cursor.execute(stmt)
+
+# -----------------------------------------------------------------------------
+# 0001. 표준 역코드(stnKey)
+# - 예전 backend/fix.py 를 대체: 짧은 코드(150)를 4자리(0150)로 통일하고 중복 찌꺼기 정리
+# - stnKey = LPAD(stnCd, 4, '0') 를 STORED 생성 컬럼으로 추가 -> 쓰기 시점에 정규화
+# - 유니크 키를 stnKey 기준으로 바꿔 같은 역의 두 표기가 다시 들어오지 못하게 함
+# - LPAD 는 4자보다 긴 코드를 잘라버리므로 그런 코드가 있으면 중단, 이후 입력은 CHECK 로 거부
+# - 주요 접근 패턴 인덱스: (역, 일자, 시간). (일자, 시간)은 유니크 키 앞부분이 담당
+# -----------------------------------------------------------------------------
+_STN_KEY_COLUMN = "stnKey CHAR(4) GENERATED ALWAYS AS (LPAD(TRIM(stnCd), 4, '0')) STORED NOT NULL COMMENT '표준 역코드 (4자리)'"
+_STN_LENGTH_CHECK = "CHECK (CHAR_LENGTH(TRIM(stnCd)) <= 4)"
+
+_TRAFFIC_TABLES = [
+    # (테이블, 유니크 키 이름, 역/일자/시간 인덱스 이름)
+    ("subway_traffic_log", "uk_subway_log", "idx_log_stn_date_hr"),
+    ("subway_traffic_log_senior_22-24", "uk_senior_log", "idx_senior_stn_date_hr"),
+]
+
+def _check_code_length(cursor, table):
+    # 잘리면 서로 다른 역이 같은 stnKey 로 합쳐지므로 자동 변환하지 않고 중단
+    cursor.execute(f"SELECT DISTINCT stnCd FROM `{table}` WHERE CHAR_LENGTH(TRIM(stnCd)) > 4 LIMIT 10")
+    long_codes = [row[0] for row in cursor.fetchall()]
+    if long_codes:
+        raise RuntimeError(f"`{table}` 에 4자보다 긴 역코드가 있어 stnKey 로 변환할 수 없습니다: {long_codes}")
+
+def migrate_station_key(cursor):
+    if not _column_exists(cursor, "station_meta", "stnKey"):
+        print("   -> station_meta 역코드 표준화")
+        _check_code_length(cursor, "station_meta")
+        # [Step A] 바꿀 수 있는 건 4자리로 (이미 4자리 버전이 있으면 무시)
+        cursor.execute("UPDATE IGNORE station_meta SET stnCd = LPAD(TRIM(stnCd), 4, '0') WHERE CHAR_LENGTH(stnCd) < 4")
+        # [Step B] 남은 짧은 코드는 4자리 행과 겹치는 중복 -> 4자리 행의 빈 값만 채우고 삭제
+        cursor.execute("""
+            UPDATE station_meta m
+            JOIN station_meta s ON s.stnCd <> m.stnCd AND LPAD(TRIM(s.stnCd), 4, '0') = m.stnCd
+            SET m.stnNm = COALESCE(NULLIF(m.stnNm, ''), s.stnNm),
+                m.lineNm = COALESCE(NULLIF(m.lineNm, ''), s.lineNm),
+                m.lat = COALESCE(NULLIF(m.lat, 0), s.lat),
+                m.lon = COALESCE(NULLIF(m.lon, 0), s.lon)
+            WHERE CHAR_LENGTH(s.stnCd) < 4
+        """)
+        cursor.execute("DELETE FROM station_meta WHERE CHAR_LENGTH(stnCd) < 4")
+        print(f"      중복 역 삭제: {cursor.rowcount}건")
+        cursor.execute(f"""
+            ALTER TABLE station_meta
+            ADD COLUMN {_STN_KEY_COLUMN} AFTER stnCd,
+            ADD CONSTRAINT chk_station_stn_len {_STN_LENGTH_CHECK},
+            DROP INDEX uk_station_code,
+            ADD UNIQUE KEY uk_station_key (stnKey)
+        """)
+
+    for table, uk_name, idx_name in _TRAFFIC_TABLES:
+        if not _table_exists(cursor, table) or _column_exists(cursor, table, "stnKey"):
+            continue
+
+        print(f"   -> `{table}` 역코드 표준화 (시간 소요)")
+        _check_code_length(cursor, table)
+        # [Step A] 바꿀 수 있는 건 4자리로 (이미 4자리 버전이 있으면 무시)
+        cursor.execute(f"UPDATE IGNORE `{table}` SET stnCd = LPAD(TRIM(stnCd), 4, '0') WHERE CHAR_LENGTH(stnCd) < 4")
+        # [Step B] 남은 짧은 코드는 4자리 '진짜 데이터'와 겹치는 찌꺼기 -> 삭제
+        cursor.execute(f"DELETE FROM `{table}` WHERE CHAR_LENGTH(stnCd) < 4")
+        print(f"      중복 찌꺼기 삭제: {cursor.rowcount}건")
+
+        cursor.execute(f"""
+            ALTER TABLE `{table}`
+            ADD COLUMN {_STN_KEY_COLUMN} AFTER stnCd,
+            ADD CONSTRAINT chk_{uk_name[3:]}_stn_len {_STN_LENGTH_CHECK},
+            DROP INDEX {uk_name},
+            ADD UNIQUE KEY {uk_name} (pasngDe, pasngHr, stnKey, trnscdUserSeCd),
+            ADD INDEX {idx_name} (stnKey, pasngDe, pasngHr)
+        """)
+
+# -----------------------------------------------------------------------------
+# 0002. 사용자 구분 등급(userClass)
+# - UserGroup LIKE '%노인%' (앞쪽 와일드카드 -> 인덱스 불가) 대신 정수 등급으로 필터
+# - trnscdUserSeCd 로부터 계산되는 STORED 생성 컬럼 + 차원 테이블(user_class_dim)
+# - 노인 전용 쿼리가 노인 행만 읽도록 (등급, 역, 일자) 인덱스
+# - 집계 테이블은 UserGroup 대신 userClass 로 다시 만듦
+#   (다시 집계하는 SQL 은 0003 의 pasngDate 를 쓰므로 모든 단계가 끝난 뒤 run_migrations 에서 채움)
+# -----------------------------------------------------------------------------
+_USER_CLASS_COLUMN = (
+    "userClass TINYINT GENERATED ALWAYS AS ("
+    "CASE WHEN trnscdUserSeCd = '01' THEN 1 WHEN trnscdUserSeCd IN ('02', '03', '04') THEN 2 WHEN trnscdUserSeCd IN ('06', '100') THEN 3 ELSE 9 END"
+    ") STORED NOT NULL COMMENT '사용자 구분 등급 (user_class_dim)'"
+)
+
+def migrate_user_class(cursor):
+    _run_sql_file(cursor, 'create_table_5.sql')
+
+    if not _column_exists(cursor, "subway_traffic_log", "userClass"):
+        print("   -> subway_traffic_log 사용자 등급 컬럼 추가 (시간 소요)")
+        cursor.execute(f"""
+            ALTER TABLE subway_traffic_log
+            ADD COLUMN {_USER_CLASS_COLUMN} AFTER trnscdUserSeCd,
+            ADD INDEX idx_log_class_stn_date (userClass, stnKey, pasngDe)
+        """)
+
+    table = "subway_traffic_log_senior_22-24"
+    if _table_exists(cursor, table) and not _column_exists(cursor, table, "userClass"):
+        cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN {_USER_CLASS_COLUMN} AFTER trnscdUserSeCd")
+
+    if _table_exists(cursor, rollup.ROLLUP_TABLE) and _column_exists(cursor, rollup.ROLLUP_TABLE, "UserGroup"):
+        print(f"   -> {rollup.ROLLUP_TABLE} 을 userClass 기준으로 재구성")
+        # 파생 테이블이므로 비우고 새 키로 다시 집계
+        cursor.execute(f"TRUNCATE TABLE {rollup.ROLLUP_TABLE}")
+        cursor.execute(f"""
+            ALTER TABLE {rollup.ROLLUP_TABLE}
+            DROP PRIMARY KEY,
+            DROP COLUMN UserGroup,
+            ADD COLUMN userClass TINYINT NOT NULL DEFAULT 9 COMMENT '사용자 구분 등급 (user_class_dim)' AFTER pasngHr,
+            ADD PRIMARY KEY (stnKey, pasngDate, pasngHr, userClass),
+            ADD INDEX idx_hourly_class_stn_date (userClass, stnKey, pasngDate)
+        """)
+
+# -----------------------------------------------------------------------------
+# 0003. 날짜 컬럼(DATE) + 연도/요일 + 연도별 파티션
+# - pasngDe(VARCHAR) 를 매 행마다 SUBSTR / STR_TO_DATE 하던 것을 생성 컬럼으로 대체
+# - 파티션 키(pasngDate)는 모든 유니크 키에 포함되어야 하므로
+#   PK 는 (id, pasngDate), 유니크 키는 pasngDe 대신 pasngDate 기준으로 교체 (의미 동일)
+# -----------------------------------------------------------------------------
+_DATE_COLUMNS = [
+    "pasngDate DATE GENERATED ALWAYS AS (STR_TO_DATE(pasngDe, '%Y%m%d')) STORED NOT NULL COMMENT '통행일자 (DATE, 파티션 키)' AFTER pasngDe",
+    "pasngYear SMALLINT GENERATED ALWAYS AS (YEAR(pasngDate)) STORED NOT NULL COMMENT '통행연도' AFTER pasngDate",
+    "pasngDow TINYINT GENERATED ALWAYS AS (DAYOFWEEK(pasngDate)) STORED NOT NULL COMMENT '요일 (1=일 ~ 7=토)' AFTER pasngYear",
+]
+
+def _year_range(cursor, table, date_col):
+    cursor.execute(f"SELECT MIN({date_col}), MAX({date_col}) FROM `{table}`")
+    first, last = cursor.fetchone()
+    if first is None:
+        return 2022, 2027
+    first_year, last_year = int(str(first)[:4]), int(str(last)[:4])
+    # 내년치까지 미리 만들어 두고 이후는 pmax 로
+    return first_year, last_year + 1
+
+def _is_partitioned(cursor, table):
+    return len(partitions.list_partitions(cursor, table)) > 0
+
+def migrate_date_partitions(cursor):
+    # DDL 은 암묵적으로 커밋되어 runner 의 rollback 으로 되돌릴 수 없음
+    # -> 컬럼 추가와 파티션 구성을 각각 현재 상태로 확인 (중간에 실패해도 다음 실행이 이어서 진행)
+    for table, uk_name, idx_name in _TRAFFIC_TABLES:
+        if not _table_exists(cursor, table):
+            continue
+
+        if not _column_exists(cursor, table, "pasngDate"):
+            print(f"   -> `{table}` 날짜 컬럼 추가 (시간 소요)")
+            alters = [f"ADD COLUMN {col}" for col in _DATE_COLUMNS]
+            alters += [
+                "DROP PRIMARY KEY",
+                "ADD PRIMARY KEY (id, pasngDate)",
+                f"DROP INDEX {uk_name}",
+                f"ADD UNIQUE KEY {uk_name} (pasngDate, pasngHr, stnKey, trnscdUserSeCd)",
+                f"DROP INDEX {idx_name}",
+                f"ADD INDEX {idx_name} (stnKey, pasngDate, pasngHr)",
+            ]
+            if table == "subway_traffic_log":
+                alters += [
+                    "DROP INDEX idx_log_class_stn_date",
+                    "ADD INDEX idx_log_class_stn_date (userClass, stnKey, pasngDate)",
+                ]
+            cursor.execute(f"ALTER TABLE `{table}` " + ",\n".join(alters))
+
+        if not _is_partitioned(cursor, table):
+            print(f"   -> `{table}` 연도별 파티션 구성 (시간 소요)")
+            partitions.partition_table(cursor, table, *_year_range(cursor, table, "pasngDate"))
+
+    table = rollup.ROLLUP_TABLE
+    if not _table_exists(cursor, table):
+        return
+    if not _column_exists(cursor, table, "pasngYear"):
+        print(f"   -> {table} 연도/요일 컬럼 추가")
+        cursor.execute(f"""
+            ALTER TABLE {table}
+            ADD COLUMN {_DATE_COLUMNS[1]},
+            ADD COLUMN {_DATE_COLUMNS[2]}
+        """)
+    if not _is_partitioned(cursor, table):
+        print(f"   -> {table} 연도별 파티션 구성")
+        partitions.partition_table(cursor, table, *_year_range(cursor, table, "pasngDate"))
+
+# -----------------------------------------------------------------------------
+# 0004. 적재 워터마크(ingest_state) - 결과 캐시 자동 무효화용
+# -----------------------------------------------------------------------------
+def migrate_ingest_state(cursor):
+    _run_sql_file(cursor, 'create_table_6.sql')
+
+# -----------------------------------------------------------------------------
+# 0005. 호선 필터용 롤업 인덱스 (?line=2호선&start=... 조건을 인덱스 범위로 조회)
+# -----------------------------------------------------------------------------
+def migrate_hourly_line_index(cursor):
+    table = rollup.ROLLUP_TABLE
+    if _table_exists(cursor, table) and not _index_exists(cursor, table, "idx_hourly_line_date"):
+        cursor.execute(f"ALTER TABLE {table} ADD INDEX idx_hourly_line_date (lineNm, pasngDate)")
+
+# -----------------------------------------------------------------------------
+# 0006. 테이블 통계(table_stats) - /status 가 COUNT(*) 대신 읽음 (처음 한 번만 정확히 집계)
+# -----------------------------------------------------------------------------
+def migrate_table_stats(cursor):
+    _run_sql_file(cursor, 'create_table_7.sql')
+    for table in ingest_state.DATE_COLUMNS:
+        if _table_exists(cursor, table):
+            print(f"   -> {table} 행 수 집계")
+            ingest_state.recount(cursor, table)
+
+# -----------------------------------------------------------------------------
+# 0007. 버전별 변경 일자(ingest_changes) - DuckDB 미러 증분 갱신용
+# -----------------------------------------------------------------------------
+def migrate_ingest_changes(cursor):
+    _run_sql_file(cursor, 'create_table_8.sql')
+
+
+MIGRATIONS = [
+    ("0001_station_key", migrate_station_key),
+    ("0002_user_class", migrate_user_class),
+    ("0003_date_partitions", migrate_date_partitions),
+    ("0004_ingest_state", migrate_ingest_state),
+    ("0005_hourly_line_index", migrate_hourly_line_index),
+    ("0006_table_stats", migrate_table_stats),
+    ("0007_ingest_changes", migrate_ingest_changes),
+]
+
+def _rebuild_rollup_if_empty(conn, cursor):
+    # 집계 테이블을 비운 단계(0002)가 있었거나 이전 실행이 재집계 전에 멈춘 경우
+    # 스키마가 최신(pasngDate 있음)이 된 다음에만 다시 집계
+    table = rollup.ROLLUP_TABLE
+    if not _table_exists(cursor, table) or not _column_exists(cursor, "subway_traffic_log", "pasngDate"):
+        return False
+    cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+    if cursor.fetchone():
+        return False
+    cursor.execute("SELECT 1 FROM subway_traffic_log LIMIT 1")
+    if not cursor.fetchone():
+        return False
+    print(f"🔧 [{table}] 재집계 중...")
+    rollup.rebuild_rollup(conn, bump_watermark=_table_exists(cursor, "ingest_state"))
+    return True
+
+def run_migrations(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR(100) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    cursor.execute("SELECT name FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
+
+    done = []
+    for name, func in MIGRATIONS:
+        if name in applied:
+            continue
+        print(f"🔧 [{name}] 적용 중...")
+        try:
+            func(cursor)
+            cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        done.append(name)
+
+    if _rebuild_rollup_if_empty(conn, cursor):
+        done.append(f"{rollup.ROLLUP_TABLE} rebuild")
+    return done
+
+
+if __name__ == "__main__":
+    conn = dbconnect.MydbConnect('seoul_urban_lab')
+    try:
+        done = run_migrations(conn)
+        if done:
+            print(f"\n✅ 마이그레이션 완료: {', '.join(done)}")
+        else:
+            print("✅ 이미 최신 스키마입니다.")
+    except Exception as e:
+        print(f"\n❌ 마이그레이션 실패: {e}")
+    finally:
+        conn.close()
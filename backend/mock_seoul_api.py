@@ -0,0 +1,175 @@
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =============================================================================
+# [TEST] getStnPsgr 로컬 목(mock) 서버 - ingest_api.py 를 실제 API 없이 시험
+# - 공식 API 와 같은 경로: /{KEY}/json/getStnPsgr/{START}/{END}/{YYYYMMDD}
+# - 날짜마다 결정적인(같은 날짜 = 같은 행) 역 x 시간 x 사용자 구분 행 생성
+# - 응답 지연, 실패율(500 / 깨진 JSON), 초당 요청 한도(429)를 흉내 내 재시도 / 속도 제한 확인
+#
+#   python mock_seoul_api.py --port 8089 --fail-rate 0.05 --max-rps 20
+#   SEOUL_API_BASE=http://127.0.0.1:8089 python ingest_api.py 2026-01-01 2026-01-31 --dry-run
+# =============================================================================
+
+SERVICE = "getStnPsgr"
+LINES = [f"{n}호선" for n in range(1, 10)]
+USER_CODES = {
+    "01": "일반", "02": "어린이", "03": "청소년", "04": "대학생",
+    "06": "우대권", "100": "경로", "99": "외국인",
+}
+BUSINESS_HOURS = range(5, 25)  # 05시 ~ 24시 (공식 데이터와 같은 시간대 범위)
+
+def _stations(n):
+    rng = random.Random(20250101)
+    return [{"stnCd": f"{150 + i * 7:04d}", "stnNo": str(i + 1), "stnNm": f"테스트{i + 1}역",
+             "lineNm": rng.choice(LINES)} for i in range(n)]
+
+def make_rows(date_str, stations):
+    # 같은 날짜는 항상 같은 행 (재실행 / 재시도 후에도 결과 비교 가능)
+    rng = random.Random(zlib.crc32(date_str.encode()))
+    rows = []
+    for stn in stations:
+        for hr in BUSINESS_HOURS:
+            for code, name in USER_CODES.items():
+                rows.append({
+                    "pasngDe": date_str, "pasngHr": f"{hr:02d}", "lineNm": stn["lineNm"],
+                    "stnCd": stn["stnCd"].lstrip("0"), "stnNo": stn["stnNo"], "stnNm": stn["stnNm"],
+                    "trnscdSeCd": "1", "trnscdSeCdNm": "교통카드",
+                    "trnscdUserSeCd": code, "trnscdUserSeCdNm": name,
+                    "rideNope": str(rng.randint(0, 400)), "gffNope": str(rng.randint(0, 400)),
+                    "crtrYmd": date_str,
+                })
+    return rows
+
+class MockState:
+    def __init__(self, stations=50, latency=0.05, fail_rate=0.0, max_rps=0.0, empty_after=None, seed=1):
+        self.stations = _stations(stations)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.max_rps = max_rps
+        self.empty_after = empty_after  # 이 날짜(YYYYMMDD) 이후는 "데이터 없음"
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []  # 최근 1초 요청 시각
+        self.stats = {"requests": 0, "throttled": 0, "failed": 0}
+        self._cache = {}
+
+    def rows(self, date_str):
+        with self.lock:
+            rows = self._cache.get(date_str)
+            if rows is None:
+                rows = self._cache[date_str] = make_rows(date_str, self.stations)
+                if len(self._cache) > 64:
+                    self._cache.pop(next(iter(self._cache)))
+            return rows
+
+    def admit(self):
+        # 반환: None(정상) / "throttle" / "error" / "garbage"
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            self.window = [t for t in self.window if now - t < 1.0]
+            if self.max_rps and len(self.window) >= self.max_rps:
+                self.stats["throttled"] += 1
+                return "throttle"
+            self.window.append(now)
+            if self.rng.random() < self.fail_rate:
+                self.stats["failed"] += 1
+                return self.rng.choice(["error", "garbage"])
+            return None
+
+def _result(code, message):
+    return {"CODE": code, "MESSAGE": message}
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status, payload, headers=None):
+            body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/_stats":
+                return self._send(200, state.stats)
+
+            parts = [p for p in self.path.split("/") if p]
+            # /{KEY}/json/getStnPsgr/{START}/{END}/{YYYYMMDD}
+            if len(parts) != 6 or parts[1] != "json" or parts[2] != SERVICE:
+                return self._send(200, {"RESULT": _result("ERROR-310", "해당하는 서비스를 찾을 수 없습니다.")})
+            _, _, _, start, end, date_str = parts
+            try:
+                start, end = int(start), int(end)
+            except ValueError:
+                return self._send(200, {"RESULT": _result("ERROR-333", "요청위치 값의 타입이 유효하지 않습니다.")})
+            if end - start + 1 > 1000:
+                return self._send(200, {"RESULT": _result("ERROR-336", "데이터요청은 한번에 최대 1000건을 넘을 수 없습니다.")})
+
+            time.sleep(state.latency)
+            outcome = state.admit()
+            if outcome == "throttle":
+                return self._send(429, {"RESULT": _result("ERROR-429", "요청이 너무 많습니다.")}, {"Retry-After": "1"})
+            if outcome == "error":
+                return self._send(500, {"RESULT": _result("ERROR-500", "서버 오류입니다.")})
+            if outcome == "garbage":
+                return self._send(200, b'{"getStnPsgr": {"list_total_count": ')
+
+            if state.empty_after and date_str > state.empty_after:
+                return self._send(200, {"RESULT": _result("INFO-200", "해당하는 데이터가 없습니다.")})
+            rows = state.rows(date_str)
+            page = rows[start - 1:end]
+            if not page:
+                return self._send(200, {"RESULT": _result("INFO-200", "해당하는 데이터가 없습니다.")})
+            return self._send(200, {SERVICE: {
+                "list_total_count": len(rows),
+                "RESULT": _result("INFO-000", "정상 처리되었습니다"),
+                "row": page,
+            }})
+
+    return Handler
+
+def serve(port=8089, host="127.0.0.1", **options):
+    """Start the mock in a background thread. Returns the server (call .shutdown() to stop)."""
+    state = MockState(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.state = state
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-seoul-api", daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Seoul open API getStnPsgr service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--stations", type=int, default=50, help="rows per date = stations x 20 hours x 7 user codes")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of responses that are 500 / broken JSON")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="answer 429 above this many requests/s (0 = off)")
+    parser.add_argument("--empty-after", help="answer INFO-200 (no data) for dates after YYYYMMDD")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.host, stations=args.stations, latency=args.latency,
+                   fail_rate=args.fail_rate, max_rps=args.max_rps, empty_after=args.empty_after)
+    print(f"✅ Mock getStnPsgr on http://{args.host}:{args.port} (stats: /_stats)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
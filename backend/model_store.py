@@ -0,0 +1,297 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import dbconnect
+import forecasting
+import ingest_state
+import query_engine
+from filters import NO_FILTERS
+
+# =============================================================================
+# [ENGINE] FORECAST MODEL STORE
+# - 기본 조건(필터 없음)의 (모델, 모델 설정) 별 적합 파라미터를 파일로 저장 (.npz + .json)
+#   필터가 붙은 요청은 사용자 입력마다 조합이 달라지므로 디스크에 쓰지 않고
+#   메모리 LRU(FORECAST_FILTERED_CACHE 개)에만 보관
+# - 저장 시 데이터 버전 해시(모델이 읽는 테이블의 ingest_state 워터마크)를 함께 기록
+# - 요청은 저장된 파라미터로 예측만 수행 (horizon / 신뢰수준은 예측 시점 인자)
+# - 새 데이터가 들어오거나 설정이 바뀌면 기존 결과를 내주면서 백그라운드에서 재적합
+# - 설정: FORECAST_DIR (기본 <repo>/data/models), FORECAST_FILTERED_CACHE (기본 32)
+# =============================================================================
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 적합 로직/저장 형식이 바뀌면 올림 -> 기존 파일은 자동으로 재적합 대상
+MODEL_FORMAT_VERSION = 1
+
+def store_dir():
+    dbconnect.load_env()
+    return os.getenv('FORECAST_DIR', os.path.join(ROOT_DIR, 'data', 'models'))
+
+def _persisted(f):
+    return f == NO_FILTERS
+
+# =============================================================================
+# History (SQL)
+# =============================================================================
+def load_history(f=NO_FILTERS, monthly=False):
+    # Using Historical Table if available, fallback or join with current logic
+    # For prediction, we need multi-year data.
+    # Strategy: Use `subway_traffic_log_senior_22-24` for 2022-2024 history.
+    # monthly=True: 계절 모델용 월별 합계 (year, month)
+    month_col = ", MONTH(pasngDate) as month" if monthly else ""
+    month_grp = ", MONTH(pasngDate)" if monthly else ""
+
+    where, params = f.where(line=False)
+    sql = f"""
+        SELECT pasngYear as year{month_col}, stnNm,
+        SUM(rideNope + gffNope) as total_vol
+        FROM `subway_traffic_log_senior_22-24`
+        WHERE 1=1 {where}
+        GROUP BY pasngYear{month_grp}, stnNm
+    """
+    roll_where, roll_params = f.where()
+    sql_fallback = f"SELECT pasngYear as year{month_col}, stnNm, SUM(volume) as total_vol FROM subway_traffic_hourly WHERE {f.focus_cond()} {roll_where} GROUP BY pasngYear{month_grp}, stnNm"
+    if not f.history_allowed:
+        # 노인 외 사용자 구분 / 호선 조건은 과거 테이블로 답할 수 없음 -> 롤업만 사용
+        return query_engine.read_sql(sql_fallback, roll_params)
+    try:
+        return query_engine.read_sql(sql, params)
+    except Exception as e:
+        # Fallback if table doesn't exist (user said copies work, so it likely exists, but safety first)
+        print(f"⚠️ Historical table not readable, using main log rollup: {e}")
+        return query_engine.read_sql(sql_fallback, roll_params)
+
+# =============================================================================
+# Hashes
+# =============================================================================
+def _digest(value):
+    return hashlib.sha256(repr(value).encode('utf-8')).hexdigest()
+
+def config_hash(model, f):
+    options = forecasting.SEASONAL_DEFAULTS if model == "seasonal" else {}
+    return _digest((MODEL_FORMAT_VERSION, model, f, sorted(options.items())))
+
+def source_tables(f, versions):
+    # load_history 가 실제로 읽는 테이블: 과거 노인 테이블, 없거나 쓸 수 없는 조건이면 롤업(교통 로그)
+    if f.history_allowed and ingest_state.SENIOR_LOG in versions:
+        return (ingest_state.SENIOR_LOG,)
+    return (ingest_state.TRAFFIC_LOG,)
+
+def data_hash(f=NO_FILTERS):
+    versions = dict(query_engine.data_version())
+    return _digest(tuple((t, versions.get(t, 0)) for t in source_tables(f, versions)))
+
+# =============================================================================
+# Artifact (fit result) <-> files
+# =============================================================================
+class Artifact:
+    def __init__(self, model, keys, Y, base_year, last_month, params, meta):
+        self.model = model
+        self.keys = keys
+        self.Y = Y
+        self.base_year = base_year
+        self.last_month = last_month
+        self.params = params
+        self.meta = meta
+
+    def forecast(self, horizon=None, level=0.9):
+        horizon = horizon or max(forecasting.DEFAULT_TARGET_YEAR - self.base_year, 1)
+        base_vol, point, lower, upper = forecasting.annual_forecast(
+            self.model, self.params, self.Y, self.base_year, self.last_month, horizon, level
+        )
+        growth = self.params["growth"] if self.model == "cagr" else None
+        return forecasting.build_frame(
+            self.keys, base_vol, point, lower, upper, self.model, self.base_year, horizon, growth
+        )
+
+def _paths(model, cfg_hash):
+    stem = os.path.join(store_dir(), f"{model}-{cfg_hash[:16]}")
+    return stem + ".npz", stem + ".json"
+
+def save(artifact):
+    npz_path, meta_path = _paths(artifact.model, artifact.meta["config_hash"])
+    os.makedirs(os.path.dirname(npz_path), exist_ok=True)
+    arrays = {f"p_{k}": np.asarray(v) for k, v in artifact.params.items()}
+    arrays.update(keys=np.asarray(artifact.keys, dtype=str), Y=artifact.Y)
+
+    # 임시 파일에 쓰고 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)
+    with open(npz_path + ".tmp", 'wb') as fh:
+        np.savez_compressed(fh, **arrays)
+    os.replace(npz_path + ".tmp", npz_path)
+    with open(meta_path + ".tmp", 'w', encoding='utf-8') as fh:
+        json.dump(artifact.meta, fh, ensure_ascii=False, indent=1)
+    os.replace(meta_path + ".tmp", meta_path)
+
+def load(model, cfg_hash):
+    npz_path, meta_path = _paths(model, cfg_hash)
+    if not (os.path.exists(npz_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path, encoding='utf-8') as fh:
+        meta = json.load(fh)
+    if meta.get("config_hash") != cfg_hash:
+        return None
+    with np.load(npz_path, allow_pickle=False) as data:
+        params = {k[2:]: data[k] for k in data.files if k.startswith("p_")}
+        keys, Y = data["keys"], data["Y"]
+    return Artifact(model, keys, Y, meta["base_year"], meta["last_month"], params, meta)
+
+def fit_artifact(model, f):
+    # 데이터 해시는 조회 "전에" 읽음 -> 적합 중 새 데이터가 들어오면 다음 확인 때 다시 적합
+    d_hash = data_hash(f)
+    started = time.perf_counter()
+    panel = load_history(f, monthly=(model == "seasonal"))
+    if panel.empty:
+        return None
+    keys, Y, base_year, last_month = forecasting.prepare(panel, model)
+    if Y.shape[1] < 2:
+        return None
+    params = forecasting.fit(model, Y)
+    meta = {
+        "model": model,
+        "config_hash": config_hash(model, f),
+        "data_hash": d_hash,
+        "filters": repr(f),
+        "series": int(len(keys)),
+        "base_year": base_year,
+        "last_month": last_month,
+        "fitted_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "fit_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    return Artifact(model, keys, Y, base_year, last_month, params, meta)
+
+# =============================================================================
+# Store (memory -> disk -> fit)
+# =============================================================================
+_artifacts = {}          # config_hash -> Artifact (기본 조건, 디스크와 같은 내용)
+_filtered = OrderedDict()  # config_hash -> Artifact (필터 조건, 메모리에만 / LRU)
+_refitting = set()       # 재적합 진행 중인 config_hash
+_lock = threading.Lock()
+_listeners = []          # 재적합 완료 시 호출 (예: 결과 캐시 무효화)
+_stats = {"memory_hits": 0, "disk_loads": 0, "sync_fits": 0, "background_refits": 0, "refit_errors": 0,
+          "filtered_evicted": 0}
+
+def _filtered_limit():
+    dbconnect.load_env()
+    return max(0, int(os.getenv('FORECAST_FILTERED_CACHE', 32)))
+
+def _remember(cfg_hash, artifact, f):
+    # 호출 측에서 _lock 을 잡은 상태
+    if _persisted(f):
+        _artifacts[cfg_hash] = artifact
+        return
+    _filtered[cfg_hash] = artifact
+    _filtered.move_to_end(cfg_hash)
+    while len(_filtered) > _filtered_limit():
+        _filtered.popitem(last=False)
+        _stats["filtered_evicted"] += 1
+
+def on_refit(callback):
+    _listeners.append(callback)
+
+def _refit(model, f, cfg_hash):
+    try:
+        artifact = fit_artifact(model, f)
+        if artifact is not None:
+            if _persisted(f):
+                save(artifact)
+            with _lock:
+                _remember(cfg_hash, artifact, f)
+                _stats["background_refits"] += 1
+            for callback in _listeners:
+                callback()
+    except Exception as e:
+        with _lock:
+            _stats["refit_errors"] += 1
+        print(f"⚠️ Forecast refit failed ({model}): {e}")
+    finally:
+        with _lock:
+            _refitting.discard(cfg_hash)
+
+def _schedule_refit(model, f, cfg_hash):
+    with _lock:
+        if cfg_hash in _refitting:
+            return
+        _refitting.add(cfg_hash)
+    threading.Thread(target=_refit, args=(model, f, cfg_hash), name=f"refit-{model}", daemon=True).start()
+
+def get_artifact(model, f=NO_FILTERS):
+    """
+    Return the fitted artifact for (model, filters).
+    Memory -> disk -> synchronous fit. Only the unfiltered configuration is read from or
+    written to disk; filtered ones live in a bounded in-memory LRU. A stale artifact is
+    returned as-is while a background refit is scheduled.
+    """
+    cfg_hash = config_hash(model, f)
+    persisted = _persisted(f)
+    with _lock:
+        artifact = _artifacts.get(cfg_hash) if persisted else _filtered.get(cfg_hash)
+        if artifact is not None:
+            _stats["memory_hits"] += 1
+            if not persisted:
+                _filtered.move_to_end(cfg_hash)
+
+    if artifact is None and persisted:
+        artifact = load(model, cfg_hash)
+        if artifact is not None:
+            with _lock:
+                _remember(cfg_hash, artifact, f)
+                _stats["disk_loads"] += 1
+
+    if artifact is None:
+        artifact = fit_artifact(model, f)
+        if artifact is None:
+            return None
+        if persisted:
+            save(artifact)
+        with _lock:
+            _remember(cfg_hash, artifact, f)
+            _stats["sync_fits"] += 1
+        return artifact
+
+    try:
+        if artifact.meta.get("data_hash") != data_hash(f):
+            _schedule_refit(model, f, cfg_hash)
+    except Exception as e:
+        # 버전을 못 읽으면 저장된 모델로 계속 응답
+        print(f"⚠️ Forecast data version check failed: {e}")
+    return artifact
+
+def forecast(f=NO_FILTERS, model="cagr", horizon=None, level=0.9):
+    artifact = get_artifact(model, f)
+    if artifact is None:
+        return None
+    return artifact.forecast(horizon=horizon, level=level)
+
+def preload():
+    # 기본 조건의 모델 파일을 메모리로 읽음 (앱 시작 시 첫 요청 지연 제거용)
+    loaded = 0
+    for model in forecasting.MODELS:
+        cfg_hash = config_hash(model, NO_FILTERS)
+        try:
+            artifact = load(model, cfg_hash)
+        except Exception as e:
+            print(f"⚠️ Forecast artifact skipped ({model}): {e}")
+            continue
+        if artifact is not None:
+            with _lock:
+                _remember(cfg_hash, artifact, NO_FILTERS)
+            loaded += 1
+    return loaded
+
+def stats():
+    with _lock:
+        snapshot = dict(_stats)
+        snapshot["artifacts"] = [
+            {k: a.meta.get(k) for k in ("model", "series", "base_year", "fitted_at", "fit_ms", "filters")}
+            for a in list(_artifacts.values()) + list(_filtered.values())
+        ]
+        snapshot["filtered_cached"] = len(_filtered)
+        snapshot["refitting"] = len(_refitting)
+    snapshot["store_dir"] = store_dir()
+    return snapshot
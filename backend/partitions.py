@@ -0,0 +1,81 @@
+import sys
+
+import dbconnect
+
+# =============================================================================
+# [DB MAINTENANCE] 연도별 RANGE 파티션 관리 (pasngDate 기준)
+# - 연도 조건(pasngDate 범위)이 있는 쿼리는 해당 연도 파티션만 읽음 (pruning)
+# - 오래된 연도는 DELETE 대신 DROP PARTITION 으로 즉시 삭제
+# - 파티션 구성: p2022 (2023-01-01 미만 전체), p2023, ..., pmax (MAXVALUE)
+#
+# 실행 예:
+#   python partitions.py list
+#   python partitions.py add 2027          # pmax 를 쪼개 2027년 파티션 추가
+#   python partitions.py drop-before 2023  # 2023년 이전 파티션 삭제
+# =============================================================================
+
+PARTITIONED_TABLES = [
+    "subway_traffic_log",
+    "subway_traffic_log_senior_22-24",
+    "subway_traffic_hourly",
+]
+
+def _partition_def(year):
+    return f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01')"
+
+def year_partitions_sql(first_year, last_year):
+    parts = [_partition_def(y) for y in range(first_year, last_year + 1)]
+    parts.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return "PARTITION BY RANGE COLUMNS(pasngDate) (\n    " + ",\n    ".join(parts) + "\n)"
+
+def list_partitions(cursor, table):
+    cursor.execute(
+        "SELECT PARTITION_NAME, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION",
+        (table,)
+    )
+    return cursor.fetchall()
+
+def partition_table(cursor, table, first_year, last_year):
+    cursor.execute(f"ALTER TABLE `{table}` {year_partitions_sql(first_year, last_year)}")
+
+def add_year_partition(cursor, table, year):
+    # pmax 에 데이터가 있어도 REORGANIZE 는 안전하게 행을 재배치함
+    names = [row[0] for row in list_partitions(cursor, table)]
+    if f"p{year}" in names:
+        return False
+    cursor.execute(
+        f"ALTER TABLE `{table}` REORGANIZE PARTITION pmax INTO ("
+        f"{_partition_def(year)}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+    )
+    return True
+
+def drop_years_before(cursor, table, year):
+    names = [row[0] for row in list_partitions(cursor, table)]
+    old = [n for n in names if n != "pmax" and int(n[1:]) < year]
+    if old:
+        cursor.execute(f"ALTER TABLE `{table}` DROP PARTITION {', '.join(old)}")
+    return old
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    conn = dbconnect.MydbConnect('seoul_urban_lab')
+    cursor = conn.cursor()
+    try:
+        for table in PARTITIONED_TABLES:
+            if command == "add":
+                added = add_year_partition(cursor, table, int(sys.argv[2]))
+                print(f"   -> `{table}`: {'추가 완료' if added else '이미 있음'}")
+            elif command == "drop-before":
+                dropped = drop_years_before(cursor, table, int(sys.argv[2]))
+                print(f"   -> `{table}`: 삭제 {dropped}")
+            else:
+                print(f"📦 `{table}`")
+                for name, rows in list_partitions(cursor, table):
+                    print(f"   {name:>6} : 약 {rows:,}행")
+    except Exception as e:
+        print(f"❌ 파티션 작업 실패: {e}")
+    finally:
+        conn.close()
@@ -0,0 +1,54 @@
+import os
+
+import analytics_mirror
+import db_pool
+import dbconnect
+import ingest_state
+import metrics
+import slow_query
+
+# =============================================================================
+# [CORE] QUERY ENGINE SWITCH
+# - 분석 API 의 조회는 모두 여기 read_sql / read_sql_parallel 을 거침
+# - ANALYTICS_ENGINE=mysql (기본): 커넥션 풀로 MySQL 조회
+#   ANALYTICS_ENGINE=duckdb        : 로컬 Parquet 미러를 DuckDB 로 조회 (analytics_mirror.py)
+# - 같은 SQL 을 두 엔진에서 실행 (백틱 / %s 만 DuckDB 문법으로 변환)
+# =============================================================================
+
+ENGINES = ("mysql", "duckdb")
+
+dbconnect.load_env()
+_engine = os.getenv('ANALYTICS_ENGINE', 'mysql').strip().lower()
+if _engine not in ENGINES:
+    print(f"⚠️ Unknown ANALYTICS_ENGINE '{_engine}', using mysql")
+    _engine = "mysql"
+
+def engine():
+    return _engine
+
+def set_engine(name):
+    # 패리티 검사 스크립트 등에서 엔진을 바꿔가며 같은 함수를 실행할 때 사용
+    global _engine
+    if name not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    _engine = name
+
+def read_sql(sql, params=None):
+    # 실행 시간 / 반환 행 수를 요청 엔드포인트 태그와 함께 기록 (/metrics)
+    reader = analytics_mirror.read_sql if _engine == "duckdb" else db_pool.read_sql
+    if slow_query.enabled():
+        # 느린 문장 로그 + EXPLAIN 수집 (SLOW_QUERY_MS 설정 시에만)
+        reader = slow_query.profile(reader, _engine)
+    return metrics.timed_sql(reader, sql, params, _engine)
+
+def read_sql_parallel(queries, fallbacks=None):
+    # executor 스레드에서도 같은 요청의 엔드포인트 태그를 쓰도록 bind
+    return db_pool.read_sql_parallel(queries, fallbacks, reader=metrics.bind(read_sql))
+
+def data_version():
+    # 결과 캐시 무효화 기준: 현재 엔진이 실제로 보고 있는 데이터의 버전
+    if _engine == "duckdb":
+        return analytics_mirror.data_version()
+
+    with db_pool.get_pool().acquire() as conn:
+        return ingest_state.read_watermark(conn.cursor())
@@ -0,0 +1,107 @@
+import datetime
+import decimal
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+import metrics
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow 가 없으면 Arrow 협상은 조용히 JSON 으로 대체
+    pa = None
+
+try:
+    import orjson
+except ImportError:  # orjson 이 없으면 표준 json 으로 대체 (느리지만 동일한 결과)
+    orjson = None
+
+# =============================================================================
+# [CORE] RESPONSE FORMAT NEGOTIATION
+# - 기본은 JSON (기존 클라이언트 그대로 동작)
+# - Accept: application/vnd.apache.arrow.stream 또는 ?format=arrow 요청 시
+#   DataFrame 을 Arrow IPC 스트림으로 그대로 전송 (행 단위 dict 생성 없음)
+# - 같은 URL 이 Accept 에 따라 다른 본문이 되므로 DataFrame 응답에는 Vary: Accept
+# =============================================================================
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# =============================================================================
+# FAST JSON
+# - orjson 으로 직렬화 (numpy 배열/스칼라는 OPT_SERIALIZE_NUMPY 로 직접 처리)
+# - pymysql Decimal, pandas Timestamp/NaT 등 나머지는 _json_default 에서 변환
+# - FastAPI 의 jsonable_encoder 를 거치지 않도록 Response 객체로 바로 반환
+# =============================================================================
+
+def _json_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content):
+        return orjson.dumps(content, default=_json_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content):
+        return json.dumps(content, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
+
+def wants_arrow(request):
+    if pa is None:
+        return False
+    if request.query_params.get("format") == "arrow":
+        return True
+    return ARROW_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _plain_columns(df):
+    # pymysql 의 SUM() 결과는 Decimal 객체 -> Arrow decimal 대신 float 로 변환
+    out = df
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        first = df[col].dropna()
+        if not first.empty and isinstance(first.iloc[0], decimal.Decimal):
+            if out is df:
+                out = df.copy()
+            out[col] = pd.to_numeric(df[col], errors='coerce')
+    return out
+
+def to_arrow_bytes(df):
+    table = pa.Table.from_pandas(_plain_columns(df), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def frame_response(request, data):
+    """
+    Return a DataFrame in the format the client asked for.
+    Non-DataFrame results (error dicts, empty lists) are passed through as JSON.
+    """
+    if not isinstance(data, pd.DataFrame):
+        return FastJSONResponse(data)
+    # 직렬화 시간 기록 (JSON 은 행 dict 변환 + 인코딩 포함)
+    started = time.perf_counter()
+    if wants_arrow(request):
+        response = Response(content=to_arrow_bytes(data), media_type=ARROW_MEDIA_TYPE)
+        metrics.observe_serialization("arrow", time.perf_counter() - started, response.body)
+    else:
+        response = FastJSONResponse(data.to_dict(orient='records'))
+        metrics.observe_serialization("json", time.perf_counter() - started, response.body)
+    response.headers["Vary"] = "Accept"
+    return response
@@ -0,0 +1,148 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import dbconnect
+import metrics
+import query_engine
+
+# =============================================================================
+# [CORE] ANALYSIS RESULT CACHE
+# - (엔드포인트, 파라미터) 키로 계산 결과를 메모리에 보관 (TTL + 크기 제한 LRU)
+# - ingest_state 워터마크가 바뀌면(새 데이터 upsert) 전체 자동 무효화
+#   (DuckDB 엔진이면 미러에 반영된 버전 기준)
+# - 설정: CACHE_TTL (초, 기본 300), CACHE_MAX_ENTRIES (기본 256),
+#         CACHE_WATERMARK_INTERVAL (워터마크 확인 주기 초, 기본 5)
+# =============================================================================
+
+class ResultCache:
+    def __init__(self, max_entries=256, ttl=300, watermark_interval=5, watermark_reader=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.watermark_interval = watermark_interval
+        self._read_watermark = watermark_reader
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._watermark = None
+        self._watermark_checked_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    # -------------------------------------------------------------------------
+    def _check_watermark(self):
+        # 매 요청마다가 아니라 watermark_interval 초에 한 번만 DB 확인 (PK 조회 1회)
+        now = time.monotonic()
+        if self._read_watermark is None or now - self._watermark_checked_at < self.watermark_interval:
+            return
+        self._watermark_checked_at = now
+
+        try:
+            current = self._read_watermark()
+        except Exception as e:
+            # DB를 못 읽으면 기존 캐시를 그대로 사용 (TTL 이 최후의 안전장치)
+            print(f"⚠️ Cache watermark check failed: {e}")
+            return
+
+        with self._lock:
+            if self._watermark is not None and current != self._watermark:
+                self._entries.clear()
+                self._stats["invalidations"] += 1
+            self._watermark = current
+
+    def get(self, key):
+        self._check_watermark()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, value = item
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, endpoint):
+        # 특정 엔드포인트의 결과만 삭제 (예: 예측 모델 재적합 완료)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == endpoint]:
+                del self._entries[key]
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["endpoints"] = sorted({key[0] for key in self._entries})
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+        snapshot.update({
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "watermark": dict(self._watermark) if self._watermark else {},
+        })
+        return snapshot
+
+
+dbconnect.load_env()
+
+cache = ResultCache(
+    max_entries=int(os.getenv('CACHE_MAX_ENTRIES', 256)),
+    ttl=float(os.getenv('CACHE_TTL', 300)),
+    watermark_interval=float(os.getenv('CACHE_WATERMARK_INTERVAL', 5)),
+    # 현재 분석 엔진(MySQL / DuckDB 미러)이 보고 있는 데이터 버전
+    watermark_reader=query_engine.data_version,
+)
+
+def _is_cacheable(result):
+    # 빈 결과 / 에러 응답은 DB 장애일 수 있으므로 저장하지 않음
+    if result is None:
+        return False
+    if isinstance(result, dict) and "error" in result:
+        return False
+    if isinstance(result, (list, dict)) and len(result) == 0:
+        return False
+    if getattr(result, "empty", False):  # 빈 DataFrame
+        return False
+    return True
+
+def cached(endpoint):
+    """
+    Cache the return value of an endpoint handler, keyed by endpoint name and arguments.
+    Put it under the @app.get(...) decorator; functools.wraps keeps the signature for FastAPI.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (endpoint, args, tuple(sorted(kwargs.items())))
+            metrics.tag(endpoint)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+            # 캐시 미스일 때만 계산 시간 / 후처리 시간 기록 (SQL 은 이 엔드포인트로 태깅)
+            with metrics.build_timer(endpoint):
+                result = func(*args, **kwargs)
+            if _is_cacheable(result):
+                cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,126 @@
+# =============================================================================
+# [CORE] HOURLY ROLLUP CUBE (subway_traffic_hourly)
+# - 원본 subway_traffic_log 를 (역, 일자, 시간, 사용자등급 userClass) 단위로 미리 합산
+# - 적재 시 바뀐 (일자, 역) 조각만 원본에서 다시 계산 -> upsert 이므로 항상 정확
+#   (원본의 idx_log_stn_date_hr (stnKey, pasngDate, pasngHr) 인덱스로 조각 단위 범위 조회)
+# - 분석 API는 원본 대신 이 테이블을 읽음 (쿼리 비용 = 역 x 시간 수에 비례)
+# - 갱신과 같은 트랜잭션에서 ingest_state 워터마크를 올려 결과 캐시를 무효화
+#   (바뀐 일자는 ingest_changes 에 함께 기록 -> DuckDB 미러가 그 일자만 다시 내보냄)
+# - 전체 재계산은 그림자 테이블에 만든 뒤 RENAME TABLE 로 한 번에 교체 (빈/부분 집계 노출 없음)
+# =============================================================================
+
+import re
+
+import ingest_state
+
+ROLLUP_TABLE = "subway_traffic_hourly"
+SLICE_CHUNK = 200  # 한 번의 INSERT ... SELECT 에 묶을 (일자, 역) 조각 수
+
+_UPSERT_SELECT = """
+    INSERT INTO {table}
+    (stnKey, pasngDate, pasngHr, userClass, stnNm, lineNm, rideNope, gffNope, volume)
+    SELECT stnKey, pasngDate, pasngHr, userClass,
+           MAX(stnNm), MAX(lineNm), SUM(rideNope), SUM(gffNope), SUM(rideNope + gffNope)
+    FROM subway_traffic_log
+    WHERE {where}
+    GROUP BY stnKey, pasngDate, pasngHr, userClass
+    ON DUPLICATE KEY UPDATE
+        stnNm = VALUES(stnNm),
+        lineNm = VALUES(lineNm),
+        rideNope = VALUES(rideNope),
+        gffNope = VALUES(gffNope),
+        volume = VALUES(volume)
+"""
+
+def station_key(stn_cd):
+    # 원본 테이블의 stnKey 생성 컬럼과 같은 규칙 (LPAD(TRIM(stnCd), 4, '0'))
+    # 4자보다 긴 코드는 잘라서 다른 역과 섞지 않고 거부 (테이블의 CHECK 제약과 같음)
+    # float 로 읽힌 코드(150.0)는 정수 부분만 씀 (bulk_writer.station_code 와 같은 규칙)
+    code = re.sub(r"\.0+$", "", str(stn_cd).strip())
+    if len(code) > 4:
+        raise ValueError(f"invalid station code: {stn_cd!r}")
+    return code.zfill(4)
+
+def pasng_date(pasng_de):
+    # 'YYYYMMDD' -> 'YYYY-MM-DD' (원본 pasngDate 생성 컬럼과 같은 값)
+    de = str(pasng_de).strip().replace('-', '')
+    return f"{de[:4]}-{de[4:6]}-{de[6:8]}"
+
+def refresh_rollup(conn, keys):
+    """
+    Recompute the rollup rows for the (pasngDe, stnCd) slices touched by an upsert.
+    keys: iterable of (pasngDe, stnCd) pairs, e.g. df[['pasngDe', 'stnCd']].values
+    """
+    slices = sorted({(pasng_date(de), station_key(cd)) for de, cd in keys})
+    if not slices:
+        return 0
+
+    cursor = conn.cursor()
+    affected = 0
+    try:
+        for i in range(0, len(slices), SLICE_CHUNK):
+            chunk = slices[i:i + SLICE_CHUNK]
+            conds, params = [], []
+            for day, key in chunk:
+                conds.append("(stnKey = %s AND pasngDate = %s)")
+                params += [key, day]
+            cursor.execute(_UPSERT_SELECT.format(table=ROLLUP_TABLE, where=" OR ".join(conds)), params)
+            affected += cursor.rowcount
+        ingest_state.bump(cursor, ingest_state.TRAFFIC_LOG, dates=[day for day, _ in slices])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return affected
+
+def rebuild_rollup(conn, bump_watermark=True):
+    """
+    Full recompute (initial build / repair).
+    Builds into a shadow table and swaps it in with one RENAME TABLE, so readers keep seeing
+    the old complete rollup until the swap and never an empty or half-filled one; the watermark
+    is bumped only after the swap, so the result cache never stores a partial answer.
+    Run it while no ingest is writing: slices refreshed into the live table during the
+    rebuild are replaced by the shadow copy at the swap.
+    bump_watermark=False: for calls during migration, before the ingest_state table exists.
+    """
+    shadow, retired = f"{ROLLUP_TABLE}_rebuild", f"{ROLLUP_TABLE}_old"
+    cursor = conn.cursor()
+    # 이전 실행이 중간에 실패해 남긴 테이블 정리 (같은 파티션/인덱스 구조로 새로 만듦)
+    cursor.execute(f"DROP TABLE IF EXISTS {shadow}, {retired}")
+    cursor.execute(f"CREATE TABLE {shadow} LIKE {ROLLUP_TABLE}")
+    cursor.execute("SELECT DISTINCT pasngDate FROM subway_traffic_log ORDER BY pasngDate")
+    dates = [row[0] for row in cursor.fetchall()]
+
+    try:
+        # 잠금을 짧게 가져가도록 일자 단위로 나눠서 처리 (원본 읽기 잠금만, 서비스 테이블은 건드리지 않음)
+        for day in dates:
+            cursor.execute(_UPSERT_SELECT.format(table=shadow, where="pasngDate = %s"), [day])
+            conn.commit()
+            print(f"   -> {day} 집계 완료", end="\r")
+
+        # 원자적 교체: 읽는 쪽은 교체 전 테이블 또는 완성된 새 테이블 중 하나만 봄
+        cursor.execute(f"RENAME TABLE {ROLLUP_TABLE} TO {retired}, {shadow} TO {ROLLUP_TABLE}")
+    except Exception:
+        conn.rollback()
+        cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+        raise
+    cursor.execute(f"DROP TABLE IF EXISTS {retired}")
+
+    if bump_watermark:
+        ingest_state.bump(cursor, ingest_state.TRAFFIC_LOG, dates=dates)
+        conn.commit()
+    return len(dates)
+
+if __name__ == "__main__":
+    import dbconnect
+
+    print(f"🧮 [{ROLLUP_TABLE}] 전체 집계를 다시 계산합니다...")
+    conn = dbconnect.MydbConnect('seoul_urban_lab')
+    try:
+        n_dates = rebuild_rollup(conn)
+        print(f"\n✅ 완료: {n_dates}일치 집계")
+    except Exception as e:
+        conn.rollback()
+        print(f"\n❌ 집계 실패: {e}")
+    finally:
+        conn.close()
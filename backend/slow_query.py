@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+import dbconnect
+import metrics
+
+# =============================================================================
+# [CORE] SLOW QUERY CAPTURE (opt-in)
+# - SLOW_QUERY_MS 보다 오래 걸린 SQL 을 파라미터와 함께 로그로 남김
+# - 문장(statement id)마다 EXPLAIN 실행계획을 한 번 자동 수집 (백그라운드, 응답 지연 없음)
+# - 가장 느린 문장들을 /debug/slow-queries 에서 확인 (켜져 있을 때만 라우트 등록, SQL/파라미터 노출 주의)
+# - 설정: SLOW_QUERY_MS (기본 0 = 끔), SLOW_QUERY_KEEP (보관 문장 수, 50),
+#         SLOW_QUERY_EXPLAIN (0 이면 실행계획 수집 안 함, 기본 1)
+# =============================================================================
+
+dbconnect.load_env()
+THRESHOLD_MS = float(os.getenv('SLOW_QUERY_MS', 0))
+KEEP = int(os.getenv('SLOW_QUERY_KEEP', 50))
+EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', '1') != '0'
+
+_entries = {}   # statement id -> 집계
+_lock = threading.Lock()
+
+def enabled():
+    return THRESHOLD_MS > 0
+
+def _short(params, limit=300):
+    text = repr(tuple(params)) if params else "()"
+    return text if len(text) <= limit else text[:limit] + "..."
+
+def _capture_plan(reader, sql, params, sid):
+    try:
+        plan = reader("EXPLAIN " + sql, params)
+        rows = plan.astype(object).where(plan.notna(), None).to_dict(orient='records')
+    except Exception as e:
+        rows = [{"error": str(e)}]
+    with _lock:
+        if sid in _entries:
+            _entries[sid]["plan"] = rows
+
+def _record(reader, sql, params, elapsed_ms, engine):
+    sid = metrics.statement_id(sql)
+    endpoint = metrics.current_endpoint()
+    print(f"🐢 Slow query {sid} ({endpoint}, {engine}) {elapsed_ms:.0f}ms params={_short(params)}")
+
+    explain = False
+    with _lock:
+        entry = _entries.get(sid)
+        if entry is None:
+            entry = _entries[sid] = {
+                "query": sid, "sql": " ".join(sql.split()), "engine": engine,
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "plan": None,
+            }
+            explain = EXPLAIN and sql.lstrip().upper().startswith("SELECT")
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["endpoint"] = endpoint
+        entry["last_seen"] = time.strftime('%Y-%m-%d %H:%M:%S')
+        if elapsed_ms >= entry["max_ms"]:
+            entry["max_ms"] = elapsed_ms
+            entry["max_params"] = _short(params)
+
+        # 보관 수를 넘으면 가장 덜 느린(최대 시간이 가장 작은) 문장부터 버림
+        while len(_entries) > KEEP:
+            del _entries[min(_entries, key=lambda k: _entries[k]["max_ms"])]
+
+    if explain:
+        # 실행계획은 처음 느려진 문장에 대해 한 번만, 요청 스레드를 붙잡지 않도록 별도 스레드에서
+        threading.Thread(target=_capture_plan, args=(reader, sql, params, sid),
+                         name="explain", daemon=True).start()
+
+def profile(reader, engine):
+    """Wrap a reader(sql, params) so statements slower than SLOW_QUERY_MS are captured."""
+    def run(sql, params=None):
+        started = time.perf_counter()
+        try:
+            return reader(sql, params)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= THRESHOLD_MS:
+                _record(reader, sql, params, elapsed_ms, engine)
+    return run
+
+def worst(limit=20):
+    with _lock:
+        entries = [dict(e) for e in _entries.values()]
+    for e in entries:
+        e["avg_ms"] = round(e["total_ms"] / e["count"], 1)
+        e["max_ms"] = round(e["max_ms"], 1)
+        e["total_ms"] = round(e["total_ms"], 1)
+    return sorted(entries, key=lambda e: e["max_ms"], reverse=True)[:limit]
+
+def reset():
+    with _lock:
+        _entries.clear()
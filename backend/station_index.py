@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+import dbconnect
+import ingest_state
+import query_engine
+
+# =============================================================================
+# [CORE] STATION INDEX (in-memory station_meta)
+# - 역 마스터(역당 1행)를 앱 시작 시 한 번 읽어 메모리에 보관
+# - 역코드 / 표준 역명으로 O(1) 조회, 환승역(역명 하나에 코드 여러 개) 지원
+# - 좌표/호선은 SQL JOIN 대신 메모리에서 붙임 (attach)
+# - ingest_state 의 station_meta 버전이 바뀌면 다시 읽음
+# - 설정: STATION_INDEX_CHECK_INTERVAL (버전 확인 주기 초, 기본 30)
+# =============================================================================
+
+SUFFIX = '역'
+COLUMNS = ['stnCd', 'stnNm', 'lineNm', 'lat', 'lon']
+
+def canonical_name(name):
+    # '강남' / '강남역' / ' 강남역 ' -> '강남역'
+    name = str(name).strip()
+    return name if name.endswith(SUFFIX) else name + SUFFIX
+
+def normalize_names(names):
+    # canonical_name 의 벡터 버전 (행 단위 apply 없음)
+    s = pd.Series(names).astype(str).str.strip()
+    return s.where(s.str.endswith(SUFFIX), s + SUFFIX)
+
+class StationIndex:
+    def __init__(self, frame):
+        frame = frame[COLUMNS].copy()
+        frame['stnCd'] = frame['stnCd'].astype(str)
+        frame['lat'] = pd.to_numeric(frame['lat'], errors='coerce')
+        frame['lon'] = pd.to_numeric(frame['lon'], errors='coerce')
+        frame['canonNm'] = normalize_names(frame['stnNm']).to_numpy()
+        self.frame = frame.drop_duplicates(subset=['stnCd']).sort_values('stnCd').reset_index(drop=True)
+
+        # 코드 기준 / 표준 역명 기준 조회표 (역명 기준은 첫 번째 코드의 좌표를 대표값으로 사용)
+        self._by_code = self.frame.set_index('stnCd')
+        self._by_name = self.frame.drop_duplicates(subset=['canonNm']).set_index('canonNm')
+        self._codes = self.frame.groupby('canonNm')['stnCd'].agg(tuple).to_dict()
+        self._records = self._by_code.to_dict('index')
+        self.name_count = len(self._codes)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def lookup(self, stn_cd):
+        # 역코드 -> {stnNm, lineNm, lat, lon, canonNm} (없으면 None)
+        return self._records.get(str(stn_cd).zfill(4))
+
+    def codes_for(self, name):
+        # 역명 -> 역코드 튜플 (환승역이면 여러 개)
+        return self._codes.get(canonical_name(name), ())
+
+    def lines_for(self, name):
+        return tuple(self._records[code]['lineNm'] for code in self.codes_for(name))
+
+    def attach(self, df, on='stnCd', columns=('lat', 'lon'), how='inner'):
+        """
+        Add station columns to df by code (on='stnCd') or by station name (any other column,
+        matched on the canonical name). how='inner' drops rows without a station match
+        (same as the former SQL JOIN), how='left' keeps them with NaN.
+        """
+        if on == 'stnCd':
+            table, keys = self._by_code, df[on].astype(str)
+        else:
+            table, keys = self._by_name, normalize_names(df[on])
+        keys = pd.Series(keys.to_numpy(), index=df.index)
+        out = df.copy()
+        for col in columns:
+            out[col] = keys.map(table[col])
+        if how == 'inner':
+            out = out[keys.isin(table.index)]
+        return out
+
+# =============================================================================
+# Loader (startup + refresh on station_meta version change)
+# =============================================================================
+_index = None
+_version = None
+_checked_at = 0.0
+_loaded_at = None
+_lock = threading.Lock()
+
+def _check_interval():
+    dbconnect.load_env()
+    return float(os.getenv('STATION_INDEX_CHECK_INTERVAL', 30))
+
+def _meta_version():
+    return dict(query_engine.data_version()).get(ingest_state.STATION_META, 0)
+
+def load():
+    global _index, _version, _checked_at, _loaded_at
+    version = _meta_version()
+    frame = query_engine.read_sql("SELECT stnKey as stnCd, stnNm, lineNm, lat, lon FROM station_meta")
+    index = StationIndex(frame)
+    with _lock:
+        _index, _version = index, version
+        _checked_at = time.monotonic()
+        _loaded_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    return index
+
+def get_index():
+    """
+    Return the current StationIndex, loading it on first use.
+    The station_meta version is checked at most every STATION_INDEX_CHECK_INTERVAL seconds.
+    """
+    global _checked_at
+    index = _index
+    if index is None:
+        return load()
+
+    now = time.monotonic()
+    if now - _checked_at < _check_interval():
+        return index
+    _checked_at = now
+    try:
+        if _meta_version() != _version:
+            return load()
+    except Exception as e:
+        # 버전을 못 읽으면 기존 인덱스로 계속 응답
+        print(f"⚠️ Station index version check failed: {e}")
+    return index
+
+def status():
+    index = _index
+    return {
+        "loaded": index is not None,
+        "stations": len(index) if index is not None else 0,
+        "names": index.name_count if index is not None else 0,
+        "version": _version,
+        "loaded_at": _loaded_at,
+    }
@@ -0,0 +1,77 @@
+import pandas as pd
+
+import query_engine
+from rollup import ROLLUP_TABLE, station_key
+from user_class import senior_sql
+
+# =============================================================================
+# [CORE] STATION PROFILE ENGINE
+# - /station/detail 의 기본 통계 / 24시간 패턴 / 평일·주말 비교를
+#   롤업 테이블 한 번 스캔(시간 x 주말여부 조건부 집계)으로 계산
+# - 결과는 최대 24 x 2 행 -> 나머지 분해는 pandas 로 메모리에서 처리
+# - start / end (YYYY-MM-DD) 로 기간 제한 가능 (pasngDate 파티션/인덱스 범위 조회)
+# =============================================================================
+
+SENIOR_COND = senior_sql('userClass')
+
+_PROFILE_SQL = f"""
+    SELECT pasngHr,
+           CASE WHEN pasngDow IN (1, 7) THEN 'Weekend' ELSE 'Weekday' END as day_type,
+           MAX(stnNm) as stnNm,
+           SUM(volume) as total_vol,
+           SUM(CASE WHEN {SENIOR_COND} THEN volume ELSE 0 END) as senior_vol,
+           SUM(CASE WHEN {SENIOR_COND} THEN 1 ELSE 0 END) as senior_rows
+    FROM {ROLLUP_TABLE}
+    WHERE stnKey = %s {{date_filter}}
+    GROUP BY pasngHr, day_type
+"""
+
+def _profile_sql(start=None, end=None):
+    filters, params = [], []
+    if start is not None:
+        filters.append("AND pasngDate >= %s")
+        params.append(str(start))
+    if end is not None:
+        filters.append("AND pasngDate <= %s")
+        params.append(str(end))
+    return _PROFILE_SQL.format(date_filter=" ".join(filters)), params
+
+def build_station_profile(stn_cd, start=None, end=None):
+    """
+    Compute the station detail payload in one grouped scan of the rollup.
+    Returns None when the station has no rows in the requested range.
+    """
+    target_code = station_key(stn_cd)
+    sql, params = _profile_sql(start, end)
+    df = query_engine.read_sql(sql, params=[target_code] + params)
+
+    if df.empty or df['stnNm'].isna().all():
+        return None
+
+    for col in ['total_vol', 'senior_vol', 'senior_rows']:
+        df[col] = pd.to_numeric(df[col]).fillna(0)
+
+    basic = {
+        "stnNm": df['stnNm'].dropna().iloc[0],
+        "total_vol": float(df['total_vol'].sum()),
+        "senior_vol": float(df['senior_vol'].sum()),
+    }
+
+    # 노인 행이 있었던 시간/요일 구분만 남김 (기존 WHERE 노인조건 + GROUP BY 와 동일한 결과)
+    senior = df[df['senior_rows'] > 0]
+
+    df_time = (
+        senior.groupby('pasngHr', as_index=False)['senior_vol'].sum()
+        .rename(columns={'senior_vol': 'vol'})
+        .sort_values('pasngHr')
+    )
+    df_day = (
+        senior.groupby('day_type', as_index=False)['senior_vol'].sum()
+        .rename(columns={'senior_vol': 'vol'})
+    )
+
+    return {
+        "basic": basic,
+        "time": df_time.to_dict(orient='records'),
+        "day": df_day.to_dict(orient='records'),
+    }
@@ -0,0 +1,50 @@
+# =============================================================================
+# [DIMENSION] 사용자 구분 (userClass)
+# - trnscdUserSeCd(API 사용자 구분 코드)를 작은 정수 등급으로 묶은 값
+# - DB에서는 STORED 생성 컬럼(userClass)으로 쓰기 시점에 계산되고,
+#   이름/노인 여부는 user_class_dim 테이블에 있음 (create_table_5.sql)
+# - "노인"의 정의는 여기 SENIOR_CLASSES 한 곳에서만 관리
+# =============================================================================
+
+CLASS_GENERAL = 1   # 일반
+CLASS_YOUTH = 2     # 어린이/학생/청소년
+CLASS_SENIOR = 3    # 노인/약자
+CLASS_OTHER = 9     # 기타 (외국인, 국가유공자 등)
+
+CLASS_NAMES = {
+    CLASS_GENERAL: '일반',
+    CLASS_YOUTH: '어린이/학생/청소년',
+    CLASS_SENIOR: '노인/약자',
+    CLASS_OTHER: '기타',
+}
+
+# 원본 코드 -> 등급 (DB 생성 컬럼의 CASE 식과 같은 규칙)
+CODE_TO_CLASS = {
+    '01': CLASS_GENERAL,
+    '02': CLASS_YOUTH, '03': CLASS_YOUTH, '04': CLASS_YOUTH,
+    '06': CLASS_SENIOR, '100': CLASS_SENIOR,
+}
+
+# API 파라미터(user_class=senior 등)에서 쓰는 영문 키
+CLASS_KEYS = {
+    'general': CLASS_GENERAL,
+    'youth': CLASS_YOUTH,
+    'senior': CLASS_SENIOR,
+    'other': CLASS_OTHER,
+}
+
+SENIOR_CLASSES = (CLASS_SENIOR,)
+
+def get_user_class(code):
+    return CODE_TO_CLASS.get(str(code).strip(), CLASS_OTHER)
+
+def get_user_group(code):
+    # 적재 노트북의 UserGroup(표시용 이름) 파생 함수
+    return CLASS_NAMES[get_user_class(code)]
+
+def class_sql(classes, column='userClass'):
+    # SQL 조건식: 인덱스를 탈 수 있는 정수 비교 (classes 는 정수 등급이므로 직접 삽입해도 안전)
+    return f"{column} IN ({', '.join(str(int(c)) for c in classes)})"
+
+def senior_sql(column='userClass'):
+    return class_sql(SENIOR_CLASSES, column)
@@ -46,8 +46,9 @@ def diagnose_database():
         print("3️⃣ [매칭 테스트] '서울역' 데이터 조회 시도")
         
         # 3-1. 이름으로 찾기
-        sql_by_name = "SELECT COUNT(*) FROM subway_traffic_log WHERE stnNm LIKE '%서울역%'"
-        count_name = pd.read_sql(sql_by_name, conn).iloc[0,0]
+        # 값은 모두 바인딩 파라미터로 전달 (SQL 문자열에 직접 넣지 않음)
+        sql_by_name = "SELECT COUNT(*) FROM subway_traffic_log WHERE stnNm LIKE %s"
+        count_name = pd.read_sql(sql_by_name, conn, params=['%서울역%']).iloc[0,0]
         print(f"   -> 이름('서울역')으로 찾았을 때: {count_name:,}건 발견")
 
         # 3-2. 코드로 찾기 (서울역 1호선 코드가 보통 '0150' 또는 '150')
@@ -56,8 +57,8 @@ def diagnose_database():
             target_code = df_meta[df_meta['stnNm'].str.contains('서울')]['stnCd'].values[0]
             print(f"   -> 메타 테이블의 서울역 코드: '{target_code}'")
             
-            sql_by_code = f"SELECT COUNT(*) FROM subway_traffic_log WHERE stnCd = '{target_code}'"
-            count_code = pd.read_sql(sql_by_code, conn).iloc[0,0]
+            sql_by_code = "SELECT COUNT(*) FROM subway_traffic_log WHERE stnCd = %s"
+            count_code = pd.read_sql(sql_by_code, conn, params=[str(target_code)]).iloc[0,0]
             print(f"   -> 코드('{target_code}')로 찾았을 때: {count_code:,}건 발견")
             
             if count_name > 0 and count_code == 0:
@@ -0,0 +1,127 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import analytics_mirror
+import db_pool
+import main
+import model_store
+import query_engine
+import station_profile
+from filters import NO_FILTERS, AnalysisFilters
+
+# =============================================================================
+# [PARITY CHECK] MySQL vs DuckDB 미러
+# - 같은 분석 함수를 두 엔진으로 실행해서 결과(payload)가 같은지 비교
+# - 행 순서는 정렬 후 비교, 숫자는 float 로 맞춰 상대오차 1e-9 이내면 같은 값
+# - 엔진별 실행 시간도 함께 출력 (캐시를 거치지 않은 순수 계산 시간)
+#
+# 실행: cd backend && python verify_mirror.py [--no-refresh]
+#       (미러가 최신이어야 하므로 기본으로 analytics_mirror.refresh() 를 먼저 실행)
+# =============================================================================
+
+# 이름 -> 인자 없는 호출 (cached 데코레이터를 건너뛰도록 __wrapped__ 사용)
+CASES = {
+    "vitality": lambda: main.build_vitality_index.__wrapped__(),
+    # 예측은 저장된 모델 대신 각 엔진에서 직접 적합
+    "prediction": lambda: model_store.fit_artifact("cagr", NO_FILTERS).forecast(),
+    "prediction(linear)": lambda: model_store.fit_artifact("linear", NO_FILTERS).forecast(),
+    "meta_stations": lambda: main.build_meta_stations.__wrapped__(),
+    "trend_rhythm": lambda: main.build_trend_rhythm.__wrapped__(),
+    "trend_rank_daytime_active": lambda: main.build_trend_rank_daytime_active.__wrapped__(),
+    "timelapse": lambda: main.build_timelapse.__wrapped__(),
+    "clustering": lambda: main.build_clustering.__wrapped__(),
+    "clustering(profile24, k=4)": lambda: main.build_clustering.__wrapped__(NO_FILTERS, 4, "profile24"),
+    "timelapse(line, hours)": lambda: main.build_timelapse.__wrapped__(
+        AnalysisFilters(line="2호선", hour_from=7, hour_to=10)
+    ),
+}
+
+def _as_frame(result):
+    if isinstance(result, pd.DataFrame):
+        return result
+    if isinstance(result, dict):
+        # station detail: {"basic": {...}, "time": [...], "day": [...]}
+        return pd.concat(
+            {k: pd.DataFrame(v if isinstance(v, list) else [v]) for k, v in result.items()},
+            names=["part"]
+        ).reset_index(level=0)
+    return pd.DataFrame(result)
+
+def _normalize(df):
+    df = df.copy()
+    for col in df.columns:
+        converted = pd.to_numeric(df[col], errors='coerce')
+        if converted.notna().sum() == df[col].notna().sum():
+            df[col] = converted.astype(float)
+        else:
+            df[col] = df[col].astype(str)
+    df = df.reindex(sorted(df.columns), axis=1)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def compare(left, right):
+    a, b = _normalize(_as_frame(left)), _normalize(_as_frame(right))
+    if list(a.columns) != list(b.columns):
+        return f"columns differ: {list(a.columns)} vs {list(b.columns)}"
+    if len(a) != len(b):
+        return f"row count differs: {len(a)} vs {len(b)}"
+    for col in a.columns:
+        if a[col].dtype == float:
+            if not np.allclose(a[col].values, b[col].values, rtol=1e-9, atol=1e-9, equal_nan=True):
+                return f"values differ in `{col}`"
+        elif not a[col].equals(b[col]):
+            return f"values differ in `{col}`"
+    return None
+
+def _run(engine, func):
+    query_engine.set_engine(engine)
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+def verify(refresh=True):
+    print("🚀 [PARITY] MySQL vs DuckDB 미러 결과 비교\n")
+    if refresh:
+        summary = analytics_mirror.refresh()
+        print(f"   -> 미러 갱신: {summary}\n")
+
+    cases = dict(CASES)
+    sample = _run("mysql", main.build_meta_stations.__wrapped__)[0]
+    if isinstance(sample, pd.DataFrame) and not sample.empty:
+        stn_cd = sample['stnCd'].iloc[0]
+        cases[f"station_detail({stn_cd})"] = lambda: station_profile.build_station_profile(stn_cd)
+
+    failures = 0
+    for name, func in cases.items():
+        mysql_result, mysql_ms = _run("mysql", func)
+        duck_result, duck_ms = _run("duckdb", func)
+        diff = compare(mysql_result, duck_result)
+        timing = f"mysql {mysql_ms:8.1f}ms | duckdb {duck_ms:8.1f}ms"
+        if diff:
+            failures += 1
+            print(f"❌ {name:<32} {timing}  -> {diff}")
+        elif _as_frame(mysql_result).empty:
+            print(f"⚠️ {name:<32} {timing}  -> 두 엔진 모두 결과 없음 (데이터/오류 확인 필요)")
+        else:
+            print(f"✅ {name:<32} {timing}")
+
+    print()
+    if failures:
+        print(f"🚨 {failures}개 항목이 다릅니다.")
+    else:
+        print("✅ 모든 항목이 같습니다.")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    ok = False
+    try:
+        ok = verify(refresh="--no-refresh" not in sys.argv)
+    except Exception as e:
+        print(f"❌ 검증 중 오류 발생: {e}")
+    finally:
+        analytics_mirror.stop_background_refresh()
+        db_pool.close_pool()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+
+import dbconnect
+
+# =============================================================================
+# [CORE] STARTUP WARM-UP + READINESS
+# - 앱 시작 직후 자주 쓰는 결과를 미리 계산해 결과 캐시를 채움
+#   (역 인덱스 로드, 풀 연결 생성, pandas/numpy 경로 첫 실행 포함)
+# - 백그라운드 스레드에서 실행 -> 서버는 바로 뜨고 /ready 가 끝났는지 알려줌
+# - 작업 하나가 실패해도 나머지는 계속 (실패 내역은 상태에 기록)
+#   단, 필수 작업(required: DB 연결, 역 인덱스)이 실패하면 "failed" -> /ready 503
+#   failed 상태에서는 /ready 호출 때 실패한 필수 작업만 다시 시도 (복구되면 ready)
+# - 설정: WARMUP_ENABLED (기본 1, 0 이면 건너뛰고 바로 ready)
+# =============================================================================
+
+RETRY_INTERVAL = 10  # failed 상태에서 필수 작업을 다시 시도하는 최소 간격 (초)
+
+class WarmUp:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # 앱이 다시 시작될 때 (lifespan 재실행) 이전 작업 목록 / 결과를 비움
+        self._tasks = []            # (이름, 인자 없는 함수, 필수 여부)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._state = "pending"     # pending -> running -> ready | failed
+        self._results = {}          # 이름 -> {"ok": bool, "ms": float, "error": str}
+        self._started_at = None
+        self._finished_at = None
+        self._retried_at = 0.0
+
+    def add(self, name, func, required=False):
+        self._tasks.append((name, func, required))
+
+    def _failed_required(self):
+        return [name for name, _, required in self._tasks
+                if required and not self._results.get(name, {}).get("ok", False)]
+
+    def _run(self, tasks):
+        started = time.perf_counter()
+        for name, func, _ in tasks:
+            t0 = time.perf_counter()
+            try:
+                func()
+                result = {"ok": True}
+            except Exception as e:
+                print(f"⚠️ Warm-up task failed ({name}): {e}")
+                result = {"ok": False, "error": str(e)}
+            result["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            with self._lock:
+                self._results[name] = result
+        with self._lock:
+            failed = self._failed_required()
+            self._state = "failed" if failed else "ready"
+            self._finished_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        if failed:
+            print(f"❌ Warm-up failed (required: {', '.join(failed)}) in {time.perf_counter() - started:.1f}s")
+        else:
+            print(f"✅ Warm-up done in {time.perf_counter() - started:.1f}s")
+
+    def _launch(self, tasks):
+        self._thread = threading.Thread(target=self._run, args=(tasks,), name="warmup", daemon=True)
+        self._thread.start()
+
+    def start(self):
+        dbconnect.load_env()
+        with self._lock:
+            self._started_at = time.strftime('%Y-%m-%d %H:%M:%S')
+            if os.getenv('WARMUP_ENABLED', '1') == '0':
+                self._state = "ready"
+                self._finished_at = self._started_at
+                return
+            self._state = "running"
+        self._launch(list(self._tasks))
+
+    def retry(self):
+        # failed 상태에서만, RETRY_INTERVAL 간격으로 실패한 필수 작업을 다시 실행
+        with self._lock:
+            if self._state != "failed" or time.monotonic() - self._retried_at < RETRY_INTERVAL:
+                return False
+            failed = set(self._failed_required())
+            self._retried_at = time.monotonic()
+            self._state = "running"
+        self._launch([task for task in self._tasks if task[0] in failed])
+        return True
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def ready(self):
+        return self._state == "ready"
+
+    def status(self):
+        with self._lock:
+            return {
+                "ready": self._state == "ready",
+                "state": self._state,
+                "started_at": self._started_at,
+                "finished_at": self._finished_at,
+                "tasks": {name: dict(r) for name, r in self._results.items()},
+                "required": [name for name, _, required in self._tasks if required],
+                "pending": [name for name, _, _ in self._tasks if name not in self._results],
+            }
+
+
+warmup = WarmUp()
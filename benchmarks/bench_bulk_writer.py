@@ -0,0 +1,142 @@
+"""
+Bulk writer benchmark: rows/sec of the old row-by-row upsert vs bulk_writer.upsert.
+
+Synthetic rows shaped like the 22-24 senior CSV load (station x day x hour, trnscdUserSeCd '06')
+are written into a scratch copy of `subway_traffic_log_senior_22-24` (created from
+create_table_2.sql, dropped afterwards):
+  - row_by_row : the old notebook loop (cursor.execute per row, commit per 10,000 rows)
+  - bulk       : bulk_writer.upsert, new rows        (method insert, or load with --load)
+  - bulk_update: bulk_writer.upsert, same rows again (every row hits ON DUPLICATE KEY UPDATE)
+
+    python benchmarks/bench_bulk_writer.py [--rows 300000] [--baseline-rows 20000] [--load] [--json]
+
+The row-by-row baseline is slow, so it only writes --baseline-rows rows; rows/sec is compared.
+Requires a MySQL server reachable with the backend .env settings.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "backend"))
+
+import bulk_writer  # noqa: E402
+import dbconnect  # noqa: E402
+
+SCRATCH_TABLE = "_bench_senior_22_24"
+
+ROW_SQL = f"""
+    INSERT INTO `{SCRATCH_TABLE}`
+    (UserGroup, pasngDe, pasngHr, lineNm, stnCd, stnNm, trnscdUserSeCd, rideNope, gffNope)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        rideNope = VALUES(rideNope),
+        gffNope = VALUES(gffNope)
+"""
+
+def make_rows(n_rows, rng, start="2022-01-01"):
+    # 역 280개 x 20개 시간대 단위로 날짜를 늘려 n_rows 개를 채움 (CSV 변환 결과와 같은 컬럼)
+    stations, hours = 280, np.arange(5, 25) % 24
+    per_day = stations * len(hours)
+    days = -(-n_rows // per_day)
+    dates = pd.date_range(start, periods=days).strftime("%Y%m%d").to_numpy()
+    codes = np.array([f"{150 + i * 7:04d}" for i in range(stations)])
+    de, stn, hr = (a.ravel()[:n_rows] for a in np.meshgrid(dates, codes, hours, indexing="ij"))
+    return pd.DataFrame({
+        "UserGroup": "노인/약자",
+        "pasngDe": de,
+        "pasngHr": hr,
+        "lineNm": "정보없음",
+        "stnCd": stn,
+        "stnNm": np.char.add("테스트", stn.astype(str)),
+        "trnscdUserSeCd": "06",
+        "rideNope": rng.integers(0, 500, n_rows),
+        "gffNope": rng.integers(0, 500, n_rows),
+    })
+
+def create_scratch(conn):
+    with open(os.path.join(ROOT_DIR, "create_table_2.sql"), encoding="utf-8") as f:
+        ddl = next(s for s in f.read().split(";") if "CREATE TABLE" in s)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{SCRATCH_TABLE}`")
+    cursor.execute(ddl.replace("IF NOT EXISTS `subway_traffic_log_senior_22-24`", f"`{SCRATCH_TABLE}`"))
+    conn.commit()
+
+def truncate(conn):
+    conn.cursor().execute(f"TRUNCATE TABLE `{SCRATCH_TABLE}`")
+    conn.commit()
+
+def row_by_row(conn, df, chunk=10000):
+    # 기존 노트북 02 의 insert_to_db 와 같은 방식
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    for i in range(0, len(df), chunk):
+        for row in df.iloc[i:i + chunk].values:
+            cursor.execute(ROW_SQL, (row[0], row[1], int(row[2]), row[3], row[4], row[5], row[6],
+                                     int(row[7]), int(row[8])))
+        conn.commit()
+    return time.perf_counter() - started
+
+def bulk(conn, spec, df, method, chunk):
+    started = time.perf_counter()
+    inserted = 0
+    for i in range(0, len(df), chunk):
+        result = bulk_writer.upsert(conn, spec, df.iloc[i:i + chunk], method=method, track_stats=False)
+        inserted += result.inserted
+    return time.perf_counter() - started, inserted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=300000, help="rows for the bulk runs")
+    parser.add_argument("--baseline-rows", type=int, default=20000, help="rows for the row-by-row run")
+    parser.add_argument("--chunk", type=int, default=200000, help="rows per bulk_writer.upsert call")
+    parser.add_argument("--load", action="store_true", help="stage with LOAD DATA LOCAL INFILE")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch table")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    df = make_rows(args.rows, np.random.default_rng(args.seed))
+    spec = dataclasses.replace(bulk_writer.SENIOR_LOG, table=SCRATCH_TABLE)
+    method = "load" if args.load else "insert"
+
+    conn = dbconnect.MydbConnect('seoul_urban_lab', local_infile=args.load)
+    results = []
+    try:
+        create_scratch(conn)
+
+        base = df.iloc[:args.baseline_rows]
+        seconds = row_by_row(conn, base)
+        results.append({"method": "row_by_row", "rows": len(base), "seconds": round(seconds, 2),
+                        "rows_per_sec": round(len(base) / seconds)})
+
+        truncate(conn)
+        seconds, inserted = bulk(conn, spec, df, method, args.chunk)
+        results.append({"method": f"bulk({method})", "rows": len(df), "inserted": inserted,
+                        "seconds": round(seconds, 2), "rows_per_sec": round(len(df) / seconds)})
+
+        seconds, inserted = bulk(conn, spec, df, method, args.chunk)
+        results.append({"method": f"bulk_update({method})", "rows": len(df), "inserted": inserted,
+                        "seconds": round(seconds, 2), "rows_per_sec": round(len(df) / seconds)})
+    finally:
+        if not args.keep:
+            conn.cursor().execute(f"DROP TABLE IF EXISTS `{SCRATCH_TABLE}`")
+        conn.close()
+
+    baseline = results[0]["rows_per_sec"]
+    for r in results:
+        r["speedup"] = round(r["rows_per_sec"] / baseline, 1)
+
+    if args.json:
+        print(json.dumps({"benchmark": "bulk_writer", "results": results}, ensure_ascii=False, indent=2))
+        return
+    print(pd.DataFrame(results).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
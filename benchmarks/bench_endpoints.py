@@ -0,0 +1,175 @@
+"""
+Endpoint benchmark: time every analysis endpoint at several synthetic data sizes.
+
+For each scale (stations x days) a synthetic mirror is generated (synthetic_data.py)
+and served through the DuckDB engine, so no MySQL server is needed. Each endpoint is
+called through the real FastAPI app (middleware, serialization, compression):
+  - first_ms  : very first call (station index load, model fit, DuckDB file scan)
+  - cold_ms   : median with the result cache cleared before every call
+  - cached_ms : median when served from the result cache
+
+    python benchmarks/bench_endpoints.py [--scales 50x30,150x180,300x365] [--repeat 5]
+                                         [--json] [--out results.json]
+
+Write --out for each commit and diff the files to spot regressions.
+Requires fastapi, httpx (TestClient), duckdb and the backend dependencies.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "backend"))
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic_data  # noqa: E402
+
+START = "2025-01-01"
+
+# (이름, 경로) - 대시보드가 실제로 호출하는 형태
+ENDPOINTS = [
+    ("meta_stations", "/meta/stations"),
+    ("vitality", "/analysis/vitality"),
+    ("prediction", "/analysis/prediction"),
+    ("prediction(linear)", "/analysis/prediction?model=linear"),
+    ("trend_rhythm", "/analysis/trend/rhythm"),
+    ("trend_rank_daytime_active", "/analysis/trend/rank-daytime-active"),
+    ("timelapse", "/analysis/timelapse"),
+    ("timelapse(line, month)", "/analysis/timelapse?line=2호선&start={month_start}&end={month_end}"),
+    ("clustering", "/analysis/clustering"),
+    ("clustering(profile24)", "/analysis/clustering?features=profile24&k=4"),
+    ("station_detail", "/station/detail/{station}"),
+]
+
+def _parse_scales(text):
+    scales = []
+    for part in text.split(","):
+        stations, days = part.lower().split("x")
+        scales.append((int(stations), int(days)))
+    return scales
+
+def _commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return None
+
+def _load_app(work_dir):
+    # 엔진 / 저장 경로는 import 전에 환경 변수로 지정 (모듈이 import 시점에 읽음)
+    os.environ["ANALYTICS_ENGINE"] = "duckdb"
+    os.environ["MIRROR_DIR"] = os.path.join(work_dir, "mirror")
+    os.environ["FORECAST_DIR"] = os.path.join(work_dir, "models")
+    os.environ["WARMUP_ENABLED"] = "0"
+    import main
+    return main
+
+def _reset_state(main):
+    # 규모가 바뀔 때마다 메모리에 남은 이전 데이터 상태를 비움 (벤치마크 전용)
+    import analytics_mirror
+    import clustering
+    import model_store
+    import station_index
+    analytics_mirror._duck = None
+    analytics_mirror._state = None
+    station_index._index = None
+    clustering._results.clear()
+    with model_store._lock:
+        model_store._artifacts.clear()
+    main.cache.clear()
+
+def bench_scale(main, client, work_dir, stations, days, repeat, seed):
+    mirror = os.environ["MIRROR_DIR"]
+    started = time.perf_counter()
+    rows = synthetic_data.generate(mirror, stations=stations, days=days, start=START, seed=seed, verbose=False)
+    gen_s = time.perf_counter() - started
+    _reset_state(main)
+
+    start = pd.Timestamp(START)
+    fmt = {
+        "station": main.query_engine.read_sql("SELECT MIN(stnKey) AS stnKey FROM station_meta")["stnKey"].iloc[0],
+        "month_start": start.date().isoformat(),
+        "month_end": (start + pd.Timedelta(days=min(days, 30) - 1)).date().isoformat(),
+    }
+
+    results = []
+    for name, path in ENDPOINTS:
+        url = path.format(**fmt)
+        t0 = time.perf_counter()
+        response = client.get(url)
+        first_ms = (time.perf_counter() - t0) * 1000
+
+        cold, cached = [], []
+        for _ in range(repeat):
+            main.cache.clear()
+            t0 = time.perf_counter()
+            client.get(url)
+            cold.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            client.get(url)
+            cached.append((time.perf_counter() - t0) * 1000)
+
+        results.append({
+            "endpoint": name, "path": url, "status": response.status_code,
+            "bytes": len(response.content),
+            "first_ms": round(first_ms, 2),
+            "cold_ms": round(statistics.median(cold), 2),
+            "cold_max_ms": round(max(cold), 2),
+            "cached_ms": round(statistics.median(cached), 2),
+        })
+    return {"stations": stations, "days": days, "rows": rows, "generate_s": round(gen_s, 1), "results": results}
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="50x30,150x180,300x365", help="comma separated STATIONSxDAYS")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--out", help="also write the JSON results to this file")
+    parser.add_argument("--work-dir", help="where to write the synthetic mirror (default: temp dir)")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="bench_endpoints_")
+    main = _load_app(work_dir)
+    # with 블록 없이 생성 -> lifespan(MySQL 풀 생성)을 실행하지 않음
+    client = TestClient(main.app)
+
+    scales = []
+    for stations, days in _parse_scales(args.scales):
+        if not args.json:
+            print(f"⏱️  {stations} stations x {days} days ...")
+        scales.append(bench_scale(main, client, work_dir, stations, days, args.repeat, args.seed))
+
+    report = {
+        "benchmark": "endpoints",
+        "commit": _commit(),
+        "created_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": "duckdb",
+        "repeat": args.repeat,
+        "scales": scales,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    for scale in scales:
+        print(f"\n== {scale['stations']} stations x {scale['days']} days "
+              f"(log rows {scale['rows']['subway_traffic_log']:,}, generated in {scale['generate_s']}s)")
+        print(pd.DataFrame(scale["results"]).drop(columns=["path"]).to_string(index=False))
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,85 @@
+"""
+Forecasting benchmark: fit + predict time for every model on synthetic station series.
+
+Annual models use `--years` yearly totals per series, the seasonal model uses
+`--years` x 12 monthly totals, mirroring what /analysis/prediction feeds the engine.
+
+    python benchmarks/bench_forecasting.py [--series 5000] [--years 3] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import forecasting  # noqa: E402
+
+def make_panel(n_series, years, monthly, rng, start_year=2022):
+    # 역별 기본 규모 x 성장률 x (월별이면) 계절 패턴 + 잡음
+    base = rng.lognormal(mean=11, sigma=1, size=n_series)
+    growth = rng.normal(0.03, 0.05, size=n_series)
+    names = np.array([f"테스트{i:05d}역" for i in range(n_series)])
+
+    if monthly:
+        t = np.arange(years * 12)
+        season = 1 + 0.15 * np.sin(2 * np.pi * t / 12)
+        values = base[:, None] / 12 * (1 + growth[:, None]) ** (t / 12) * season
+        values *= rng.normal(1, 0.05, size=values.shape)
+        return pd.DataFrame({
+            "stnNm": np.repeat(names, len(t)),
+            "year": np.tile(start_year + t // 12, n_series),
+            "month": np.tile(t % 12 + 1, n_series),
+            "total_vol": values.ravel(),
+        })
+
+    t = np.arange(years)
+    values = base[:, None] * (1 + growth[:, None]) ** t * rng.normal(1, 0.05, size=(n_series, years))
+    return pd.DataFrame({
+        "stnNm": np.repeat(names, years),
+        "year": np.tile(start_year + t, n_series),
+        "total_vol": values.ravel(),
+    })
+
+def bench(model, panel, repeat):
+    samples = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(forecasting.forecast_stations(panel, model=model))
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"model": model, "series": int(panel['stnNm'].nunique()), "rows_out": rows,
+            "median_ms": round(statistics.median(samples), 2), "max_ms": round(max(samples), 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    annual = make_panel(args.series, args.years, False, rng)
+    monthly = make_panel(args.series, max(args.years, 2), True, rng)
+
+    results = [
+        bench("cagr", annual, args.repeat),
+        bench("linear", annual, args.repeat),
+        bench("seasonal", monthly, args.repeat),
+    ]
+
+    if args.json:
+        print(json.dumps({"benchmark": "forecasting", "results": results}, indent=2))
+        return
+    print(pd.DataFrame(results).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
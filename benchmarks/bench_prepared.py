@@ -0,0 +1,101 @@
+"""
+Prepared statement benchmark: plain pd.read_sql vs db_pool.StatementCache on one connection.
+
+The statement cache saves the server-side parse of a query; binding and execution go out as one
+multi-statement (SET @p..; EXECUTE ..), so each call is still a single round trip. Whether the
+saved parse pays for the extra SET depends on the query, so compare before keeping the default:
+  - plain    : pd.read_sql(sql, conn, params)             (DB_PREPARED_STATEMENTS=0)
+  - prepared : StatementCache.read_sql(conn, sql, params) (DB_PREPARED_STATEMENTS=1, default)
+Each query runs with a different station / date parameter per call; runs alternate so both
+methods see the same buffer pool state.
+
+    python benchmarks/bench_prepared.py [--repeat 200] [--json]
+
+Requires a MySQL server reachable with the backend .env settings and a filled rollup.
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import db_pool  # noqa: E402
+import dbconnect  # noqa: E402
+import station_profile  # noqa: E402
+from rollup import ROLLUP_TABLE  # noqa: E402
+
+# (이름, SQL, 호출마다 파라미터를 만드는 함수(역코드, 일자))
+QUERIES = [
+    ("station_profile", station_profile._profile_sql()[0], lambda stn, day: [stn]),
+    ("station_profile_range", station_profile._profile_sql("2000-01-01", "2099-12-31")[0],
+     lambda stn, day: [stn, day, "2099-12-31"]),
+    ("station_day_hours",
+     f"SELECT pasngHr, SUM(volume) AS volume FROM {ROLLUP_TABLE} WHERE stnKey = %s AND pasngDate = %s GROUP BY pasngHr",
+     lambda stn, day: [stn, day]),
+    ("meta_point", "SELECT stnKey, stnNm, lineNm, lat, lon FROM station_meta WHERE stnKey = %s",
+     lambda stn, day: [stn]),
+]
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="calls per query and method")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    # 풀 연결과 같은 설정 (prepared 묶음 실행에 multi-statement 필요)
+    conn = dbconnect.MydbConnect('seoul_urban_lab', multi_statements=True)
+    conn.autocommit(True)
+    counts = {}
+    cache = db_pool.StatementCache(64, lambda key, amount=1: counts.__setitem__(key, counts.get(key, 0) + amount))
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT stnKey FROM station_meta")
+        stations = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"SELECT DISTINCT pasngDate FROM {ROLLUP_TABLE} ORDER BY pasngDate DESC LIMIT 30")
+        days = [str(row[0]) for row in cursor.fetchall()]
+        cursor.close()
+        if not stations or not days:
+            raise SystemExit("❌ station_meta / rollup is empty")
+
+        results = []
+        for name, sql, make_params in QUERIES:
+            timings = {"plain": [], "prepared": []}
+            for i in range(args.repeat):
+                params = make_params(stations[i % len(stations)], days[i % len(days)])
+                order = ("plain", "prepared") if i % 2 == 0 else ("prepared", "plain")
+                for method in order:
+                    started = time.perf_counter()
+                    if method == "plain":
+                        pd.read_sql(sql, conn, params=params)
+                    else:
+                        cache.read_sql(conn, sql, params)
+                    timings[method].append((time.perf_counter() - started) * 1000)
+            plain_p50 = statistics.median(timings["plain"])
+            for method, values in timings.items():
+                p50 = statistics.median(values)
+                results.append({"query": name, "method": method, "calls": len(values),
+                                "p50_ms": round(p50, 3), "p95_ms": round(_percentile(values, 95), 3),
+                                "vs_plain": round(p50 / plain_p50, 2) if plain_p50 else None})
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps({"benchmark": "prepared_statements", "results": results, "cache": counts}, indent=2))
+        return
+    print(pd.DataFrame(results).to_string(index=False))
+    print(f"\nstatement cache: {counts}")
+    print("vs_plain > 1 이면 prepared 가 느림 -> .env 에 DB_PREPARED_STATEMENTS=0")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Serialization / compression benchmark for the table endpoints.
+
+Builds synthetic payloads shaped like /analysis/vitality and /analysis/timelapse
+(Seoul scale: ~600 stations, 24 hours) and compares
+  - baseline : FastAPI default (jsonable_encoder + json.dumps)
+  - orjson   : responses.dumps (FastJSONResponse)
+  - arrow    : responses.to_arrow_bytes (Accept: application/vnd.apache.arrow.stream)
+and the bytes on the wire with gzip / brotli at the server's default levels.
+
+    python benchmarks/bench_serialization.py [--stations 600] [--repeat 20] [--json]
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import responses  # noqa: E402
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# =============================================================================
+# Synthetic payloads
+# =============================================================================
+def make_vitality(n_stations, rng):
+    names = [f"테스트{i:03d}역" for i in range(n_stations)]
+    total = rng.integers(1_000, 2_000_000, n_stations).astype(float)
+    senior = total * rng.uniform(0.05, 0.35, n_stations)
+    df = pd.DataFrame({
+        "stnNm": names,
+        "stnCd": [f"{i:04d}" for i in range(n_stations)],
+        "lat": rng.uniform(37.41, 37.70, n_stations),
+        "lon": rng.uniform(126.76, 127.18, n_stations),
+        "total_vol": total,
+        "senior_vol": senior,
+        "morning_vol": total * rng.uniform(0.1, 0.4, n_stations),
+        "evening_vol": total * rng.uniform(0.1, 0.4, n_stations),
+    })
+    df["norm_vol"] = df["senior_vol"] / df["senior_vol"].max() * 100
+    df["silver_ratio"] = df["senior_vol"] / df["total_vol"] * 100
+    df["balance_score"] = rng.uniform(0, 100, n_stations)
+    df["vitality_score"] = df["norm_vol"] * 0.5 + df["balance_score"] * 0.3 + df["silver_ratio"] * 0.2
+    return df
+
+def make_timelapse(n_stations, rng):
+    hours = np.tile(np.arange(24), n_stations)
+    stations = np.repeat(np.arange(n_stations), 24)
+    return pd.DataFrame({
+        "pasngHr": hours,
+        "stnNm": [f"테스트{i:03d}역" for i in stations],
+        "lat": np.repeat(rng.uniform(37.41, 37.70, n_stations), 24),
+        "lon": np.repeat(rng.uniform(126.76, 127.18, n_stations), 24),
+        "volume": rng.integers(0, 50_000, n_stations * 24).astype(float),
+    })
+
+# =============================================================================
+# Encoders
+# =============================================================================
+def encode_baseline(df):
+    records = df.to_dict(orient="records")
+    if jsonable_encoder is not None:
+        records = jsonable_encoder(records)
+    # starlette JSONResponse.render 와 동일한 옵션
+    return json.dumps(records, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def encode_fast(df):
+    return responses.dumps(df.to_dict(orient="records"))
+
+def encode_arrow(df):
+    return responses.to_arrow_bytes(df)
+
+def _median_ms(func, arg, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def bench_payload(name, df, repeat):
+    encoders = {"baseline": encode_baseline, "orjson": encode_fast}
+    if responses.pa is not None:
+        encoders["arrow"] = encode_arrow
+
+    rows = []
+    for enc_name, func in encoders.items():
+        body = func(df)
+        row = {
+            "payload": name,
+            "rows": len(df),
+            "encoder": enc_name,
+            "serialize_ms": round(_median_ms(func, df, repeat), 3),
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, compresslevel=6)),
+            "gzip_ms": round(_median_ms(lambda b: gzip.compress(b, compresslevel=6), body, repeat), 3),
+        }
+        if brotli is not None:
+            row["br_bytes"] = len(brotli.compress(body, quality=4))
+            row["br_ms"] = round(_median_ms(lambda b: brotli.compress(b, quality=4), body, repeat), 3)
+        rows.append(row)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    results += bench_payload("vitality", make_vitality(args.stations, rng), args.repeat)
+    results += bench_payload("timelapse", make_timelapse(args.stations, rng), args.repeat)
+
+    if args.json:
+        print(json.dumps({"benchmark": "serialization", "results": results}, indent=2))
+        return
+
+    cols = ["payload", "rows", "encoder", "serialize_ms", "bytes", "gzip_bytes", "gzip_ms", "br_bytes", "br_ms"]
+    print(pd.DataFrame(results).reindex(columns=cols).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Load test: many analysts using the dashboard at the same time.
+
+Each virtual user repeatedly "opens" a dashboard page and fires the same backend calls, in the
+same order, as the Streamlit page does through frontend/api_client.py (sequentially, as a
+Streamlit script run does). Between visits it pauses for an exponential think time.
+  - pages   : home, trend, station, silver_map, clustering, vitality, forecast
+  - mix     : relative page weights, e.g. --mix home=3,station=5,forecast=1
+  - users   : concurrency levels to run one after the other, e.g. --users 1,10,25
+
+By default the backend is a local stand-in: the synthetic mirror (synthetic_data.py) served
+by uvicorn with the DuckDB engine, so no MySQL server is needed (/status on the Home page then
+reports zero counts). Pass --url to load an already running backend instead.
+
+    python benchmarks/load_test.py [--users 1,10,25] [--duration 60] [--think 1.0]
+                                   [--mix home=3,trend=2,...] [--workers 1]
+                                   [--url http://127.0.0.1:8000] [--json] [--out results.json]
+
+Reported per concurrency level: throughput (requests/s, page visits/s), error rate, and
+p50 / p95 / p99 latency per endpoint and per page. Calls are not served from the frontend's
+st.cache_data (a cold Streamlit session), only from the backend's own caches.
+Requires requests (and duckdb, uvicorn and the backend dependencies for the stand-in).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+sys.path.insert(0, BENCH_DIR)
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+DEFAULT_MIRROR = os.path.join(ROOT_DIR, "data", "bench_mirror")
+
+# =============================================================================
+# Page visits (frontend/views/*.py 와 같은 호출 순서 / 파라미터)
+# =============================================================================
+def _clustering_params(rng):
+    # 대부분 기본값(ratios, k=3, kmeans) 그대로, 일부는 설정을 바꿔 봄
+    if rng.random() < 0.7:
+        return {"k": 3, "features": "ratios", "algorithm": "kmeans"}
+    return {"k": rng.randint(2, 8), "features": rng.choice(["ratios", "profile24"]),
+            "algorithm": rng.choice(["kmeans", "minibatch"])}
+
+def _forecast_params(rng):
+    return {"model": rng.choices(["cagr", "linear", "seasonal"], weights=[6, 2, 2])[0]}
+
+# 페이지 -> [(엔드포인트 이름, 경로, 파라미터 함수, 응답 형식)]
+PAGES = {
+    "home": [("status", "/status", None, "json")],
+    "trend": [
+        ("trend_rhythm", "/analysis/trend/rhythm", None, "frame"),
+        ("trend_rank_daytime_active", "/analysis/trend/rank-daytime-active", None, "frame"),
+    ],
+    "station": [
+        ("meta_stations", "/meta/stations", None, "frame"),
+        ("station_detail", "/station/detail/{station}", None, "json"),
+    ],
+    "silver_map": [("timelapse", "/analysis/timelapse", None, "frame")],
+    "clustering": [("clustering", "/analysis/clustering", _clustering_params, "frame")],
+    "vitality": [("vitality", "/analysis/vitality", None, "frame")],
+    "forecast": [("prediction", "/analysis/prediction", _forecast_params, "frame")],
+}
+
+DEFAULT_MIX = "home=3,trend=2,station=3,silver_map=2,clustering=1,vitality=2,forecast=1"
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        page, weight = part.split("=")
+        page = page.strip()
+        if page not in PAGES:
+            raise SystemExit(f"❌ Unknown page '{page}' (choose from {', '.join(PAGES)})")
+        mix[page] = float(weight)
+    return mix
+
+# =============================================================================
+# Statistics
+# =============================================================================
+def _percentile(sorted_values, q):
+    # nearest-rank
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def _summary(latencies, errors=0):
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "mean_ms": round(sum(values) / count, 1) if count else None,
+        "p50_ms": _round(_percentile(values, 50)),
+        "p95_ms": _round(_percentile(values, 95)),
+        "p99_ms": _round(_percentile(values, 99)),
+        "max_ms": _round(values[-1] if values else None),
+    }
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+class Recorder:
+    """Thread-safe collection of request / page latencies for one concurrency level."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(list)   # endpoint -> [ms]
+        self.errors = Counter()             # endpoint -> 실패 수
+        self.error_kinds = Counter()        # "endpoint: 원인" -> 수
+        self.pages = defaultdict(list)      # page -> [ms]
+        self.page_errors = Counter()
+
+    def request(self, endpoint, elapsed_ms, error=None):
+        with self._lock:
+            self.requests[endpoint].append(elapsed_ms)
+            if error:
+                self.errors[endpoint] += 1
+                self.error_kinds[f"{endpoint}: {error}"] += 1
+
+    def page(self, page, elapsed_ms, failed):
+        with self._lock:
+            self.pages[page].append(elapsed_ms)
+            if failed:
+                self.page_errors[page] += 1
+
+    def report(self, users, seconds):
+        total = sum(len(v) for v in self.requests.values())
+        errors = sum(self.errors.values())
+        visits = sum(len(v) for v in self.pages.values())
+        return {
+            "users": users,
+            "duration_s": round(seconds, 1),
+            "requests": total,
+            "page_visits": visits,
+            "throughput_rps": round(total / seconds, 2) if seconds else 0.0,
+            "pages_per_s": round(visits / seconds, 2) if seconds else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "endpoints": {name: _summary(v, self.errors[name]) for name, v in sorted(self.requests.items())},
+            "pages": {name: _summary(v, self.page_errors[name]) for name, v in sorted(self.pages.items())},
+            "error_kinds": dict(self.error_kinds.most_common(20)),
+        }
+
+# =============================================================================
+# Virtual users
+# =============================================================================
+def _call(base_url, path, params, kind, accept, timeout):
+    """Fire one request like api_client does. Returns an error label or None."""
+    headers = {}
+    if kind == "frame" and accept == "arrow":
+        headers["Accept"] = f"{ARROW_MEDIA_TYPE}, application/json;q=0.9"
+    response = requests.get(f"{base_url}{path}", headers=headers, params=params, timeout=timeout)
+    body = response.content
+    if response.status_code >= 400:
+        return f"HTTP {response.status_code}"
+    # 분석 API 는 실패해도 200 + 빈 목록 / {"error": ...} 로 응답하므로 본문도 확인
+    if body.startswith(b'{"error"'):
+        return "error body"
+    if kind == "frame" and body.strip() == b"[]":
+        return "empty result"
+    return None
+
+def _visit(page, base_url, stations, rng, recorder, accept, timeout):
+    page_started = time.perf_counter()
+    failed = False
+    for endpoint, path, make_params, kind in PAGES[page]:
+        params = make_params(rng) if make_params else None
+        url_path = path.format(station=rng.choice(stations)) if "{station}" in path else path
+        started = time.perf_counter()
+        try:
+            error = _call(base_url, url_path, params, kind, accept, timeout)
+        except requests.RequestException as e:
+            error = type(e).__name__
+        recorder.request(endpoint, (time.perf_counter() - started) * 1000, error)
+        failed = failed or error is not None
+    recorder.page(page, (time.perf_counter() - page_started) * 1000, failed)
+
+def _user_loop(user_id, deadline, base_url, stations, mix, think, seed, recorder, accept, timeout, ramp):
+    rng = random.Random(seed * 1000 + user_id)
+    pages, weights = list(mix), list(mix.values())
+    # 동시에 몰리지 않도록 사용자마다 시작 시점을 분산
+    time.sleep(rng.uniform(0, ramp))
+    while time.monotonic() < deadline:
+        page = rng.choices(pages, weights=weights)[0]
+        _visit(page, base_url, stations, rng, recorder, accept, timeout)
+        if think > 0:
+            time.sleep(min(rng.expovariate(1 / think), max(deadline - time.monotonic(), 0)))
+
+def run_level(base_url, users, duration, mix, think, seed, stations, accept, timeout, ramp):
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [
+        threading.Thread(target=_user_loop, name=f"vu-{i}", daemon=True,
+                         args=(i, deadline, base_url, stations, mix, think, seed, recorder, accept, timeout, ramp))
+        for i in range(users)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 마감 시각에 진행 중이던 방문까지 포함한 실제 경과 시간으로 처리량 계산
+    return recorder.report(users, time.monotonic() - started)
+
+# =============================================================================
+# Local stand-in server (synthetic mirror + DuckDB engine)
+# =============================================================================
+def _wait_ready(base_url, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/ready", timeout=5).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    return False
+
+def start_stand_in(mirror_dir, port, workers, stations, days, seed, log_path):
+    if not os.path.exists(os.path.join(mirror_dir, "_state.json")):
+        import synthetic_data
+        print(f"⏳ Generating synthetic mirror ({stations} stations x {days} days) -> {mirror_dir}")
+        synthetic_data.generate(mirror_dir, stations=stations, days=days, seed=seed, verbose=False)
+
+    env = dict(os.environ)
+    env.update({
+        "ANALYTICS_ENGINE": "duckdb",
+        "MIRROR_DIR": mirror_dir,
+        "FORECAST_DIR": os.path.join(os.path.dirname(mirror_dir), "bench_models"),
+        # MySQL 이 없으므로 미러 갱신은 사실상 끔, 연결 시도도 최소화
+        "MIRROR_REFRESH_INTERVAL": "86400",
+        "DB_POOL_MIN": "0",
+    })
+    log = open(log_path, "w", encoding="utf-8")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    return process, log
+
+def _station_codes(base_url):
+    response = requests.get(f"{base_url}/meta/stations", timeout=60)
+    codes = [str(row["stnCd"]).zfill(4) for row in response.json()] if response.status_code == 200 else []
+    if not codes:
+        raise SystemExit("❌ /meta/stations returned no stations - is the backend connected to data?")
+    return codes
+
+def _print_level(level):
+    print(f"\n== {level['users']} users, {level['duration_s']}s: "
+          f"{level['throughput_rps']} req/s, {level['pages_per_s']} pages/s, "
+          f"{level['requests']:,} requests, error rate {level['error_rate']:.2%}")
+    for title, rows in (("endpoint", level["endpoints"]), ("page", level["pages"])):
+        print(f"{title:28}{'count':>8}{'err%':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for name, s in rows.items():
+            print(f"  {name:26}{s['count']:>8}{s['error_rate'] * 100:>7.1f}%"
+                  f"{_fmt(s['p50_ms'])}{_fmt(s['p95_ms'])}{_fmt(s['p99_ms'])}{_fmt(s['max_ms'])}")
+    for kind, count in level["error_kinds"].items():
+        print(f"  ⚠️ {kind} x{count}")
+
+def _fmt(value):
+    return f"{'-':>9}" if value is None else f"{value:>9.1f}"
+
+def _commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", default="1,10,25", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=60, help="seconds per concurrency level")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time between page visits (s, 0 = none)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="spread user start times over this many seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="page weights, e.g. home=3,station=5")
+    parser.add_argument("--accept", choices=["arrow", "json"], default="arrow",
+                        help="table format to ask for (api_client asks for Arrow when pyarrow is installed)")
+    parser.add_argument("--timeout", type=float, default=60, help="per request timeout (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="load a running backend instead of starting the local stand-in")
+    parser.add_argument("--mirror", default=DEFAULT_MIRROR, help="synthetic mirror for the stand-in (generated if missing)")
+    parser.add_argument("--stations", type=int, default=300, help="stand-in size when generating the mirror")
+    parser.add_argument("--days", type=int, default=365, help="stand-in size when generating the mirror")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the stand-in")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--out", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    levels = [int(u) for u in args.users.split(",")]
+
+    process = log = None
+    base_url = (args.url or f"http://127.0.0.1:{args.port}").rstrip("/")
+    try:
+        if not args.url:
+            log_path = os.path.join(os.path.dirname(args.mirror), "load_test_server.log")
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            process, log = start_stand_in(args.mirror, args.port, args.workers,
+                                          args.stations, args.days, args.seed, log_path)
+            if not args.json:
+                print(f"⏳ Waiting for stand-in backend at {base_url} (log: {log_path})")
+        if not _wait_ready(base_url):
+            raise SystemExit(f"❌ Backend at {base_url} did not become ready")
+
+        stations = _station_codes(base_url)
+        results = []
+        for users in levels:
+            if not args.json:
+                print(f"⏱️  {users} users for {args.duration:.0f}s ...")
+            results.append(run_level(base_url, users, args.duration, mix, args.think, args.seed,
+                                     stations, args.accept, args.timeout, min(args.ramp, args.duration)))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+            log.close()
+
+    report = {
+        "benchmark": "load_test",
+        "commit": _commit(),
+        "created_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": args.url or "stand-in (synthetic mirror, duckdb)",
+        "workers": None if args.url else args.workers,
+        "mix": mix,
+        "think_s": args.think,
+        "accept": args.accept,
+        "levels": results,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    for level in results:
+        _print_level(level)
+
+if __name__ == "__main__":
+    main()
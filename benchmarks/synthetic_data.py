@@ -0,0 +1,238 @@
+"""
+Synthetic Seoul-scale data for benchmarks and load tests.
+
+Generates station_meta, subway_traffic_log (+ its hourly rollup) and the
+22-24 senior history table with realistic shapes (per-class hourly profiles,
+weekday/weekend split, yearly growth, transfer stations sharing a name) and
+writes them as a DuckDB/Parquet mirror (same layout analytics_mirror.py reads),
+which serves as a local stand-in database:
+
+    python benchmarks/synthetic_data.py --stations 300 --days 1095 --out data/bench_mirror
+    ANALYTICS_ENGINE=duckdb MIRROR_DIR=data/bench_mirror uvicorn main:app   # from backend/
+
+Requires numpy, pandas and duckdb. Output is deterministic for a given --seed.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import ingest_state  # noqa: E402
+import user_class  # noqa: E402
+from rollup import ROLLUP_TABLE  # noqa: E402
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+LINES = [f"{n}호선" for n in range(1, 10)]
+# 사용자 구분 코드와 전체 이용량 중 비중 (대략적인 서울 지하철 구성)
+CODES = ["01", "02", "03", "04", "06", "100", "99"]
+CODE_SHARE = np.array([0.72, 0.02, 0.04, 0.03, 0.14, 0.01, 0.04])
+CODE_CLASS = np.array([user_class.get_user_class(c) for c in CODES])
+TRANSFER_SHARE = 0.12  # 다른 호선 코드와 역명을 공유하는 환승역 비율
+
+def _hour_profile(peaks, widths, base=0.02):
+    h = np.arange(24)
+    p = np.full(24, base)
+    for center, width, weight in zip(peaks, widths, (1.0, 0.8, 0.5)):
+        p += weight * np.exp(-0.5 * ((h - center) / width) ** 2)
+    p[1:5] = 0.001  # 심야 운행 없음
+    return p / p.sum()
+
+# 등급별 24시간 프로필: 일반 = 출퇴근 피크, 노인 = 오전 늦게 ~ 오후 이른 시간
+PROFILES = {
+    user_class.CLASS_GENERAL: _hour_profile((8, 18, 13), (1.2, 1.5, 3.0)),
+    user_class.CLASS_YOUTH: _hour_profile((7.5, 16, 20), (1.0, 1.5, 2.0)),
+    user_class.CLASS_SENIOR: _hour_profile((10.5, 14, 17), (1.5, 1.8, 1.5)),
+    user_class.CLASS_OTHER: _hour_profile((11, 16, 20), (2.5, 2.5, 2.0)),
+}
+WEEKEND_FACTOR = {user_class.CLASS_GENERAL: 0.55, user_class.CLASS_YOUTH: 0.45,
+                  user_class.CLASS_SENIOR: 0.85, user_class.CLASS_OTHER: 0.9}
+
+# =============================================================================
+# Tables
+# =============================================================================
+def make_station_meta(n_stations, rng):
+    codes = np.array([f"{150 + i * 7:04d}" for i in range(n_stations)])
+    names = np.array([f"합성{i:03d}" for i in range(n_stations)], dtype=object)
+    # 일부 역은 앞 역과 같은 이름 (다른 호선 코드를 가진 환승역)
+    transfer = rng.random(n_stations) < TRANSFER_SHARE
+    transfer[0] = False
+    names[transfer] = names[np.flatnonzero(transfer) - 1]
+    suffix = rng.random(n_stations) < 0.5  # 원본처럼 '역' 접미사가 있는 이름과 없는 이름이 섞임
+    names = np.where(suffix, names + "역", names)
+    return pd.DataFrame({
+        "stnCd": codes,
+        "stnKey": codes,
+        "stnNm": names,
+        "lineNm": rng.choice(LINES, size=n_stations),
+        "lat": np.round(37.55 + rng.normal(0, 0.06, n_stations), 7),
+        "lon": np.round(126.98 + rng.normal(0, 0.09, n_stations), 7),
+    })
+
+def _station_params(meta, rng):
+    base = rng.lognormal(mean=np.log(9000), sigma=0.8, size=len(meta))   # 하루 총 이용량
+    senior_tilt = rng.lognormal(0, 0.35, size=len(meta))                 # 역마다 다른 노인 비중
+    growth = rng.normal(0.03, 0.04, size=len(meta))                      # 연간 성장률
+    return base, senior_tilt, growth
+
+def make_log(meta, params, dates, codes_idx, rng, start_year):
+    """
+    One log chunk: every (date, station, hour, code) combination with a positive count.
+    codes_idx: indices into CODES to generate (all codes for the main log, senior codes for history).
+    """
+    base, senior_tilt, growth = params
+    S, D, C = len(meta), len(dates), len(codes_idx)
+    d, s, h, c = (a.ravel() for a in np.meshgrid(np.arange(D), np.arange(S), np.arange(24), codes_idx, indexing='ij'))
+
+    day = pd.DatetimeIndex(dates)
+    weekend = (day.dayofweek >= 5)[d]
+    years = (day.year - start_year + day.dayofyear / 366.0).to_numpy()[d]
+    cls = CODE_CLASS[c]
+    profile = np.stack([PROFILES[k] for k in CODE_CLASS])                # 코드 x 24
+    weekend_f = np.array([WEEKEND_FACTOR[k] for k in CODE_CLASS])
+    tilt = np.where(cls == user_class.CLASS_SENIOR, senior_tilt[s], 1.0)
+
+    mean = base[s] * CODE_SHARE[c] * tilt * profile[c, h] * (1 + growth[s]) ** years
+    mean = mean * np.where(weekend, weekend_f[c], 1.0)
+    ride = rng.poisson(mean * 0.5)
+    gff = rng.poisson(mean * 0.5)
+    keep = (ride + gff) > 0
+    d, s, h, c, ride, gff = d[keep], s[keep], h[keep], c[keep], ride[keep], gff[keep]
+
+    day_str = day.strftime('%Y%m%d').to_numpy()
+    pasng_date = day.to_numpy()[d]
+    codes = np.array(CODES)
+    groups = np.array([user_class.get_user_group(x) for x in CODES])
+    return pd.DataFrame({
+        "UserGroup": groups[c],
+        "pasngDe": day_str[d],
+        "pasngDate": pasng_date,
+        "pasngYear": day.year.to_numpy()[d].astype('int16'),
+        # MySQL DAYOFWEEK: 1 = 일요일 ~ 7 = 토요일
+        "pasngDow": ((day.dayofweek.to_numpy() + 1) % 7 + 1)[d].astype('int8'),
+        "pasngHr": h.astype('int32'),
+        "lineNm": meta['lineNm'].to_numpy()[s],
+        "stnCd": meta['stnCd'].to_numpy()[s],
+        "stnKey": meta['stnKey'].to_numpy()[s],
+        "stnNm": meta['stnNm'].to_numpy()[s],
+        "trnscdUserSeCd": codes[c],
+        "userClass": CODE_CLASS[c].astype('int8'),
+        "rideNope": ride.astype('int32'),
+        "gffNope": gff.astype('int32'),
+    })
+
+# =============================================================================
+# Mirror writer (analytics_mirror layout: <table>/<year>/<chunk>.parquet)
+# =============================================================================
+_ROLLUP_SQL = """
+    SELECT stnKey, CAST(pasngDate AS DATE) AS pasngDate, ANY_VALUE(pasngYear) AS pasngYear,
+           ANY_VALUE(pasngDow) AS pasngDow, pasngHr, userClass,
+           MAX(stnNm) AS stnNm, MAX(lineNm) AS lineNm,
+           SUM(rideNope) AS rideNope, SUM(gffNope) AS gffNope, SUM(rideNope + gffNope) AS volume
+    FROM chunk
+    GROUP BY stnKey, pasngDate, pasngHr, userClass
+"""
+
+def _copy(con, select, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    con.execute(f"COPY ({select}) TO '{path.replace(chr(39), chr(39) * 2)}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+
+def _write_chunk(con, df, out_dir, table, name, with_rollup):
+    con.register("chunk", df)
+    try:
+        year = str(df['pasngYear'].iloc[0])
+        _copy(con, "SELECT * REPLACE (CAST(pasngDate AS DATE) AS pasngDate) FROM chunk",
+              os.path.join(out_dir, table, year, f"{name}.parquet"))
+        if with_rollup:
+            _copy(con, _ROLLUP_SQL, os.path.join(out_dir, ROLLUP_TABLE, year, f"{name}.parquet"))
+    finally:
+        con.unregister("chunk")
+
+def generate(out_dir, stations=300, days=365, history_years=3, start="2025-01-01", seed=42, verbose=True):
+    """
+    Write a full synthetic mirror to out_dir (replacing it). Returns row counts per table.
+    The main log covers `days` days from `start`; the senior history covers the
+    `history_years` years before it (senior codes only, like the 22-24 table).
+    """
+    if duckdb is None:
+        raise RuntimeError("duckdb is not installed (pip install duckdb)")
+    if os.path.isdir(out_dir) and os.listdir(out_dir) and not os.path.exists(os.path.join(out_dir, "_state.json")):
+        # 미러가 아닌 폴더를 실수로 지우지 않도록
+        raise RuntimeError(f"{out_dir} exists and is not a mirror directory")
+    rng = np.random.default_rng(seed)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+
+    meta = make_station_meta(stations, rng)
+    params = _station_params(meta, rng)
+    start = pd.Timestamp(start)
+    counts = {ingest_state.TRAFFIC_LOG: 0, ROLLUP_TABLE: 0, ingest_state.SENIOR_LOG: 0,
+              ingest_state.STATION_META: len(meta)}
+
+    con = duckdb.connect()
+    try:
+        con.register("meta_df", meta)
+        _copy(con, "SELECT * FROM meta_df", os.path.join(out_dir, ingest_state.STATION_META, "station_meta.parquet"))
+
+        # 월 단위로 생성/기록 -> 메모리 사용량이 전체 기간과 무관
+        all_codes = np.arange(len(CODES))
+        senior_codes = np.flatnonzero(CODE_CLASS == user_class.CLASS_SENIOR)
+        jobs = [(ingest_state.TRAFFIC_LOG, all_codes, pd.date_range(start, periods=days, freq='D'), True)]
+        if history_years > 0:
+            hist_start = pd.Timestamp(year=start.year - history_years, month=1, day=1)
+            jobs.append((ingest_state.SENIOR_LOG, senior_codes,
+                         pd.date_range(hist_start, pd.Timestamp(year=start.year - 1, month=12, day=31), freq='D'), False))
+
+        for table, codes_idx, dates, with_rollup in jobs:
+            for month, month_dates in pd.Series(dates).groupby(dates.to_period('M')):
+                started = time.perf_counter()
+                df = make_log(meta, params, month_dates.to_numpy(), codes_idx, rng, start.year - history_years)
+                _write_chunk(con, df, out_dir, table, str(month), with_rollup)
+                counts[table] += len(df)
+                if with_rollup:
+                    counts[ROLLUP_TABLE] += int(df.groupby(['stnKey', 'pasngDate', 'pasngHr', 'userClass']).ngroups)
+                if verbose:
+                    print(f"   -> {table} {month}: {len(df):,} rows ({time.perf_counter() - started:.1f}s)", end="\r")
+    finally:
+        con.close()
+
+    # analytics_mirror 가 읽는 상태 파일 (data_version -> 결과 캐시 / 모델 저장소 워터마크)
+    state = {"versions": {ingest_state.TRAFFIC_LOG: 1, ingest_state.SENIOR_LOG: 1, ingest_state.STATION_META: 1},
+             "refreshed_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+             "synthetic": {"stations": stations, "days": days, "history_years": history_years,
+                           "start": start.date().isoformat(), "seed": seed, "rows": counts}}
+    with open(os.path.join(out_dir, "_state.json"), 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    if verbose:
+        print()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=300)
+    parser.add_argument("--days", type=int, default=365, help="days of subway_traffic_log from --start")
+    parser.add_argument("--history-years", type=int, default=3, help="years of senior history before --start")
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(BACKEND_DIR), "data", "bench_mirror"))
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(args.out, args.stations, args.days, args.history_years, args.start, args.seed)
+    print(f"✅ {args.out} ({time.perf_counter() - started:.1f}s)")
+    for table, rows in counts.items():
+        print(f"   {table}: {rows:,}")
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,36 @@ USE seoul_urban_lab;
 -- 요청하신 9개 컬럼 + 관리용 id, 등록일자 포함
 
 CREATE TABLE IF NOT EXISTS subway_traffic_log (
-    id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '고유 식별자',
+    id BIGINT AUTO_INCREMENT COMMENT '고유 식별자',
     UserGroup VARCHAR(50) NOT NULL COMMENT '파생변수: 일반, 학생/청소년, 노인/약자, 기타',
     pasngDe VARCHAR(20) NOT NULL COMMENT '통행일자 (YYYYMMDD)',
+    pasngDate DATE GENERATED ALWAYS AS (STR_TO_DATE(pasngDe, '%Y%m%d')) STORED NOT NULL COMMENT '통행일자 (DATE, 파티션 키)',
+    pasngYear SMALLINT GENERATED ALWAYS AS (YEAR(pasngDate)) STORED NOT NULL COMMENT '통행연도',
+    pasngDow TINYINT GENERATED ALWAYS AS (DAYOFWEEK(pasngDate)) STORED NOT NULL COMMENT '요일 (1=일 ~ 7=토)',
     pasngHr INT NOT NULL COMMENT '통행시간 (0~23)',
     lineNm VARCHAR(50) NOT NULL COMMENT '호선명',
     stnCd VARCHAR(20) NOT NULL COMMENT '역코드',
+    stnKey CHAR(4) GENERATED ALWAYS AS (LPAD(TRIM(stnCd), 4, '0')) STORED NOT NULL COMMENT '표준 역코드 (4자리)',
     stnNm VARCHAR(50) NOT NULL COMMENT '역명',
     trnscdUserSeCd VARCHAR(10) NOT NULL COMMENT '사용자 구분 코드 (예: 01, 100)',
+    userClass TINYINT GENERATED ALWAYS AS (CASE WHEN trnscdUserSeCd = '01' THEN 1 WHEN trnscdUserSeCd IN ('02', '03', '04') THEN 2 WHEN trnscdUserSeCd IN ('06', '100') THEN 3 ELSE 9 END) STORED NOT NULL COMMENT '사용자 구분 등급 (user_class_dim)',
     rideNope INT DEFAULT 0 COMMENT '승차인원',
     gffNope INT DEFAULT 0 COMMENT '하차인원',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '데이터 적재 시각',
-    UNIQUE KEY uk_subway_log (pasngDe, pasngHr, stnCd, trnscdUserSeCd)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='서울교통공사 원본 유지 테이블';
+    PRIMARY KEY (id, pasngDate),
+    CONSTRAINT chk_subway_log_stn_len CHECK (CHAR_LENGTH(TRIM(stnCd)) <= 4),
+    UNIQUE KEY uk_subway_log (pasngDate, pasngHr, stnKey, trnscdUserSeCd),
+    INDEX idx_log_stn_date_hr (stnKey, pasngDate, pasngHr),
+    INDEX idx_log_class_stn_date (userClass, stnKey, pasngDate)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='서울교통공사 원본 유지 테이블'
+-- 연도별 파티션 (새 연도 추가 / 오래된 연도 삭제: backend/partitions.py)
+PARTITION BY RANGE COLUMNS(pasngDate) (
+    PARTITION p2022 VALUES LESS THAN ('2023-01-01'),
+    PARTITION p2023 VALUES LESS THAN ('2024-01-01'),
+    PARTITION p2024 VALUES LESS THAN ('2025-01-01'),
+    PARTITION p2025 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
 
@@ -2,16 +2,30 @@ USE seoul_urban_lab;
 
 -- 기존 테이블과 동일한 구조로 생성
 CREATE TABLE IF NOT EXISTS `subway_traffic_log_senior_22-24` (
-    id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT '고유 식별자',
+    id BIGINT AUTO_INCREMENT COMMENT '고유 식별자',
     UserGroup VARCHAR(50) NOT NULL COMMENT '사용자 그룹 (노인/약자 고정)',
     pasngDe VARCHAR(20) NOT NULL COMMENT '통행일자 (YYYYMMDD)',
+    pasngDate DATE GENERATED ALWAYS AS (STR_TO_DATE(pasngDe, '%Y%m%d')) STORED NOT NULL COMMENT '통행일자 (DATE, 파티션 키)',
+    pasngYear SMALLINT GENERATED ALWAYS AS (YEAR(pasngDate)) STORED NOT NULL COMMENT '통행연도',
+    pasngDow TINYINT GENERATED ALWAYS AS (DAYOFWEEK(pasngDate)) STORED NOT NULL COMMENT '요일 (1=일 ~ 7=토)',
     pasngHr INT NOT NULL COMMENT '통행시간 (0~23)',
     lineNm VARCHAR(50) NOT NULL COMMENT '호선명 (CSV는 정보없음으로 들어감)',
     stnCd VARCHAR(20) NOT NULL COMMENT '역코드',
+    stnKey CHAR(4) GENERATED ALWAYS AS (LPAD(TRIM(stnCd), 4, '0')) STORED NOT NULL COMMENT '표준 역코드 (4자리)',
     stnNm VARCHAR(50) NOT NULL COMMENT '역명',
     trnscdUserSeCd VARCHAR(10) NOT NULL COMMENT '사용자 구분 코드 (06 고정)',
+    userClass TINYINT GENERATED ALWAYS AS (CASE WHEN trnscdUserSeCd = '01' THEN 1 WHEN trnscdUserSeCd IN ('02', '03', '04') THEN 2 WHEN trnscdUserSeCd IN ('06', '100') THEN 3 ELSE 9 END) STORED NOT NULL COMMENT '사용자 구분 등급 (3 고정)',
     rideNope INT DEFAULT 0 COMMENT '승차인원',
     gffNope INT DEFAULT 0 COMMENT '하차인원',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE KEY uk_senior_log (pasngDe, pasngHr, stnCd, trnscdUserSeCd)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='서울교통공사 22-24년 노인 승하차 데이터';
\ No newline at end of file
+    PRIMARY KEY (id, pasngDate),
+    CONSTRAINT chk_senior_log_stn_len CHECK (CHAR_LENGTH(TRIM(stnCd)) <= 4),
+    UNIQUE KEY uk_senior_log (pasngDate, pasngHr, stnKey, trnscdUserSeCd),
+    INDEX idx_senior_stn_date_hr (stnKey, pasngDate, pasngHr)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='서울교통공사 22-24년 노인 승하차 데이터'
+PARTITION BY RANGE COLUMNS(pasngDate) (
+    PARTITION p2022 VALUES LESS THAN ('2023-01-01'),
+    PARTITION p2023 VALUES LESS THAN ('2024-01-01'),
+    PARTITION p2024 VALUES LESS THAN ('2025-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
\ No newline at end of file
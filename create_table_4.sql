@@ -0,0 +1,34 @@
+USE seoul_urban_lab;
+
+-- subway_traffic_log 시간대 집계 테이블 (Rollup Cube)
+-- 역 x 일자 x 시간 x 사용자등급(userClass, user_class_dim 참고) 단위로 미리 합산해 두고, 분석 API는 이 테이블만 읽습니다.
+-- 적재(upsert) 시 backend/rollup.py 의 refresh_rollup()이 해당 (일자, 역) 조각만 다시 계산합니다.
+-- 최초 구축 / 전체 재계산: cd backend && python rollup.py
+
+CREATE TABLE IF NOT EXISTS subway_traffic_hourly (
+    stnKey CHAR(4) NOT NULL COMMENT '표준 역코드 (4자리, LPAD 적용)',
+    pasngDate DATE NOT NULL COMMENT '통행일자 (파티션 키)',
+    pasngYear SMALLINT GENERATED ALWAYS AS (YEAR(pasngDate)) STORED NOT NULL COMMENT '통행연도',
+    pasngDow TINYINT GENERATED ALWAYS AS (DAYOFWEEK(pasngDate)) STORED NOT NULL COMMENT '요일 (1=일 ~ 7=토)',
+    pasngHr TINYINT NOT NULL COMMENT '통행시간 (0~23)',
+    userClass TINYINT NOT NULL COMMENT '사용자 구분 등급 (user_class_dim)',
+    stnNm VARCHAR(50) NOT NULL COMMENT '역명',
+    lineNm VARCHAR(50) NOT NULL COMMENT '호선명',
+    rideNope BIGINT NOT NULL DEFAULT 0 COMMENT '승차인원 합계',
+    gffNope BIGINT NOT NULL DEFAULT 0 COMMENT '하차인원 합계',
+    volume BIGINT NOT NULL DEFAULT 0 COMMENT '승차+하차 합계',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '집계 갱신 시각',
+    PRIMARY KEY (stnKey, pasngDate, pasngHr, userClass),
+    INDEX idx_hourly_date_hr (pasngDate, pasngHr),
+    INDEX idx_hourly_class_stn_date (userClass, stnKey, pasngDate),
+    INDEX idx_hourly_line_date (lineNm, pasngDate)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='subway_traffic_log 시간대 집계 (역/일자/시간/사용자등급)'
+PARTITION BY RANGE COLUMNS(pasngDate) (
+    PARTITION p2022 VALUES LESS THAN ('2023-01-01'),
+    PARTITION p2023 VALUES LESS THAN ('2024-01-01'),
+    PARTITION p2024 VALUES LESS THAN ('2025-01-01'),
+    PARTITION p2025 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p2026 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p2027 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
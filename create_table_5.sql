@@ -0,0 +1,18 @@
+USE seoul_urban_lab;
+
+-- 사용자 구분 차원 테이블 (userClass)
+-- 원본 테이블의 userClass 컬럼은 trnscdUserSeCd 로부터 쓰기 시점에 계산되는 생성 컬럼입니다.
+-- 코드 규칙과 "노인" 정의는 backend/user_class.py 와 같게 유지합니다.
+
+CREATE TABLE IF NOT EXISTS user_class_dim (
+    userClass TINYINT PRIMARY KEY COMMENT '사용자 구분 등급',
+    classNm VARCHAR(50) NOT NULL COMMENT '등급명',
+    isSenior TINYINT(1) NOT NULL DEFAULT 0 COMMENT '노인/약자 여부'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='사용자 구분 등급 (trnscdUserSeCd 묶음)';
+
+INSERT INTO user_class_dim (userClass, classNm, isSenior) VALUES
+    (1, '일반', 0),
+    (2, '어린이/학생/청소년', 0),
+    (3, '노인/약자', 1),
+    (9, '기타', 0)
+ON DUPLICATE KEY UPDATE classNm = VALUES(classNm), isSenior = VALUES(isSenior);
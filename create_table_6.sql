@@ -0,0 +1,11 @@
+USE seoul_urban_lab;
+
+-- 적재 상태 (ingest watermark)
+-- 적재 경로가 테이블에 데이터를 upsert 할 때마다 version 을 1씩 올립니다. (backend/ingest_state.py)
+-- 백엔드의 분석 결과 캐시는 이 값이 바뀌면 자동으로 비워집니다.
+
+CREATE TABLE IF NOT EXISTS ingest_state (
+    tableNm VARCHAR(64) PRIMARY KEY COMMENT '원본 테이블명',
+    version BIGINT NOT NULL DEFAULT 0 COMMENT '적재 버전 (upsert 마다 +1)',
+    updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3) COMMENT '마지막 적재 시각'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='테이블별 적재 워터마크';
@@ -0,0 +1,14 @@
+USE seoul_urban_lab;
+
+-- 테이블 통계 (행 수 / 최신 데이터 일자)
+-- 적재 경로가 upsert 와 같은 트랜잭션에서 새로 들어온 행 수만큼 rowCount 를 올립니다. (backend/ingest_state.py)
+-- /status 는 원본 테이블 COUNT(*) 대신 이 테이블을 읽습니다.
+-- 값이 어긋났다고 의심되면 `python backend/ingest_state.py recount` 로 정확한 값으로 다시 맞춥니다.
+
+CREATE TABLE IF NOT EXISTS table_stats (
+    tableNm VARCHAR(64) PRIMARY KEY COMMENT '원본 테이블명',
+    rowCount BIGINT NOT NULL DEFAULT 0 COMMENT '행 수',
+    latestDate DATE NULL COMMENT '가장 최근 통행일자 (날짜 컬럼이 없는 테이블은 NULL)',
+    countedAt TIMESTAMP NULL COMMENT '마지막 전체 재집계(COUNT) 시각',
+    updated_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3) COMMENT '마지막 갱신 시각'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='테이블별 행 수 / 최신 일자 (상태 API 용)';
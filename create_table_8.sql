@@ -0,0 +1,13 @@
+USE seoul_urban_lab;
+
+-- 적재 변경 일자 (ingest change log)
+-- 적재 경로가 ingest_state version 을 올릴 때 그 버전에서 바뀐 통행일자를 같은 트랜잭션에서 기록합니다. (backend/ingest_state.py)
+-- DuckDB 미러는 마지막으로 복제한 version 이후의 일자만 다시 내보냅니다. (backend/analytics_mirror.py)
+
+CREATE TABLE IF NOT EXISTS ingest_changes (
+    tableNm VARCHAR(64) NOT NULL COMMENT '원본 테이블명',
+    version BIGINT NOT NULL COMMENT '변경을 반영한 ingest_state 버전',
+    pasngDate DATE NOT NULL COMMENT '바뀐 통행일자',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '기록 시각',
+    PRIMARY KEY (tableNm, version, pasngDate)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='버전별 변경 일자 (미러 증분 갱신용)';
@@ -2,7 +2,31 @@ import requests
 import streamlit as st
 import pandas as pd
 
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow 가 없으면 기존처럼 JSON 으로 받음
+    pa = None
+
 API_BASE_URL = "http://127.0.0.1:8000"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def _get_frame(path, params=None):
+    """
+    Fetch a table endpoint as a DataFrame.
+    params: optional analysis filters (start, end, line, hour_from, hour_to, user_class).
+    Asks for Arrow IPC when pyarrow is installed (decoded column-wise, no per-row dicts);
+    the server answers JSON when it can't, so both content types are handled.
+    """
+    headers = {"Accept": f"{ARROW_MEDIA_TYPE}, application/json;q=0.9"} if pa is not None else {}
+    try:
+        response = requests.get(f"{API_BASE_URL}{path}", headers=headers, params=params)
+        if response.status_code == 200:
+            if pa is not None and response.headers.get("content-type", "").startswith(ARROW_MEDIA_TYPE):
+                return pa.ipc.open_stream(response.content).read_pandas()
+            return pd.DataFrame(response.json())
+    except:
+        pass
+    return pd.DataFrame()
 
 def get_system_status():
     try:
@@ -15,18 +39,14 @@ def get_system_status():
 
 @st.cache_data
 def get_all_stations():
-    try:
-        response = requests.get(f"{API_BASE_URL}/meta/stations")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-    except:
-        pass
-    return pd.DataFrame()
+    return _get_frame("/meta/stations")
 
 @st.cache_data
-def get_station_detail_data(stn_cd):
+def get_station_detail_data(stn_cd, start=None, end=None):
+    # start / end: 'YYYY-MM-DD' (생략 시 전체 기간)
+    params = {k: v for k, v in {"start": start, "end": end}.items() if v}
     try:
-        response = requests.get(f"{API_BASE_URL}/station/detail/{stn_cd}")
+        response = requests.get(f"{API_BASE_URL}/station/detail/{stn_cd}", params=params)
         if response.status_code == 200:
             return response.json()
     except:
@@ -34,71 +54,35 @@ def get_station_detail_data(stn_cd):
     return None
 
 @st.cache_data
-def get_trend_rhythm_data():
-    try:
-        response = requests.get(f"{API_BASE_URL}/analysis/trend/rhythm")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-    except:
-        pass
-    return pd.DataFrame()
+def get_trend_rhythm_data(filters=None):
+    return _get_frame("/analysis/trend/rhythm", filters)
 
 @st.cache_data
-def get_trend_rank_daytime_active_data():
-    try:
-        response = requests.get(f"{API_BASE_URL}/analysis/trend/rank-daytime-active")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-    except:
-        pass
-    return pd.DataFrame()
+def get_trend_rank_daytime_active_data(filters=None):
+    return _get_frame("/analysis/trend/rank-daytime-active", filters)
 
 @st.cache_data
-def get_timelapse_data_api():
-    try:
-        response = requests.get(f"{API_BASE_URL}/analysis/timelapse")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-    except:
-        pass
-    return pd.DataFrame()
+def get_timelapse_data_api(filters=None):
+    return _get_frame("/analysis/timelapse", filters)
 
 @st.cache_data
-def get_clustering_data_api():
-    try:
-        response = requests.get(f"{API_BASE_URL}/analysis/clustering")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-    except:
-        pass
-    return pd.DataFrame()
+def get_clustering_data_api(filters=None):
+    return _get_frame("/analysis/clustering", filters)
 
 # ==============================================================================
 # NEW ENDPOINTS FOR PROJECT EVOLUTION
 # ==============================================================================
 
 @st.cache_data
-def get_vitality_data():
+def get_vitality_data(filters=None):
     """
     Fetches the new Vitality Index data.
     """
-    try:
-        response = requests.get(f"{API_BASE_URL}/analysis/vitality")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-    except:
-        pass
-    return pd.DataFrame()
+    return _get_frame("/analysis/vitality", filters)
 
 @st.cache_data
-def get_prediction_data():
+def get_prediction_data(filters=None):
     """
     Fetches the Silver Tipping Point prediction data.
     """
-    try:
-        response = requests.get(f"{API_BASE_URL}/analysis/prediction")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-    except:
-        pass
-    return pd.DataFrame()
\ No newline at end of file
+    return _get_frame("/analysis/prediction", filters)
\ No newline at end of file
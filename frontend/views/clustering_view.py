@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import QuantileTransformer
 import pydeck as pdk
 import sys
 import os
@@ -25,61 +23,44 @@ except:
 st.markdown("<h2>AI CLUSTERING</h2>", unsafe_allow_html=True)
 st.markdown("<p style='font-weight:bold; color:#555;'>PATTERN RECOGNITION MATRIX</p>", unsafe_allow_html=True)
 
-# 1. 데이터 로드
+# 1. 설정 (군집화는 서버에서 수행, 화면은 결과만 그림)
+FEATURE_LABELS = {"ratios": "AM / PM RATIO", "profile24": "24H PROFILE"}
+ALGORITHM_LABELS = {"kmeans": "K-MEANS", "minibatch": "MINI-BATCH K-MEANS"}
+c_feat, c_k, c_algo = st.columns(3)
+with c_feat:
+    features = st.radio("FEATURES", list(FEATURE_LABELS), format_func=FEATURE_LABELS.get, horizontal=True)
+with c_k:
+    k = st.slider("CLUSTERS (K)", min_value=2, max_value=8, value=3)
+with c_algo:
+    algorithm = st.radio("ALGORITHM", list(ALGORITHM_LABELS), format_func=ALGORITHM_LABELS.get, horizontal=True)
+
+# 2. 데이터 로드
 with st.spinner("COMPUTING..."):
-    df = get_clustering_data_api()
+    df = get_clustering_data_api({"k": k, "features": features, "algorithm": algorithm})
+
+# Bauhaus Color Mapping (서버가 준 band 기준, 같은 band 가 여럿이면 보조 색상)
+BAND_STYLE = {
+    "AM": {"color": [30, 90, 160], "hex": "#1E5AA0", "accent": "b-blue", "desc": "EARLY MEDICAL/MARKET PEAK"},
+    "PM": {"color": [208, 32, 32], "hex": "#D02020", "accent": "b-red", "desc": "LATE SOCIAL LEISURE PEAK"},
+    "MIX": {"color": [240, 176, 0], "hex": "#F0B000", "accent": "b-yellow", "desc": "BALANCED RESIDENTIAL HUB"},
+}
+EXTRA_COLORS = [[17, 17, 17], [120, 120, 120], [0, 140, 110], [130, 60, 160], [230, 110, 20]]
 
 if not df.empty:
     df['total'] = df['total'].astype(float)
-    df['morning_ratio'] = df.apply(lambda x: x['morning'] / x['total'] if x['total'] > 0 else 0, axis=1)
-    df['afternoon_ratio'] = df.apply(lambda x: x['afternoon'] / x['total'] if x['total'] > 0 else 0, axis=1)
 
-    features = ['morning_ratio', 'afternoon_ratio']
-    X = df[features].fillna(0)
-    
-    if len(df) < 3:
-        st.warning("NOT ENOUGH DATA FOR AI CLUSTERING (NEED > 3 NODES)")
-        # Stop execution of this view
-        st.stop()
-        
-    try:
-        n_q = min(len(df), 100)
-        scaler = QuantileTransformer(n_quantiles=n_q, output_distribution='uniform', random_state=42)
-        X_scaled = scaler.fit_transform(X)
-        
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init=20)
-        df['cluster'] = kmeans.fit_predict(X_scaled)
-    except Exception as e:
-        st.error(f"CLUSTERING ENGINE FAILURE: {str(e)}")
-        st.stop()
-    
-    cluster_means = df.groupby('cluster')[features].mean()
-    morning_cluster_id = cluster_means['morning_ratio'].idxmax()
-    remaining = cluster_means.drop(morning_cluster_id)
-    afternoon_cluster_id = remaining['afternoon_ratio'].idxmax()
-    all_ids = set([0, 1, 2])
-    balance_cluster_id = list(all_ids - {morning_cluster_id, afternoon_cluster_id})[0]
-    
-    # Bauhaus Color Mapping
-    mapping = {
-        morning_cluster_id: {
-            "name": "TYPE A (AM)",
-            "color": [30, 90, 160], # Blue
-            "hex": "#1E5AA0"
-        },
-        afternoon_cluster_id: {
-            "name": "TYPE B (PM)",
-            "color": [208, 32, 32],   # Red
-            "hex": "#D02020"
-        },
-        balance_cluster_id: {
-            "name": "TYPE C (MIX)",
-            "color": [240, 176, 0],  # Yellow
-            "hex": "#F0B000"
-        }
-    }
-    
-    df['cluster_name'] = df['cluster'].map(lambda x: mapping[x]['name'])
+    clusters = df[['cluster', 'cluster_name', 'band']].drop_duplicates('cluster').sort_values('cluster')
+    mapping = {}
+    used_bands = set()
+    for row in clusters.itertuples():
+        style = dict(BAND_STYLE[row.band])
+        if row.band in used_bands:
+            color = EXTRA_COLORS[len(mapping) % len(EXTRA_COLORS)]
+            style.update(color=color, hex='#%02X%02X%02X' % tuple(color))
+        used_bands.add(row.band)
+        style["name"] = row.cluster_name
+        mapping[row.cluster] = style
+
     df['viz_color'] = df['cluster'].map(lambda x: mapping[x]['color'] + [200])
 
     # Radius
@@ -141,31 +122,17 @@ if not df.empty:
     
     # 3. 리스트
     st.markdown("### NODE LIST")
-    c1, c2, c3 = st.columns(3)
-    order_ids = [morning_cluster_id, afternoon_cluster_id, balance_cluster_id]
-    cols = [c1, c2, c3]
-    
-    descriptions = {
-        morning_cluster_id: "EARLY MEDICAL/MARKET PEAK",
-        afternoon_cluster_id: "LATE SOCIAL LEISURE PEAK",
-        balance_cluster_id: "BALANCED RESIDENTIAL HUB"
-    }
-    
-    accent_classes = {
-        morning_cluster_id: "b-blue",
-        afternoon_cluster_id: "b-red",
-        balance_cluster_id: "b-yellow"
-    }
+    order_ids = list(mapping)
+    cols = st.columns(min(len(order_ids), 4))
 
     for i, cid in enumerate(order_ids):
         info = mapping[cid]
-        accent = accent_classes[cid]
-        
-        with cols[i]:
+
+        with cols[i % len(cols)]:
             st.markdown(f"""
-                <div class="bauhaus-card {accent}" style="min-height: 200px;">
+                <div class="bauhaus-card {info['accent']}" style="min-height: 200px;">
                     <div style='font-weight:900; font-size:1.1em; margin-bottom:10px; text-transform:uppercase;'>{info['name']}</div>
-                    <div style='font-size:0.8rem; font-weight:bold; color:#555; margin-bottom:15px; height:40px;'>{descriptions[cid]}</div>
+                    <div style='font-size:0.8rem; font-weight:bold; color:#555; margin-bottom:15px; height:40px;'>{info['desc']}</div>
                     <div style='font-size:0.85rem; color:#111; font-family:"Jost";'>
                         {", ".join(df[df['cluster'] == cid].nlargest(10, 'total')['stnNm'].tolist())}
                     </div>
@@ -17,12 +17,18 @@ except:
     pass
 
 st.markdown("<h2>FUTURE FORECAST</h2>", unsafe_allow_html=True)
-st.markdown("<p style='font-weight:bold; color:#555;'>SILVER TRAFFIC PROJECTION (2030)</p>", unsafe_allow_html=True)
+
+MODEL_LABELS = {"cagr": "CAGR", "linear": "LINEAR TREND", "seasonal": "SEASONAL (HOLT-WINTERS)"}
+model = st.radio("MODEL", list(MODEL_LABELS), format_func=MODEL_LABELS.get, horizontal=True)
 
 with st.spinner("RUNNING SIMULATION..."):
-    df = get_prediction_data()
+    df = get_prediction_data({"model": model})
 
 if not df.empty:
+    base_year = int(df['base_year'].iloc[0])
+    target_year = int(df['target_year'].iloc[0])
+    st.markdown(f"<p style='font-weight:bold; color:#555;'>SILVER TRAFFIC PROJECTION ({target_year})</p>", unsafe_allow_html=True)
+
     # Segregate Rising vs Falling
     rising = df[df['cagr'] > 0]
     falling = df[df['cagr'] <= 0]
@@ -68,7 +74,7 @@ if not df.empty:
     st.plotly_chart(fig, use_container_width=True)
     
     # Detailed Projections Table
-    st.markdown("### PROJECTION MATRIX (2024 -> 2030)")
+    st.markdown(f"### PROJECTION MATRIX ({base_year} -> {target_year})")
     
     st.markdown("""
     <style>
@@ -76,16 +82,18 @@ if not df.empty:
     </style>
     """, unsafe_allow_html=True)
     
-    display_df = df[['stnNm', 'vol_2024', 'proj_2030', 'cagr', 'trend']].copy()
-    display_df['growth_vol'] = display_df['proj_2030'] - display_df['vol_2024']
+    display_df = df[['stnNm', 'base_vol', 'forecast', 'lower', 'upper', 'cagr', 'trend']].copy()
+    display_df['growth_vol'] = display_df['forecast'] - display_df['base_vol']
     
     st.dataframe(
         display_df.style.format({
-            'vol_2024': '{:,.0f}', 
-            'proj_2030': '{:,.0f}', 
+            'base_vol': '{:,.0f}', 
+            'forecast': '{:,.0f}', 
+            'lower': '{:,.0f}',
+            'upper': '{:,.0f}',
             'growth_vol': '{:+,.0f}',
             'cagr': '{:.2f}%'
-        }).background_gradient(subset=['cagr'], cmap='Reds'),
+        }, na_rep='-').background_gradient(subset=['cagr'], cmap='Reds'),
         use_container_width=True
     )
 